@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import Counter
+from hashlib import md5
+
+from django.core.cache import caches
+from django.db import transaction
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterable, Optional, Self, Tuple
+    from rest_framework.request import Request
+
+
+class ScoreboardCache:
+    """Serialized scoreboards keyed by league and a per-league version.
+
+    Every Team or Match write bumps the version of its league right away and
+    again once the transaction commits, so a page cached from not yet
+    committed data is orphaned too and no TTL is needed. This holds across
+    processes only when they share the cache backend, e.g. ``db`` or ``file``.
+    """
+
+    cache_alias = "default"
+    prefix = "scoreboard"
+    timeout = None
+    # Orphaned pages of older versions only need to expire eventually.
+    data_timeout = 60 * 60 * 24
+    # Hits and misses are counted in the process and added to the cache in
+    # batches, so a lookup stays two cache reads.
+    stats_flush_every = 100
+    local_stats = Counter()
+    stats_lock = threading.Lock()
+
+    def __init__(self: "Self") -> None:
+        self.cache = caches[self.cache_alias]
+
+    def version_key(self: "Self", league_id: "Any") -> str:
+        return f"{self.prefix}:version:{league_id}"
+
+    def data_key(self: "Self", league_id: "Any", request: "Request") -> str:
+        uri = md5(request.build_absolute_uri().encode()).hexdigest()
+        return f"{self.prefix}:data:{league_id}:{uri}"
+
+    def version(self: "Self", league_id: "Any") -> int:
+        key = self.version_key(league_id)
+        version = self.cache.get(key)
+        if version is None:
+            # An evicted counter restarts from a fresh value, never from a
+            # version some cached page may still be stored under.
+            self.cache.add(key, time.time_ns(), timeout=self.timeout)
+            version = self.cache.get(key)
+        return version
+
+    def get(self: "Self", league_id: "Any", request: "Request") -> "Tuple[int, Optional[Any]]":
+        version = self.version(league_id)
+        data = self.cache.get(self.data_key(league_id, request), version=version)
+        self.count("hits" if data is not None else "misses")
+        return version, data
+
+    def set(self: "Self", league_id: "Any", request: "Request", version: int, data: "Any") -> None:
+        self.cache.set(self.data_key(league_id, request), data, timeout=self.data_timeout, version=version)
+
+    def bump(self: "Self", league_id: "Any") -> None:
+        try:
+            self.cache.incr(self.version_key(league_id))
+        except ValueError:
+            self.cache.add(self.version_key(league_id), time.time_ns(), timeout=self.timeout)
+
+    def count(self: "Self", counter: str) -> None:
+        with self.stats_lock:
+            self.local_stats[counter] += 1
+            due = sum(self.local_stats.values()) >= self.stats_flush_every
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self: "Self") -> None:
+        with self.stats_lock:
+            counts = dict(self.local_stats)
+            self.local_stats.clear()
+        for counter, value in counts.items():
+            key = f"{self.prefix}:{counter}"
+            try:
+                self.cache.incr(key, value)
+            except ValueError:
+                if not self.cache.add(key, value, timeout=None):
+                    self.cache.incr(key, value)
+
+    def stats(self: "Self") -> "Dict[str, int]":
+        """Counters flushed by every process, including this one's pending counts."""
+        self.flush_stats()
+        return {
+            counter: self.cache.get(f"{self.prefix}:{counter}", 0)
+            for counter in ("hits", "misses")
+        }
+
+    def reset_stats(self: "Self") -> None:
+        with self.stats_lock:
+            self.local_stats.clear()
+        self.cache.delete_many([f"{self.prefix}:hits", f"{self.prefix}:misses"])
+
+    @classmethod
+    def invalidate(cls: "type", *league_ids: "Optional[int]") -> None:
+        league_ids = {league_id for league_id in league_ids if league_id is not None}
+        cls().bump_many(league_ids)
+        transaction.on_commit(lambda: cls().bump_many(league_ids))
+
+    def bump_many(self: "Self", league_ids: "Iterable[int]") -> None:
+        for league_id in league_ids:
+            self.bump(league_id)
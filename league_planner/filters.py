@@ -1,8 +1,9 @@
-from django_filters.rest_framework import FilterSet, BaseInFilter
+from django.db.models import Q
+from django_filters.rest_framework import BaseInFilter, BooleanFilter, CharFilter, DateTimeFilter, FilterSet, NumberFilter
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import List
+    from typing import List, Optional
     from django.db.models.query import QuerySet
 
 
@@ -13,3 +14,20 @@ class IdsFilter(BaseInFilter):
 
 class FilterByLeague(FilterSet):
     league = IdsFilter(lookup_expr="exact")
+
+
+class MatchFilter(FilterByLeague):
+    """Calendar filters, each served by one of the ``(column, datetime)`` indexes of Match."""
+
+    after = DateTimeFilter(field_name="datetime", lookup_expr="gte")
+    before = DateTimeFilter(field_name="datetime", lookup_expr="lte")
+    team = NumberFilter(method="filter_team")
+    city = CharFilter(field_name="host__city", lookup_expr="iexact")
+    has_result = BooleanFilter(method="filter_has_result")
+
+    def filter_team(self, qs: "QuerySet", name: str, team_id: "Optional[int]") -> "QuerySet":
+        return qs.filter(Q(host_id=team_id) | Q(visitor_id=team_id))
+
+    def filter_has_result(self, qs: "QuerySet", name: str, has_result: bool) -> "QuerySet":
+        scored = Q(host_score__isnull=False, visitor_score__isnull=False)
+        return qs.filter(scored) if has_result else qs.exclude(scored)
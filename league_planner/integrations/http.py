@@ -0,0 +1,268 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+
+import requests
+from asgiref.sync import sync_to_async
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+from typing import TYPE_CHECKING
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Optional, Self, Union
+
+
+class CircuitBreakerOpen(requests.RequestException):
+    pass
+
+
+class QuotaExceeded(requests.RequestException):
+    pass
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after ``failure_threshold`` consecutive failures.
+
+    After ``reset_timeout`` seconds one trial call is let through (half open);
+    its outcome closes the breaker again or restarts the timeout.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self: "Self", failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self: "Self") -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    @property
+    def state(self: "Self") -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self: "Self") -> bool:
+        with self.lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def release(self: "Self") -> None:
+        """Give back a trial call that was let through but never made."""
+        with self.lock:
+            self.trial_running = False
+
+    def record_success(self: "Self") -> None:
+        with self.lock:
+            self.reset()
+
+    def record_failure(self: "Self") -> None:
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class BudgetedRetry(Retry):
+    """Retry that spends a ``limiter`` token on every further attempt.
+
+    Without one the last response, or the error, is what the caller gets.
+    """
+
+    def __init__(self: "Self", *args: "Any", limiter: "Optional[Any]" = None, **kwargs: "Any") -> None:
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+
+    def new(self: "Self", **kwargs: "Any") -> "BudgetedRetry":
+        retry = super().new(**kwargs)
+        retry.limiter = self.limiter
+        return retry
+
+    def increment(
+        self: "Self",
+        method: "Optional[str]" = None,
+        url: "Optional[str]" = None,
+        **kwargs: "Any",
+    ) -> "BudgetedRetry":
+        retry = super().increment(method, url, **kwargs)
+        if self.limiter is not None and not self.limiter.acquire():
+            raise MaxRetryError(kwargs.get("_pool"), url, kwargs.get("error"))
+        return retry
+
+
+class HTTPTransport:
+    """Pooled keep-alive session with timeouts, retries, a circuit breaker and an optional call budget.
+
+    ``limiter`` is any object with an ``acquire() -> bool`` method. Every
+    upstream call costs a token, retries included.
+    """
+
+    retry_statuses = (429, 500, 502, 503, 504)
+    latency_window = 1000
+
+    def __init__(
+        self: "Self",
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10,
+        retries: int = 2,
+        backoff_factor: float = 0.3,
+        breaker: "Optional[CircuitBreaker]" = None,
+        limiter: "Optional[Any]" = None,
+    ) -> None:
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=BudgetedRetry(
+                total=retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=self.retry_statuses,
+                allowed_methods=("GET",),
+                raise_on_status=False,
+                limiter=limiter,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=self.latency_window)
+        self.counters = {"calls": 0, "failures": 0, "rejected": 0, "throttled": 0}
+
+    def get(self: "Self", url: str, **kwargs: "Any") -> "requests.Response":
+        started = self.admit(url)
+        try:
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            self.record(started, None)
+            raise
+        self.record(started, response.status_code)
+        return response
+
+    def admit(self: "Self", url: str) -> float:
+        # The breaker goes first, an open one must not spend tokens.
+        if not self.breaker.allow():
+            self.count("rejected")
+            raise CircuitBreakerOpen(f"Circuit breaker open for {url}")
+        if self.limiter is not None and not self.limiter.acquire():
+            self.breaker.release()
+            self.count("throttled")
+            raise QuotaExceeded(f"Call budget exhausted for {url}")
+        self.count("calls")
+        return time.perf_counter()
+
+    def record(self: "Self", started: float, status_code: "Optional[int]") -> None:
+        with self.lock:
+            self.latencies.append(time.perf_counter() - started)
+        if status_code is None or status_code in self.retry_statuses:
+            self.count("failures")
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def count(self: "Self", counter: str) -> None:
+        with self.lock:
+            self.counters[counter] += 1
+
+    def metrics(self: "Self") -> "Dict[str, Any]":
+        with self.lock:
+            latencies = sorted(self.latencies)
+            counters = dict(self.counters)
+
+        def percentile(fraction: float) -> "Optional[float]":
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        return {
+            **counters,
+            "breaker_state": self.breaker.state,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)},
+        }
+
+
+class AsyncHTTPTransport:
+    """Asyncio counterpart of HTTPTransport sharing its breaker and metrics.
+
+    Requests go through a pooled ``httpx.AsyncClient`` when httpx is installed,
+    otherwise the blocking ``transport`` runs in worker threads.
+    """
+
+    def __init__(self: "Self", transport: "HTTPTransport", pool_size: int = 10, retries: int = 2) -> None:
+        self.transport = transport
+        self.pool_size = pool_size
+        self.retries = retries
+        self.clients = weakref.WeakKeyDictionary()
+
+    @property
+    def breaker(self: "Self") -> "CircuitBreaker":
+        return self.transport.breaker
+
+    def client(self: "Self") -> "httpx.AsyncClient":
+        # An AsyncClient is bound to the event loop it was first used on.
+        loop = asyncio.get_running_loop()
+        if loop not in self.clients:
+            connect_timeout, read_timeout = self.transport.timeout
+            self.clients[loop] = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                transport=httpx.AsyncHTTPTransport(retries=self.retries),
+            )
+        return self.clients[loop]
+
+    async def get(self: "Self", url: str, **kwargs: "Any") -> "Union[httpx.Response, requests.Response]":
+        if httpx is None:
+            return await sync_to_async(self.transport.get, thread_sensitive=False)(url, **kwargs)
+        # The limiter may query the database.
+        admission = asyncio.ensure_future(sync_to_async(self.transport.admit)(url))
+        try:
+            started = await asyncio.shield(admission)
+        except asyncio.CancelledError:
+            # Admitted calls must be recorded, a half-open trial would otherwise stay running.
+            admission.add_done_callback(self.record_cancelled)
+            raise
+        try:
+            response = await self.client().get(url, **kwargs)
+        except httpx.HTTPError as error:
+            self.transport.record(started, None)
+            # Callers handle a single family of transport errors.
+            raise requests.ConnectionError(str(error)) from error
+        except BaseException:
+            # Cancelled, e.g. by a client disconnect or a timeout.
+            self.transport.record(started, None)
+            raise
+        self.transport.record(started, response.status_code)
+        return response
+
+    def record_cancelled(self: "Self", admission: "asyncio.Future") -> None:
+        if not admission.cancelled() and admission.exception() is None:
+            self.transport.record(admission.result(), None)
+
+    def metrics(self: "Self") -> "Dict[str, Any]":
+        return self.transport.metrics()
@@ -0,0 +1,23 @@
+from league_planner.models.token_bucket import TokenBucket
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Optional, Self
+
+
+class TokenBucketLimiter:
+    """Calls-per-minute budget shared by all processes through a TokenBucket row.
+
+    Bursts of up to ``burst`` calls are allowed, a falsy budget disables the limiter.
+    """
+
+    def __init__(self: "Self", name: str, calls_per_minute: int, burst: "Optional[int]" = None) -> None:
+        self.name = name
+        self.calls_per_minute = calls_per_minute
+        self.burst = burst or calls_per_minute
+
+    def acquire(self: "Self") -> bool:
+        if not self.calls_per_minute:
+            return True
+        return TokenBucket.objects.acquire(self.name, self.calls_per_minute / 60, self.burst)
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import weakref
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Awaitable, Callable, Dict, Hashable, Self
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one, shared by all callers."""
+
+    class Call:
+        def __init__(self: "Self") -> None:
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self: "Self") -> None:
+        self.lock = threading.Lock()
+        self.calls: "Dict[Hashable, SingleFlight.Call]" = {}
+
+    def do(self: "Self", key: "Hashable", function: "Callable[[], Any]") -> "Any":
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = self.Call()
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = function()
+            except Exception as error:
+                call.error = error
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of SingleFlight, calls are shared per event loop."""
+
+    def __init__(self: "Self") -> None:
+        self.tasks = weakref.WeakKeyDictionary()
+
+    async def do(self: "Self", key: "Hashable", function: "Callable[[], Awaitable]") -> "Any":
+        tasks = self.tasks.setdefault(asyncio.get_running_loop(), {})
+        task = tasks.get(key)
+        if task is None:
+            task = tasks[key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda _: tasks.pop(key, None))
+        # A cancelled waiter must not cancel the lookup of the others.
+        return await asyncio.shield(task)
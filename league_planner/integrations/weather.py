@@ -1,52 +1,357 @@
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
 
 from league_planner import settings
+from league_planner.integrations.http import AsyncHTTPTransport, CircuitBreaker, HTTPTransport
+from league_planner.integrations.quota import TokenBucketLimiter
+from league_planner.integrations.singleflight import AsyncSingleFlight, SingleFlight
+from league_planner.models.weather import WeatherForecast
 
+from collections import defaultdict
 from datetime import datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING
 
 import requests
 
+if TYPE_CHECKING:
+    from datetime import date
+    from typing import Any, Callable, Dict, Iterable, List, Optional, Self, Set, Tuple
+    from league_planner.models.match import Match
 
-class WeatherAPIClient:
-    weather_api_base_url = "https://api.weatherapi.com/v1/"
+
+class WeatherCache:
+    """Verdicts shared by all workers through the WeatherForecast table.
+
+    Entries expire after a TTL that grows with the forecast horizon and the
+    least recently used ones are evicted once ``max_entries`` is exceeded.
+    """
+
+    max_entries = settings.WEATHER_CACHE_MAX_ENTRIES
+    cull_fraction = 10
+    touch_interval = timedelta(minutes=1)
+
+    @staticmethod
+    def normalize_city(city: str) -> str:
+        return " ".join(city.split()).casefold()[:50]
+
+    @staticmethod
+    def ttl(date: "datetime", now: "datetime") -> "timedelta":
+        days_ahead = (date - now).days
+        if days_ahead < 3:
+            return timedelta(hours=1)
+        if days_ahead < 14:
+            return timedelta(hours=6)
+        return timedelta(days=7)
+
+    def get(self: "Self", city: str, date: "date") -> "Optional[bool]":
+        now = timezone.now()
+        entry = WeatherForecast.objects.filter(
+            city=self.normalize_city(city),
+            date=date,
+            expires_at__gt=now,
+        ).values_list("pk", "is_weather_good", "last_used_at").first()
+        if entry is None:
+            return None
+        pk, is_weather_good, last_used_at = entry
+        if last_used_at < now - self.touch_interval:
+            WeatherForecast.objects.filter(pk=pk).update(last_used_at=now)
+        return is_weather_good
+
+    def get_many(self: "Self", keys: "Set[Tuple[str, date]]") -> "Dict[Tuple[str, date], bool]":
+        """Look up several ``(city, date)`` verdicts in a single query."""
+        keys = {(self.normalize_city(city), date) for city, date in keys}
+        if not keys:
+            return {}
+        now = timezone.now()
+        entries = WeatherForecast.objects.filter(
+            city__in={city for city, _ in keys},
+            date__in={date for _, date in keys},
+            expires_at__gt=now,
+        ).values_list("pk", "city", "date", "is_weather_good", "last_used_at")
+        found, stale = {}, []
+        for pk, city, date, is_weather_good, last_used_at in entries:
+            if (city, date) not in keys:
+                continue
+            found[city, date] = is_weather_good
+            if last_used_at < now - self.touch_interval:
+                stale.append(pk)
+        if stale:
+            WeatherForecast.objects.filter(pk__in=stale).update(last_used_at=now)
+        return found
+
+    def set(self: "Self", city: str, date: "date", is_weather_good: bool, ttl: "timedelta") -> None:
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                WeatherForecast.objects.update_or_create(
+                    city=self.normalize_city(city),
+                    date=date,
+                    defaults={
+                        "is_weather_good": is_weather_good,
+                        "expires_at": now + ttl,
+                        "last_used_at": now,
+                    },
+                )
+        except IntegrityError:
+            # Another worker stored the same forecast in the meantime.
+            return
+        self.cull()
+
+    def cull(self: "Self") -> None:
+        count = WeatherForecast.objects.count()
+        if count <= self.max_entries:
+            return
+        WeatherForecast.objects.filter(expires_at__lte=timezone.now()).delete()
+        excess = WeatherForecast.objects.count() - self.max_entries
+        if excess > 0:
+            excess += self.max_entries // self.cull_fraction
+            oldest = WeatherForecast.objects.order_by("last_used_at").values_list("pk", flat=True)[:excess]
+            WeatherForecast.objects.filter(pk__in=list(oldest)).delete()
+
+
+class BaseWeatherAPIClient:
+    """Request building and response parsing shared by the sync and async clients.
+
+    Subclasses own the transport and only decide how requests are sent and
+    verdicts stored.
+    """
+
+    weather_api_base_url = settings.WEATHER_API_BASE_URL
     weather_api_secret_key = settings.WEATHER_API_SECRET_KEY
+    cache_class = WeatherCache
+
+    def __init__(self: "Self") -> None:
+        self.cache = self.cache_class()
+
+    @staticmethod
+    def is_distant(date: "datetime", current_datetime: "datetime") -> bool:
+        return current_datetime + timedelta(days=14) <= date
+
+    @staticmethod
+    def forecast_days(date: "datetime", current_datetime: "datetime") -> int:
+        # Today is the first forecast day.
+        return (date.date() - current_datetime.date()).days + 1
+
+    def lookup_request(
+        self: "Self",
+        city: str,
+        date: "datetime",
+        current_datetime: "datetime",
+    ) -> "Tuple[str, Dict[str, Any]]":
+        """URL and params of the upstream call answering ``city`` on ``date``."""
+        if self.is_distant(date, current_datetime):
+            return self.future_request(city, date)
+        return self.forecast_request(city, self.forecast_days(date, current_datetime))
+
+    def future_request(self: "Self", city: str, date: "datetime") -> "Tuple[str, Dict[str, Any]]":
+        return f"{self.weather_api_base_url}future.json", {
+            "key": self.weather_api_secret_key,
+            "q": city,
+            "dt": date.strftime(settings.WEATHER_API_DATE_FORMAT),
+        }
+
+    def forecast_request(self: "Self", city: str, delta_days: int) -> "Tuple[str, Dict[str, Any]]":
+        return f"{self.weather_api_base_url}forecast.json", {
+            "key": self.weather_api_secret_key,
+            "q": city,
+            "days": delta_days,
+        }
+
+    def read(
+        self: "Self",
+        response: "Response",
+        dates: "List[Tuple[Optional[int], datetime]]",
+        current_datetime: "datetime",
+    ) -> "Tuple[Dict[Optional[int], bool], Dict[Optional[int], Exception], Dict[date, Tuple[bool, timedelta]]]":
+        """Verdicts and errors by key, plus the verdicts worth caching by day with their TTL."""
+        verdicts, failures, to_store = {}, {}, {}
+        for key, date in dates:
+            try:
+                verdicts[key] = self.check_response(response, date)
+            except Exception as error:
+                failures[key] = error
+                continue
+            if response.status_code == status.HTTP_200_OK and date.date() not in to_store:
+                to_store[date.date()] = verdicts[key], self.cache.ttl(date, current_datetime)
+        return verdicts, failures, to_store
+
+    @staticmethod
+    def check_response(response: "Response", date: "datetime") -> bool:
+        if response.status_code != status.HTTP_200_OK:
+            return True
+        day = date.strftime(settings.WEATHER_API_DATE_FORMAT)
+        for forecast in response.json()["forecast"]["forecastday"]:
+            if forecast["date"] == day:
+                return not bool(forecast["day"]["daily_will_it_rain"])
+        # The upstream did not forecast that far ahead.
+        return True
+
+
+class WeatherAPIClient(BaseWeatherAPIClient):
+    # Shared by every client of the process, so connections are kept alive
+    # and the breaker sees all calls to the upstream.
+    transport = HTTPTransport(
+        pool_size=settings.WEATHER_API_POOL_SIZE,
+        connect_timeout=settings.WEATHER_API_CONNECT_TIMEOUT,
+        read_timeout=settings.WEATHER_API_READ_TIMEOUT,
+        retries=settings.WEATHER_API_RETRIES,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.WEATHER_API_BREAKER_THRESHOLD,
+            reset_timeout=settings.WEATHER_API_BREAKER_RESET_TIMEOUT,
+        ),
+        limiter=TokenBucketLimiter(
+            "weather_api",
+            settings.WEATHER_API_CALLS_PER_MINUTE,
+            settings.WEATHER_API_BURST,
+        ),
+    )
+    # Concurrent lookups of the same city and day share one upstream call.
+    single_flight = SingleFlight()
 
     def check_if_weather_good(self, city: str, date: "datetime") -> bool:
         current_datetime = datetime.now()
         if current_datetime >= date:
             return True
-        elif current_datetime + timedelta(days=14) <= date:
-            response = self.check_future(city, date)
-        else:
-            delta = date - current_datetime
-            response = self.check_forecast(city, delta.days)
-
-        return self.check_response(response)
-
-    def check_future(self, city: str, date: "datetime") -> "Response":
-        return requests.get(
-            f"{self.weather_api_base_url}future.json",
-            params={
-                "key": self.weather_api_secret_key,
-                "q": city,
-                "dt": date.strftime(settings.WEATHER_API_DATE_FORMAT)
-            },
+        cached = self.cache.get(city, date.date())
+        if cached is not None:
+            return cached
+        return self.single_flight.do(
+            (self.cache.normalize_city(city), date.date()),
+            partial(self.fetch_verdict, city, date, current_datetime),
         )
 
-    def check_forecast(self, city: str, delta_days: int) -> "Response":
-        return requests.get(
-            f"{self.weather_api_base_url}forecast.json",
-            params={
-                "key": self.weather_api_secret_key,
-                "q": city,
-                "days": delta_days,
-            },
+    def fetch_verdict(self, city: str, date: "datetime", current_datetime: "datetime") -> bool:
+        url, params = self.lookup_request(city, date, current_datetime)
+        fetch = partial(self.transport.get, url, params=params)
+        verdicts, failures = self.answer(fetch, city, [(None, date)], current_datetime, fail_open=True)
+        if failures:
+            raise failures[None]
+        return verdicts[None]
+
+    def check_matches(
+        self: "Self",
+        matches: "Iterable[Match]",
+        fail_open: bool = False,
+    ) -> "Tuple[Dict[int, bool], Dict[int, Exception]]":
+        """Check the weather of many matches with as few upstream calls as possible.
+
+        Matches are grouped by host city, each city costs one forecast call
+        covering its furthest match and distant dates one call per day.
+        Returns the verdicts and the errors by match id. Transport errors are
+        errors too unless ``fail_open``, so queued checks get retried.
+        """
+        current_datetime = datetime.now()
+        verdicts, failures, pending = {}, {}, []
+        for match in matches:
+            if match.host is None or not match.host.city or match.datetime is None:
+                verdicts[match.pk] = True
+                continue
+            date = timezone.make_naive(match.datetime)
+            if current_datetime >= date:
+                verdicts[match.pk] = True
+            else:
+                pending.append((match.pk, match.host.city, date))
+
+        cached = self.cache.get_many({(city, date.date()) for _, city, date in pending})
+        forecasts, futures = defaultdict(list), defaultdict(list)
+        for match_id, city, date in pending:
+            key = self.cache.normalize_city(city)
+            verdict = cached.get((key, date.date()))
+            if verdict is not None:
+                verdicts[match_id] = verdict
+            elif self.is_distant(date, current_datetime):
+                futures[key, date.date()].append((match_id, city, date))
+            else:
+                forecasts[key].append((match_id, city, date))
+
+        def collect(
+            request: "Tuple[str, Dict[str, Any]]",
+            key: "Tuple",
+            group: "List[Tuple[int, str, datetime]]",
+        ) -> None:
+            url, params = request
+            # Workers checking the same city at once share the upstream call.
+            fetch = partial(self.single_flight.do, (url, *key), partial(self.transport.get, url, params=params))
+            answered, errors = self.answer(
+                fetch,
+                group[0][1],
+                [(match_id, date) for match_id, _, date in group],
+                current_datetime,
+                fail_open,
+            )
+            verdicts.update(answered)
+            failures.update(errors)
+
+        for key, group in forecasts.items():
+            days = max(self.forecast_days(date, current_datetime) for _, _, date in group)
+            collect(self.forecast_request(group[0][1], days), (key, days), group)
+        for key, group in futures.items():
+            collect(self.future_request(group[0][1], group[0][2]), key, group)
+        return verdicts, failures
+
+    def answer(
+        self: "Self",
+        fetch: "Callable[[], Response]",
+        city: str,
+        dates: "List[Tuple[Optional[int], datetime]]",
+        current_datetime: "datetime",
+        fail_open: bool = False,
+    ) -> "Tuple[Dict[Optional[int], bool], Dict[Optional[int], Exception]]":
+        try:
+            response = fetch()
+        except requests.RequestException as error:
+            if fail_open:
+                # An unhealthy upstream must not block inline match planning.
+                return {key: True for key, _ in dates}, {}
+            return {}, {key: error for key, _ in dates}
+
+        verdicts, failures, to_store = self.read(response, dates, current_datetime)
+        for day, (is_weather_good, ttl) in to_store.items():
+            self.cache.set(city, day, is_weather_good, ttl)
+        return verdicts, failures
+
+
+class AsyncWeatherAPIClient(BaseWeatherAPIClient):
+    """Asyncio counterpart of WeatherAPIClient for ASGI deployments.
+
+    Shares the connection pool settings, breaker and metrics of the sync
+    client, so many lookups can be in flight on a single event loop.
+    """
+
+    transport = AsyncHTTPTransport(
+        WeatherAPIClient.transport,
+        pool_size=settings.WEATHER_API_POOL_SIZE,
+        retries=settings.WEATHER_API_RETRIES,
+    )
+    single_flight = AsyncSingleFlight()
+
+    async def check_if_weather_good(self, city: str, date: "datetime") -> bool:
+        current_datetime = datetime.now()
+        if current_datetime >= date:
+            return True
+        cached = await sync_to_async(self.cache.get)(city, date.date())
+        if cached is not None:
+            return cached
+        return await self.single_flight.do(
+            (self.cache.normalize_city(city), date.date()),
+            partial(self.fetch_verdict, city, date, current_datetime),
         )
 
-    @staticmethod
-    def check_response(response: "Response") -> bool:
-        if response.status_code != status.HTTP_200_OK:
+    async def fetch_verdict(self, city: str, date: "datetime", current_datetime: "datetime") -> bool:
+        try:
+            url, params = self.lookup_request(city, date, current_datetime)
+            response = await self.transport.get(url, params=params)
+        except requests.RequestException:
+            # Fail open, an unhealthy upstream must not block match planning.
             return True
-        data_json = response.json()
-        return not bool(data_json["forecast"]["forecastday"][0]["day"]["daily_will_it_rain"])
+
+        verdicts, failures, to_store = self.read(response, [(None, date)], current_datetime)
+        if failures:
+            raise failures[None]
+        for day, (is_weather_good, ttl) in to_store.items():
+            await sync_to_async(self.cache.set)(city, day, is_weather_good, ttl)
+        return verdicts[None]
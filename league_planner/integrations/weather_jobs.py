@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from league_planner.integrations.weather import WeatherAPIClient
+from league_planner.models.match import Match
+from league_planner.models.weather import WeatherCheckJob
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from typing import Dict, Iterable, List, Optional, Self
+
+
+class WeatherCheckQueue:
+    """Database backed queue of weather checks run by ``run_weather_worker``."""
+
+    batch_size = 50
+    max_attempts = 5
+    retry_delay = timedelta(seconds=30)
+    lease = timedelta(minutes=5)
+    recheck_horizon = timedelta(days=14)
+    recheck_after = timedelta(hours=6)
+
+    def __init__(self: "Self", client: "WeatherAPIClient" = None) -> None:
+        self.client = client or WeatherAPIClient()
+
+    def enqueue(self: "Self", match_ids: "Iterable[int]") -> None:
+        match_ids = list(match_ids)
+        if not match_ids:
+            return
+        now = timezone.now()
+        WeatherCheckJob.objects.bulk_create(
+            (WeatherCheckJob(match_id=match_id, run_after=now) for match_id in match_ids),
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        WeatherCheckJob.objects.filter(match_id__in=match_ids).update(
+            attempts=0,
+            run_after=now,
+            locked_until=None,
+            failed_at=None,
+            last_error="",
+        )
+
+    def enqueue_upcoming(self: "Self") -> int:
+        """Queue a fresh check of matches whose forecast may have changed."""
+        now = timezone.now()
+        match_ids = list(Match.objects.filter(
+            Q(weather_checked_at__isnull=True) | Q(weather_checked_at__lt=now - self.recheck_after),
+            datetime__gt=now,
+            datetime__lte=now + self.recheck_horizon,
+            host__isnull=False,
+        ).values_list("id", flat=True))
+        self.enqueue(match_ids)
+        return len(match_ids)
+
+    def claim(self: "Self", limit: int) -> "List[WeatherCheckJob]":
+        """Lease due jobs, ``locked_until`` of the returned jobs identifies this claim."""
+        now = timezone.now()
+        lease = now + self.lease
+        with transaction.atomic():
+            jobs = list(
+                WeatherCheckJob.objects.select_for_update(skip_locked=True).filter(
+                    Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+                    failed_at__isnull=True,
+                    run_after__lte=now,
+                ).order_by("run_after")[:limit]
+            )
+            WeatherCheckJob.objects.filter(pk__in=[job.pk for job in jobs]).update(locked_until=lease)
+        for job in jobs:
+            job.locked_until = lease
+        return jobs
+
+    def run_once(self: "Self", limit: int = None) -> int:
+        jobs = self.claim(limit or self.batch_size)
+        matches = Match.objects.select_related("host").filter(pk__in=[job.match_id for job in jobs])
+        try:
+            verdicts, failures = self.client.check_matches(matches)
+        except Exception as error:
+            verdicts, failures = {}, {job.match_id: error for job in jobs}
+        leases = {job.locked_until for job in jobs}
+        self.complete_many(
+            {job.match_id: verdicts[job.match_id] for job in jobs if job.match_id in verdicts},
+            lease=leases.pop() if leases else None,
+        )
+        for job in jobs:
+            if job.match_id not in verdicts:
+                self.retry(job, failures.get(job.match_id, LookupError("Match not found")))
+        return len(jobs)
+
+    def prefetch(self: "Self", matches: "Iterable[Match]") -> int:
+        """Check the weather of ``matches`` right away and drop their queued jobs."""
+        verdicts, _ = self.client.check_matches(matches)
+        self.complete_many(verdicts)
+        return len(verdicts)
+
+    @staticmethod
+    def complete_many(verdicts: "Dict[int, bool]", lease: "Optional[datetime]" = None) -> None:
+        """Store ``verdicts`` and drop their jobs.
+
+        With ``lease`` only jobs still held under that claim are completed, a
+        job re-enqueued meanwhile checks the new host or date instead.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            if lease is not None:
+                held = set(WeatherCheckJob.objects.select_for_update().filter(
+                    match_id__in=list(verdicts),
+                    locked_until=lease,
+                ).values_list("match_id", flat=True))
+                verdicts = {match_id: verdict for match_id, verdict in verdicts.items() if match_id in held}
+            for is_weather_good in (True, False):
+                Match.objects.filter(
+                    pk__in=[match_id for match_id, verdict in verdicts.items() if verdict is is_weather_good],
+                ).update(is_weather_good=is_weather_good, weather_checked_at=now)
+            WeatherCheckJob.objects.filter(match_id__in=list(verdicts)).delete()
+
+    def retry(self: "Self", job: "WeatherCheckJob", error: Exception) -> None:
+        """Back off, unless the job was re-enqueued since it was claimed."""
+        now = timezone.now()
+        attempts = job.attempts + 1
+        WeatherCheckJob.objects.filter(pk=job.pk, locked_until=job.locked_until).update(
+            attempts=attempts,
+            locked_until=None,
+            last_error=repr(error),
+            run_after=now + self.retry_delay * 2 ** (attempts - 1),
+            failed_at=now if attempts >= self.max_attempts else None,
+        )
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from league_planner import settings
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Self, Tuple
+
+
+class WeatherStubHandler(BaseHTTPRequestHandler):
+    server: "WeatherStubServer"
+
+    def do_GET(self: "Self") -> None:
+        url = urlsplit(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        endpoint = url.path.rsplit("/", 1)[-1]
+        if endpoint in WeatherStubServer.endpoints:
+            status_code, body = self.server.respond(endpoint, params)
+        else:
+            status_code, body = 404, WeatherStubServer.error(1005, "API request url is invalid.")
+        payload = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self: "Self", format: str, *args: "Any") -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class WeatherStubServer(ThreadingHTTPServer):
+    """Local stand-in for weatherapi.com serving ``forecast.json`` and ``future.json``.
+
+    Every response waits ``latency`` (+- ``jitter``) seconds and fails with a
+    503 at ``error_rate``. In ``stub`` mode verdicts are derived from a hash
+    of city and date, so repeated runs agree. ``record`` proxies to
+    ``upstream`` and stores the responses in ``fixtures``, ``replay`` serves
+    them back.
+    """
+
+    STUB = "stub"
+    RECORD = "record"
+    REPLAY = "replay"
+    endpoints = ("forecast.json", "future.json")
+    max_forecast_days = 14
+    daemon_threads = True
+
+    def __init__(
+        self: "Self",
+        address: "Tuple[str, int]" = ("127.0.0.1", 0),
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        rain_probability: float = 0.3,
+        seed: "Optional[int]" = None,
+        mode: str = STUB,
+        fixtures: "Optional[str]" = None,
+        upstream: str = "https://api.weatherapi.com/v1/",
+        verbose: bool = False,
+    ) -> None:
+        if mode != self.STUB and fixtures is None:
+            raise ValueError(f"{mode} mode needs a fixtures directory")
+        super().__init__(address, WeatherStubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rain_probability = rain_probability
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.mode = mode
+        self.fixtures = Path(fixtures) if fixtures is not None else None
+        self.upstream = upstream
+        self.verbose = verbose
+        self.thread = None
+
+    @property
+    def base_url(self: "Self") -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self: "Self") -> "Self":
+        self.thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self: "Self") -> None:
+        self.shutdown()
+        self.server_close()
+
+    def respond(self: "Self", endpoint: str, params: "Dict[str, str]") -> "Tuple[int, Dict]":
+        with self.random_lock:
+            delay = max(0.0, self.random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            failed = self.random.random() < self.error_rate
+        time.sleep(delay)
+        if failed:
+            return 503, self.error(9999, "Internal application error.")
+        if not params.get("q"):
+            return 400, self.error(1003, "Parameter q is missing.")
+        if self.mode == self.RECORD:
+            return self.record(endpoint, params)
+        if self.mode == self.REPLAY:
+            return self.replay(endpoint, params)
+        return 200, self.forecast(endpoint, params)
+
+    def forecast(self: "Self", endpoint: str, params: "Dict[str, str]") -> "Dict":
+        if endpoint == "future.json":
+            dates = [params.get("dt", "")]
+        else:
+            today = datetime.now().date()
+            days = min(max(int(params.get("days") or 1), 1), self.max_forecast_days)
+            dates = [
+                (today + timedelta(days=day)).strftime(settings.WEATHER_API_DATE_FORMAT)
+                for day in range(days)
+            ]
+        return {
+            "location": {"name": params["q"]},
+            "forecast": {"forecastday": [
+                {"date": date, "day": {"daily_will_it_rain": int(self.will_it_rain(params["q"], date))}}
+                for date in dates
+            ]},
+        }
+
+    def will_it_rain(self: "Self", city: str, date: str) -> bool:
+        digest = hashlib.sha256(f"{' '.join(city.split()).casefold()}|{date}".encode()).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64 < self.rain_probability
+
+    def record(self: "Self", endpoint: str, params: "Dict[str, str]") -> "Tuple[int, Dict]":
+        try:
+            response = requests.get(f"{self.upstream}{endpoint}", params=params, timeout=(3.05, 10))
+            status_code, body = response.status_code, response.json()
+        except (requests.RequestException, ValueError) as error:
+            return 502, self.error(9999, f"Upstream failed: {error}")
+        if status_code == 200:
+            path = self.fixture_path(endpoint, params)
+            # The longest forecast of a city answers every shorter one.
+            if endpoint == "future.json" or len(self.forecast_days(body)) >= len(self.forecast_days(self.load(path))):
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(body, indent=2), encoding="utf-8")
+        return status_code, body
+
+    def replay(self: "Self", endpoint: str, params: "Dict[str, str]") -> "Tuple[int, Dict]":
+        path = self.fixture_path(endpoint, params)
+        if endpoint == "future.json" and not path.exists():
+            path = self.nearest_future(path, params["dt"])
+        body = self.load(path)
+        if body is None:
+            return 404, self.error(1006, f"No recorded response {path.name}.")
+        if endpoint == "future.json":
+            for forecast in self.forecast_days(body):
+                forecast["date"] = params["dt"]
+            return 200, body
+        # Recorded forecasts start on the day of recording, shift them to today.
+        today = datetime.now().date()
+        days = min(max(int(params.get("days") or 1), 1), self.max_forecast_days)
+        forecasts = self.forecast_days(body)
+        del forecasts[days:]
+        for day, forecast in enumerate(forecasts):
+            forecast["date"] = (today + timedelta(days=day)).strftime(settings.WEATHER_API_DATE_FORMAT)
+        return 200, body
+
+    def fixture_path(self: "Self", endpoint: str, params: "Dict[str, str]") -> "Path":
+        # The API key is left out, fixtures recorded with one key replay for any.
+        # Forecasts are keyed by city alone, the horizon moves with the calendar.
+        city = re.sub(r"[^\w]+", "-", " ".join(params["q"].split()).casefold()).strip("-")
+        name = f"{city}_{params.get('dt')}" if endpoint == "future.json" else city
+        return self.fixtures / endpoint.split(".")[0] / f"{name}.json"
+
+    def nearest_future(self: "Self", path: "Path", dt: str) -> "Path":
+        """The recording of the same city closest to ``dt``, or ``path`` when there is none."""
+        city, _ = path.stem.rsplit("_", 1)
+        wanted = datetime.strptime(dt, settings.WEATHER_API_DATE_FORMAT)
+        recorded = {}
+        for candidate in path.parent.glob(f"{city}_*.json"):
+            prefix, when = candidate.stem.rsplit("_", 1)
+            if prefix != city:
+                continue
+            try:
+                recorded[candidate] = abs(datetime.strptime(when, settings.WEATHER_API_DATE_FORMAT) - wanted)
+            except ValueError:
+                continue
+        return min(recorded, key=recorded.get) if recorded else path
+
+    @staticmethod
+    def load(path: "Path") -> "Optional[Dict]":
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def forecast_days(body: "Optional[Dict]") -> "List[Dict]":
+        return (body or {}).get("forecast", {}).get("forecastday", [])
+
+    @staticmethod
+    def error(code: int, message: str) -> "Dict":
+        return {"error": {"code": code, "message": message}}
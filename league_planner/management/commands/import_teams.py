@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from league_planner.models.league import League
+from league_planner.team_import import TeamImporter
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser
+    from typing import Any, Self
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or NDJSON file of teams into a League."
+
+    def add_arguments(self: "Self", parser: "ArgumentParser") -> None:
+        parser.add_argument("path", help="CSV file with a name,city header or NDJSON file of objects.")
+        parser.add_argument("--league", type=int, required=True)
+        parser.add_argument("--kind", choices=TeamImporter.KINDS, help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=TeamImporter.chunk_size)
+
+    def handle(self: "Self", *args: "Any", **options: "Any") -> None:
+        league = League.objects.filter(pk=options["league"]).first()
+        if league is None:
+            raise CommandError(f"League {options['league']} does not exist")
+        kind = options["kind"] or TeamImporter.detect_kind(file_name=options["path"])
+        if kind is None:
+            raise CommandError("Cannot tell the file kind from its extension, pass --kind")
+        try:
+            with open(options["path"], "rb") as lines:
+                report = TeamImporter(league, options["chunk_size"]).run(lines, kind)
+        except OSError as error:
+            raise CommandError(str(error))
+        for rejected in report["rejected"]:
+            self.stdout.write(f"Line {rejected['line']} rejected: {rejected['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['imported']} teams, rejected {report['rejected_count']} rows"
+        ))
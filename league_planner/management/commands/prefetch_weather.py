@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from league_planner.integrations.weather_jobs import WeatherCheckQueue
+from league_planner.models.match import Match
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser
+    from typing import Any, Self
+
+
+class Command(BaseCommand):
+    help = "Check the weather of upcoming matches in batches of one upstream call per city."
+
+    def add_arguments(self: "Self", parser: "ArgumentParser") -> None:
+        parser.add_argument("--league", type=int, action="append", help="Only prefetch matches of these leagues.")
+        parser.add_argument("--days", type=int, help="Only prefetch matches within that many days.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self: "Self", *args: "Any", **options: "Any") -> None:
+        now = timezone.now()
+        matches = Match.objects.select_related("host").filter(datetime__gt=now, host__isnull=False)
+        if options["league"]:
+            matches = matches.filter(league_id__in=options["league"])
+        if options["days"] is not None:
+            matches = matches.filter(datetime__lte=now + timedelta(days=options["days"]))
+
+        queue = WeatherCheckQueue()
+        transport = queue.client.transport
+        calls = transport.metrics()["calls"]
+        chunk, checked = [], 0
+        for match in matches.order_by("host__city", "datetime").iterator(chunk_size=options["chunk_size"]):
+            chunk.append(match)
+            if len(chunk) == options["chunk_size"]:
+                checked += queue.prefetch(chunk)
+                chunk = []
+        if chunk:
+            checked += queue.prefetch(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked the weather of {checked} matches "
+            f"with {transport.metrics()['calls'] - calls} upstream calls"
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from league_planner.models.standing import Standing
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser
+    from typing import Any, Self
+
+
+class Command(BaseCommand):
+    help = "Rebuild the standings table from matches and report drifted rows."
+
+    def add_arguments(self: "Self", parser: "ArgumentParser") -> None:
+        parser.add_argument("--league", type=int, help="Only rebuild standings of that League.")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift, exit with an error if any row differs.",
+        )
+
+    def handle(self: "Self", *args: "Any", **options: "Any") -> None:
+        drifted = Standing.objects.rebuild(options["league"], dry_run=options["check"])
+        for team_id in drifted:
+            self.stdout.write(f"Standing of team {team_id} drifted")
+        if options["check"] and drifted:
+            raise CommandError(f"{len(drifted)} standings drifted")
+        action = "Checked" if options["check"] else "Rebuilt"
+        self.stdout.write(self.style.SUCCESS(f"{action} standings, {len(drifted)} drifted"))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from league_planner.integrations.weather_stub import WeatherStubServer
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser
+    from typing import Any, Self
+
+
+class Command(BaseCommand):
+    help = "Serve a local stand-in of the weather API, point WEATHER_API_BASE_URL at it."
+
+    def add_arguments(self: "Self", parser: "ArgumentParser") -> None:
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8001)
+        parser.add_argument("--latency", type=float, default=0.15, help="Mean response time in seconds.")
+        parser.add_argument("--jitter", type=float, default=0.05, help="Standard deviation of the response time.")
+        parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests failing with 503.")
+        parser.add_argument("--rain-probability", type=float, default=0.3)
+        parser.add_argument("--seed", type=int, help="Seed of the latency and error profile.")
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument("--record", metavar="DIR", help="Proxy to --upstream and store the responses in DIR.")
+        mode.add_argument("--replay", metavar="DIR", help="Serve the responses recorded in DIR.")
+        parser.add_argument("--upstream", default="https://api.weatherapi.com/v1/")
+        parser.add_argument("--verbose", action="store_true", help="Log every request.")
+
+    def handle(self: "Self", *args: "Any", **options: "Any") -> None:
+        if options["record"]:
+            mode, fixtures = WeatherStubServer.RECORD, options["record"]
+        elif options["replay"]:
+            mode, fixtures = WeatherStubServer.REPLAY, options["replay"]
+        else:
+            mode, fixtures = WeatherStubServer.STUB, None
+        try:
+            server = WeatherStubServer(
+                (options["host"], options["port"]),
+                latency=options["latency"],
+                jitter=options["jitter"],
+                error_rate=options["error_rate"],
+                rain_probability=options["rain_probability"],
+                seed=options["seed"],
+                mode=mode,
+                fixtures=fixtures,
+                upstream=options["upstream"],
+                verbose=options["verbose"],
+            )
+        except OSError as error:
+            raise CommandError(f"Cannot listen on {options['host']}:{options['port']}: {error}")
+        self.stdout.write(self.style.SUCCESS(f"Weather stub ({mode}) listening on {server.base_url}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
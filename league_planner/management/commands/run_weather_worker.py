@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from league_planner.integrations.weather_jobs import WeatherCheckQueue
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser
+    from typing import Any, Self
+
+
+class Command(BaseCommand):
+    help = "Run queued weather checks of matches and periodically re-check upcoming ones."
+
+    def add_arguments(self: "Self", parser: "ArgumentParser") -> None:
+        parser.add_argument("--once", action="store_true", help="Drain the due jobs and exit.")
+        parser.add_argument("--batch-size", type=int, default=WeatherCheckQueue.batch_size)
+        parser.add_argument("--poll-interval", type=float, default=5, help="Seconds between polls.")
+        parser.add_argument(
+            "--recheck-interval",
+            type=float,
+            default=3600,
+            help="Seconds between re-checks of upcoming matches.",
+        )
+
+    def handle(self: "Self", *args: "Any", **options: "Any") -> None:
+        queue = WeatherCheckQueue()
+        next_recheck = time.monotonic()
+        while True:
+            if time.monotonic() >= next_recheck:
+                queued = queue.enqueue_upcoming()
+                self.stdout.write(f"Queued {queued} upcoming matches for a weather re-check")
+                self.stdout.write(f"Weather API metrics: {queue.client.transport.metrics()}")
+                next_recheck = time.monotonic() + options["recheck_interval"]
+            while processed := queue.run_once(options["batch_size"]):
+                self.stdout.write(f"Processed {processed} weather checks")
+            if options["once"]:
+                return
+            time.sleep(options["poll_interval"])
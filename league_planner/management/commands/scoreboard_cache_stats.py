@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from league_planner.cache import ScoreboardCache
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from argparse import ArgumentParser
+    from typing import Any, Self
+
+
+class Command(BaseCommand):
+    help = "Show hit and miss counters of the scoreboard cache, flushed by each process every 100 lookups."
+
+    def add_arguments(self: "Self", parser: "ArgumentParser") -> None:
+        parser.add_argument("--reset", action="store_true", help="Reset the counters afterwards.")
+
+    def handle(self: "Self", *args: "Any", **options: "Any") -> None:
+        scoreboard_cache = ScoreboardCache()
+        stats = scoreboard_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / lookups if lookups else 0
+        self.stdout.write(f"hits: {stats['hits']}, misses: {stats['misses']}, hit ratio: {ratio:.2%}")
+        if options["reset"]:
+            scoreboard_cache.reset_stats()
@@ -0,0 +1,63 @@
+# Generated by Django 4.1.5 on 2026-10-18 10:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_standings(apps, schema_editor):
+    Team = apps.get_model("league_planner", "Team")
+    Match = apps.get_model("league_planner", "Match")
+    Standing = apps.get_model("league_planner", "Standing")
+    standings = {
+        team_id: Standing(team_id=team_id, league_id=league_id)
+        for team_id, league_id in Team.objects.values_list("id", "league_id")
+    }
+    played = Match.objects.filter(host_score__isnull=False, visitor_score__isnull=False)
+    for match in played.iterator():
+        sides = (
+            (match.host_id, match.host_score, match.visitor_score, False),
+            (match.visitor_id, match.visitor_score, match.host_score, True),
+        )
+        for team_id, scored, conceded, as_visitor in sides:
+            standing = standings.get(team_id)
+            if standing is None:
+                continue
+            points = 3 if scored > conceded else 1 if scored == conceded else 0
+            standing.points += points
+            standing.points_as_visitor += points if as_visitor else 0
+            standing.played += 1
+            standing.wins += int(scored > conceded)
+            standing.draws += int(scored == conceded)
+            standing.losses += int(scored < conceded)
+    Standing.objects.bulk_create(standings.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league_planner', '0009_alter_match_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='standing', serialize=False, to='league_planner.team')),
+                ('points', models.IntegerField(default=0)),
+                ('points_as_visitor', models.IntegerField(default=0)),
+                ('played', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='league_planner.league', verbose_name='Standing in that League')),
+            ],
+            options={
+                'ordering': ['-points', '-points_as_visitor', 'team_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='standing',
+            index=models.Index(fields=['league', '-points', '-points_as_visitor', 'team'], name='standing_league_rank_idx'),
+        ),
+        migrations.RunPython(populate_standings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.1.5 on 2026-10-18 10:56
+
+from django.db import migrations, models
+import league_planner.models.league
+
+
+def populate_goals(apps, schema_editor):
+    Match = apps.get_model("league_planner", "Match")
+    Standing = apps.get_model("league_planner", "Standing")
+    standings = Standing.objects.in_bulk()
+    played = Match.objects.filter(host_score__isnull=False, visitor_score__isnull=False)
+    for match in played.iterator():
+        for team_id, scored, conceded in (
+            (match.host_id, match.host_score, match.visitor_score),
+            (match.visitor_id, match.visitor_score, match.host_score),
+        ):
+            standing = standings.get(team_id)
+            if standing is not None:
+                standing.goals_for += scored
+                standing.goals_against += conceded
+    Standing.objects.bulk_update(standings.values(), ["goals_for", "goals_against"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league_planner', '0010_standing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='league',
+            name='points_per_draw',
+            field=models.IntegerField(default=1, verbose_name='Points for a drawn Match'),
+        ),
+        migrations.AddField(
+            model_name='league',
+            name='points_per_lose',
+            field=models.IntegerField(default=0, verbose_name='Points for a lost Match'),
+        ),
+        migrations.AddField(
+            model_name='league',
+            name='points_per_win',
+            field=models.IntegerField(default=3, verbose_name='Points for a won Match'),
+        ),
+        migrations.AddField(
+            model_name='league',
+            name='tiebreakers',
+            field=models.JSONField(default=league_planner.models.league.default_tiebreakers, verbose_name='Ordered tiebreakers of teams level on points'),
+        ),
+        migrations.AddField(
+            model_name='standing',
+            name='goals_against',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='standing',
+            name='goals_for',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_goals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.5 on 2026-10-18 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league_planner', '0011_league_scoring_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=50, verbose_name='Normalized city name')),
+                ('date', models.DateField(verbose_name='Day the forecast is for')),
+                ('is_weather_good', models.BooleanField()),
+                ('expires_at', models.DateTimeField(verbose_name='Time after which the forecast is fetched again')),
+                ('last_used_at', models.DateTimeField(db_index=True, verbose_name='Time of the last lookup, for LRU eviction')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='weatherforecast',
+            constraint=models.UniqueConstraint(fields=('city', 'date'), name='weather_forecast_city_date_unique'),
+        ),
+    ]
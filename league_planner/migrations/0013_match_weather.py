@@ -0,0 +1,39 @@
+# Generated by Django 4.1.5 on 2026-10-18 10:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league_planner', '0012_weatherforecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherCheckJob',
+            fields=[
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='weather_check_job', serialize=False, to='league_planner.match')),
+                ('attempts', models.IntegerField(default=0)),
+                ('run_after', models.DateTimeField(verbose_name='Time from which the job may run')),
+                ('locked_until', models.DateTimeField(null=True, verbose_name='Lease of the worker running the job')),
+                ('failed_at', models.DateTimeField(null=True, verbose_name='Time the job gave up retrying')),
+                ('last_error', models.TextField(default='')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='is_weather_good',
+            field=models.BooleanField(null=True, verbose_name='Weather verdict, unknown until checked'),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='weather_checked_at',
+            field=models.DateTimeField(null=True, verbose_name='Time when the weather was checked'),
+        ),
+        migrations.AddIndex(
+            model_name='weathercheckjob',
+            index=models.Index(fields=['failed_at', 'run_after'], name='weather_job_due_idx'),
+        ),
+    ]
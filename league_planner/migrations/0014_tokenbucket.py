@@ -0,0 +1,21 @@
+# Generated by Django 4.1.5 on 2026-10-18 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league_planner', '0013_match_weather'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenBucket',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.DateTimeField(verbose_name='Time the tokens were last refilled')),
+            ],
+        ),
+    ]
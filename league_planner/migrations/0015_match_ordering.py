@@ -0,0 +1,21 @@
+# Generated by Django 4.1.5 on 2026-10-18 11:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league_planner', '0014_tokenbucket'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='match',
+            options={'ordering': [models.OrderBy(models.F('datetime'), nulls_last=True), 'id'], 'verbose_name_plural': 'matches'},
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['datetime', 'id'], name='match_datetime_id_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.5 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('league_planner', '0015_match_ordering'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['league', 'datetime'], name='match_league_datetime_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['host', 'datetime'], name='match_host_datetime_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['visitor', 'datetime'], name='match_visitor_datetime_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.response import Response
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Self
+    from rest_framework.request import Request
+    from league_planner.serializers.rows import RowSerializer
+
+
+class RowReadMixin:
+    """Serves ``list`` and ``retrieve`` through ``row_serializer`` instead of the model serializer."""
+
+    row_serializer: "RowSerializer" = None
+
+    def list(self: "Self", request: "Request", *args: "Any", **kwargs: "Any") -> "Response":
+        rows = self.row_serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.row_serializer.many(page))
+        return Response(self.row_serializer.many(rows))
+
+    def retrieve(self: "Self", request: "Request", *args: "Any", **kwargs: "Any") -> "Response":
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(self.row_serializer.rows(queryset), **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(request, self.row_serializer.instance(queryset.model, row))
+        return Response(self.row_serializer.to_representation(row))
@@ -1,8 +1,27 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+
+from league_planner.cache import ScoreboardCache
+from league_planner.models.standing import Standing
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, List, Optional, Self
+
+TIEBREAKERS = ("goal_difference", "goals_scored", "head_to_head", "away_points")
+
+
+def default_tiebreakers() -> "List[str]":
+    return ["away_points"]
 
 
 class League(models.Model):
+    POINTS_PER_WIN = 3
+    POINTS_PER_DRAW = 1
+    POINTS_PER_LOSE = 0
+    RULE_FIELDS = ("points_per_win", "points_per_draw", "points_per_lose")
+
     name = models.CharField(
         max_length=50,
         unique=True,
@@ -13,6 +32,73 @@ class League(models.Model):
         verbose_name="Owner of League",
         related_name="owners",
     )
+    points_per_win = models.IntegerField(
+        default=POINTS_PER_WIN,
+        verbose_name="Points for a won Match",
+    )
+    points_per_draw = models.IntegerField(
+        default=POINTS_PER_DRAW,
+        verbose_name="Points for a drawn Match",
+    )
+    points_per_lose = models.IntegerField(
+        default=POINTS_PER_LOSE,
+        verbose_name="Points for a lost Match",
+    )
+    tiebreakers = models.JSONField(
+        default=default_tiebreakers,
+        verbose_name="Ordered tiebreakers of teams level on points",
+    )
 
     class Meta:
         ordering = ["id"]
+
+    def points(self: "Self", scored: int, conceded: int) -> int:
+        if scored > conceded:
+            return self.points_per_win
+        if scored == conceded:
+            return self.points_per_draw
+        return self.points_per_lose
+
+    def ranking_key(
+        self: "Self",
+        team_id: int,
+        score: int,
+        score_as_visitor: int = 0,
+        goals_for: int = 0,
+        goals_against: int = 0,
+        head_to_head: int = 0,
+    ) -> tuple:
+        tiebreaks = {
+            "goal_difference": goals_for - goals_against,
+            "goals_scored": goals_for,
+            "head_to_head": head_to_head,
+            "away_points": score_as_visitor,
+        }
+        return (-score, *(-tiebreaks[tiebreaker] for tiebreaker in self.tiebreakers), team_id)
+
+    def scoreboard_ordering(self: "Self") -> "Optional[List[str]]":
+        """Ordering of an annotated scoreboard queryset, None when it needs head-to-head."""
+        if "head_to_head" in self.tiebreakers:
+            return None
+        fields = {
+            "goal_difference": "-goal_difference",
+            "goals_scored": "-goals_for",
+            "away_points": "-score_as_visitor",
+        }
+        return ["-score", *(fields[tiebreaker] for tiebreaker in self.tiebreakers), "id"]
+
+    def save(self: "Self", *args: "Any", **kwargs: "Any") -> None:
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = League.objects.filter(pk=self.pk).values(
+                    *self.RULE_FIELDS,
+                    "tiebreakers",
+                ).first()
+            super().save(*args, **kwargs)
+            if previous is None:
+                return
+            if any(previous[field] != getattr(self, field) for field in self.RULE_FIELDS):
+                Standing.objects.rebuild(self.pk)
+            if previous["tiebreakers"] != self.tiebreakers:
+                ScoreboardCache.invalidate(self.pk)
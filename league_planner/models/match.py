@@ -1,4 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+
+from league_planner.cache import ScoreboardCache
+from league_planner.models.standing import Standing
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Optional, Self, Tuple
 
 
 class Match(models.Model):
@@ -38,6 +46,76 @@ class Match(models.Model):
         verbose_name="Time when match is played",
         null=True,
     )
+    is_weather_good = models.BooleanField(
+        verbose_name="Weather verdict, unknown until checked",
+        null=True,
+    )
+    weather_checked_at = models.DateTimeField(
+        verbose_name="Time when the weather was checked",
+        null=True,
+    )
 
     class Meta:
         verbose_name_plural = "matches"
+        # Unique and indexed so keyset pages can seek instead of counting.
+        ordering = [models.F("datetime").asc(nulls_last=True), "id"]
+        indexes = [
+            models.Index(fields=["datetime", "id"], name="match_datetime_id_idx"),
+            # Calendars of a league or a team, narrowed by a date range.
+            models.Index(fields=["league", "datetime"], name="match_league_datetime_idx"),
+            models.Index(fields=["host", "datetime"], name="match_host_datetime_idx"),
+            models.Index(fields=["visitor", "datetime"], name="match_visitor_datetime_idx"),
+        ]
+
+    @property
+    def weather_status(self: "Self") -> str:
+        return self.weather_status_of(self.is_weather_good)
+
+    @staticmethod
+    def weather_status_of(is_weather_good: "Optional[bool]") -> str:
+        if is_weather_good is None:
+            return "pending"
+        return "good" if is_weather_good else "bad"
+
+    @property
+    def has_result(self: "Self") -> bool:
+        return self.host_score is not None and self.visitor_score is not None
+
+    def points(self: "Self") -> "Tuple[int, int]":
+        return (
+            self.league.points(self.host_score, self.visitor_score),
+            self.league.points(self.visitor_score, self.host_score),
+        )
+
+    def result_key(self: "Self") -> tuple:
+        return self.host_id, self.visitor_id, self.host_score, self.visitor_score
+
+    def save(self: "Self", *args: "Any", **kwargs: "Any") -> None:
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = Match.objects.select_for_update(of=("self",)).select_related(
+                    "league",
+                ).filter(pk=self.pk).first()
+            super().save(*args, **kwargs)
+            ScoreboardCache.invalidate(self.league_id, previous and previous.league_id)
+            if previous is not None and previous.result_key() == self.result_key():
+                return
+            if previous is not None:
+                # Share the league loaded with the previous row, points() needs it on both.
+                if previous.league_id == self.league_id:
+                    if Match.league.is_cached(self):
+                        previous.league = self.league
+                    else:
+                        self.league = previous.league
+                Standing.objects.record(previous, sign=-1)
+            Standing.objects.record(self)
+
+    def delete(self: "Self", *args: "Any", **kwargs: "Any") -> "Tuple[int, dict]":
+        with transaction.atomic():
+            previous = Match.objects.select_for_update().filter(pk=self.pk).first()
+            deleted = super().delete(*args, **kwargs)
+            ScoreboardCache.invalidate(self.league_id)
+            if previous is not None:
+                Standing.objects.record(previous, sign=-1)
+        return deleted
@@ -0,0 +1,218 @@
+from django.db import models, transaction
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from league_planner.cache import ScoreboardCache
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Self
+    from django.db.models import Aggregate, QuerySet
+    from league_planner.models.match import Match
+
+COUNTERS = (
+    "points",
+    "points_as_visitor",
+    "played",
+    "wins",
+    "draws",
+    "losses",
+    "goals_for",
+    "goals_against",
+)
+
+
+class StandingManager(models.Manager):
+    def record(self: "Self", match: "Match", sign: int = 1) -> None:
+        """Add (``sign=1``) or withdraw (``sign=-1``) the result of ``match``."""
+        deltas = {}
+        self.collect(deltas, match, sign)
+        self.apply(deltas)
+
+    def collect(self: "Self", deltas: "Dict[int, Dict[str, int]]", match: "Match", sign: int = 1) -> None:
+        """Sum the result of ``match`` into per-team ``deltas``, to apply many results at once."""
+        for team_id, counters in self.match_counters(match).items():
+            team_deltas = deltas.setdefault(team_id, dict.fromkeys(COUNTERS, 0))
+            for field, value in counters.items():
+                team_deltas[field] += sign * value
+
+    def apply(self: "Self", deltas: "Dict[int, Dict[str, int]]") -> None:
+        """Add ``deltas`` in two queries, however many teams they touch.
+
+        The standings are locked in team order, so concurrent writers wait
+        for each other instead of deadlocking, and are written in one
+        ``bulk_update``. Must run inside a transaction.
+        """
+        changed = {team_id: counters for team_id, counters in deltas.items() if any(counters.values())}
+        if not changed:
+            return
+        standings = list(self.select_for_update().filter(team_id__in=changed).order_by("team_id"))
+        for standing in standings:
+            for field, value in changed[standing.team_id].items():
+                setattr(standing, field, getattr(standing, field) + value)
+        self.bulk_update(standings, COUNTERS)
+
+    @staticmethod
+    def match_counters(match: "Match") -> "Dict[int, Dict[str, int]]":
+        if not match.has_result:
+            return {}
+        host_points, visitor_points = match.points()
+        sides = (
+            (match.host_id, match.host_score, match.visitor_score, host_points, 0),
+            (match.visitor_id, match.visitor_score, match.host_score, visitor_points, visitor_points),
+        )
+        counters = {}
+        for team_id, scored, conceded, points, points_as_visitor in sides:
+            if team_id is None:
+                continue
+            counters[team_id] = {
+                "points": points,
+                "points_as_visitor": points_as_visitor,
+                "played": 1,
+                "wins": int(scored > conceded),
+                "draws": int(scored == conceded),
+                "losses": int(scored < conceded),
+                "goals_for": scored,
+                "goals_against": conceded,
+            }
+        return counters
+
+    def tally(self: "Self", league_id: "Optional[int]" = None) -> "QuerySet":
+        """Teams annotated with standings aggregated from matches in one statement.
+
+        Host and visitor results are grouped by team in correlated subqueries,
+        so no match row leaves the database and the ordering happens there too.
+        A single GROUP BY would join matches on host OR visitor, which the ORM
+        cannot express, and joining both sides multiplies the rows and the
+        goal sums. Each subquery is served by the host or visitor index.
+        Points follow the scoring rules of the team's League.
+        """
+        from league_planner.models.team import Team
+
+        teams = Team.objects.all() if league_id is None else Team.objects.filter(league_id=league_id)
+        teams = teams.annotate(
+            **self.side_totals("host", "host_score", "visitor_score"),
+            **self.side_totals("visitor", "visitor_score", "host_score"),
+        )
+        wins = F("host_wins") + F("visitor_wins")
+        draws = F("host_draws") + F("visitor_draws")
+        losses = F("host_losses") + F("visitor_losses")
+        return teams.annotate(
+            wins=wins,
+            draws=draws,
+            losses=losses,
+            played=wins + draws + losses,
+            points=self.points_expression(wins, draws, losses),
+            points_as_visitor=self.points_expression(
+                F("visitor_wins"),
+                F("visitor_draws"),
+                F("visitor_losses"),
+            ),
+            goals_for=F("host_goals_for") + F("visitor_goals_for"),
+            goals_against=F("host_goals_against") + F("visitor_goals_against"),
+        ).order_by("-points", "-points_as_visitor", "id")
+
+    @staticmethod
+    def points_expression(wins: "F", draws: "F", losses: "F") -> "ExpressionWrapper":
+        return ExpressionWrapper(
+            wins * F("league__points_per_win")
+            + draws * F("league__points_per_draw")
+            + losses * F("league__points_per_lose"),
+            output_field=IntegerField(),
+        )
+
+    @staticmethod
+    def side_totals(side: str, scored: str, conceded: str) -> "Dict[str, Coalesce]":
+        from league_planner.models.match import Match
+
+        matches = Match.objects.filter(
+            **{side: OuterRef("pk")},
+            host_score__isnull=False,
+            visitor_score__isnull=False,
+        ).order_by().values(side)
+
+        def total(aggregate: "Aggregate", **lookup: "Any") -> "Coalesce":
+            totals = matches.filter(**lookup).annotate(total=aggregate).values("total")
+            return Coalesce(Subquery(totals, output_field=IntegerField()), 0)
+
+        return {
+            f"{side}_wins": total(Count("pk"), **{f"{scored}__gt": F(conceded)}),
+            f"{side}_draws": total(Count("pk"), **{scored: F(conceded)}),
+            f"{side}_losses": total(Count("pk"), **{f"{scored}__lt": F(conceded)}),
+            f"{side}_goals_for": total(Sum(scored)),
+            f"{side}_goals_against": total(Sum(conceded)),
+        }
+
+    def compute(self: "Self", league_id: "Optional[int]" = None) -> "Dict[int, Dict[str, int]]":
+        return {
+            row.pop("id"): row
+            for row in self.tally(league_id).values("id", *COUNTERS).iterator()
+        }
+
+    def rebuild(self: "Self", league_id: "Optional[int]" = None, dry_run: bool = False) -> "List[int]":
+        """Recompute standings, return ids of teams whose stored row drifted."""
+        from league_planner.models.team import Team
+
+        with transaction.atomic():
+            expected = self.compute(league_id)
+            stored = {
+                standing.team_id: standing
+                for standing in self.select_for_update().filter(team_id__in=expected)
+            }
+            leagues = dict(Team.objects.filter(id__in=expected).values_list("id", "league_id"))
+            drifted, to_create, to_update = [], [], []
+            for team_id, counters in expected.items():
+                standing = stored.get(team_id)
+                if standing is None:
+                    standing = self.model(team_id=team_id, league_id=leagues[team_id])
+                    to_create.append(standing)
+                elif (
+                    standing.league_id == leagues[team_id]
+                    and all(getattr(standing, field) == value for field, value in counters.items())
+                ):
+                    continue
+                else:
+                    to_update.append(standing)
+                drifted.append(team_id)
+                standing.league_id = leagues[team_id]
+                for field, value in counters.items():
+                    setattr(standing, field, value)
+            if not dry_run:
+                self.bulk_create(to_create)
+                self.bulk_update(to_update, ("league", *COUNTERS))
+                ScoreboardCache.invalidate(*{leagues[team_id] for team_id in drifted})
+        return sorted(drifted)
+
+
+class Standing(models.Model):
+    team = models.OneToOneField(
+        "league_planner.Team",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="standing",
+    )
+    league = models.ForeignKey(
+        "league_planner.League",
+        on_delete=models.CASCADE,
+        verbose_name="Standing in that League",
+    )
+    points = models.IntegerField(default=0)
+    points_as_visitor = models.IntegerField(default=0)
+    played = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    goals_for = models.IntegerField(default=0)
+    goals_against = models.IntegerField(default=0)
+
+    objects = StandingManager()
+
+    class Meta:
+        ordering = ["-points", "-points_as_visitor", "team_id"]
+        indexes = [
+            models.Index(
+                fields=["league", "-points", "-points_as_visitor", "team"],
+                name="standing_league_rank_idx",
+            ),
+        ]
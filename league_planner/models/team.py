@@ -1,4 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+
+from league_planner.cache import ScoreboardCache
+from league_planner.models.standing import Standing
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Self, Tuple
 
 
 class Team(models.Model):
@@ -19,3 +27,25 @@ class Team(models.Model):
 
     class Meta:
         ordering = ["id"]
+
+    def save(self: "Self", *args: "Any", **kwargs: "Any") -> None:
+        # Deleting a team needs no counterpart: its standing cascades, and
+        # opponents keep the points of matches whose side is SET_NULL.
+        with transaction.atomic():
+            previous_league_id = None
+            if self.pk is not None:
+                previous_league_id = Standing.objects.filter(
+                    team_id=self.pk,
+                ).values_list("league_id", flat=True).first()
+            super().save(*args, **kwargs)
+            if previous_league_id is None:
+                Standing.objects.create(team=self, league_id=self.league_id)
+            elif previous_league_id != self.league_id:
+                Standing.objects.filter(team=self).update(league_id=self.league_id)
+            ScoreboardCache.invalidate(self.league_id, previous_league_id)
+
+    def delete(self: "Self", *args: "Any", **kwargs: "Any") -> "Tuple[int, dict]":
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            ScoreboardCache.invalidate(self.league_id)
+        return deleted
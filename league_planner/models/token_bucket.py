@@ -0,0 +1,39 @@
+from django.db import models, transaction
+from django.utils import timezone
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Self
+
+
+class TokenBucketManager(models.Manager):
+    def acquire(self: "Self", name: str, rate: float, capacity: float) -> bool:
+        """Take a token from bucket ``name`` refilled at ``rate`` tokens per second.
+
+        The row lock serializes processes sharing the bucket.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            bucket = self.select_for_update().filter(pk=name).first()
+            if bucket is None:
+                self.bulk_create([TokenBucket(name=name, tokens=capacity, updated_at=now)], ignore_conflicts=True)
+                bucket = self.select_for_update().get(pk=name)
+            elapsed = max((now - bucket.updated_at).total_seconds(), 0)
+            bucket.tokens = min(capacity, bucket.tokens + elapsed * rate)
+            bucket.updated_at = max(now, bucket.updated_at)
+            acquired = bucket.tokens >= 1
+            if acquired:
+                bucket.tokens -= 1
+            bucket.save(update_fields=["tokens", "updated_at"])
+        return acquired
+
+
+class TokenBucket(models.Model):
+    name = models.CharField(max_length=50, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField(
+        verbose_name="Time the tokens were last refilled",
+    )
+
+    objects = TokenBucketManager()
@@ -0,0 +1,51 @@
+from django.db import models
+
+
+class WeatherForecast(models.Model):
+    city = models.CharField(
+        max_length=50,
+        verbose_name="Normalized city name",
+    )
+    date = models.DateField(
+        verbose_name="Day the forecast is for",
+    )
+    is_weather_good = models.BooleanField()
+    expires_at = models.DateTimeField(
+        verbose_name="Time after which the forecast is fetched again",
+    )
+    last_used_at = models.DateTimeField(
+        verbose_name="Time of the last lookup, for LRU eviction",
+        db_index=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["city", "date"], name="weather_forecast_city_date_unique"),
+        ]
+
+
+class WeatherCheckJob(models.Model):
+    match = models.OneToOneField(
+        "league_planner.Match",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="weather_check_job",
+    )
+    attempts = models.IntegerField(default=0)
+    run_after = models.DateTimeField(
+        verbose_name="Time from which the job may run",
+    )
+    locked_until = models.DateTimeField(
+        verbose_name="Lease of the worker running the job",
+        null=True,
+    )
+    failed_at = models.DateTimeField(
+        verbose_name="Time the job gave up retrying",
+        null=True,
+    )
+    last_error = models.TextField(default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["failed_at", "run_after"], name="weather_job_due_idx"),
+        ]
@@ -1,7 +1,186 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime, time
+from functools import reduce
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Self, Sequence, Tuple, Union
+    from django.db.models import Model, QuerySet
+    from rest_framework.request import Request
+    from rest_framework.views import APIView
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps the microseconds DjangoJSONEncoder drops, a cursor must seek to the exact row."""
+
+    def default(self: "Self", o: "Any") -> "Any":
+        if isinstance(o, (datetime, time)):
+            return o.isoformat()
+        return super().default(o)
 
 
 class Pagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over a unique composite ordering, ascending with nulls last.
+
+    Pages are found by a WHERE on the ordering columns instead of an OFFSET and
+    nothing is counted, so every page costs the same. Cursors are opaque
+    base64 encoded positions.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = Pagination.page_size
+    page_size_query_param = Pagination.page_size_query_param
+    max_page_size = Pagination.max_page_size
+
+    def __init__(self: "Self", ordering: "Sequence[str]") -> None:
+        self.ordering = tuple(ordering)
+
+    def paginate_queryset(
+        self: "Self",
+        queryset: "QuerySet",
+        request: "Request",
+        view: "Optional[APIView]" = None,
+    ) -> "List[Model]":
+        self.request = request
+        self.nullable = {name: queryset.model._meta.get_field(name).null for name in self.ordering}
+        page_size = self.get_page_size(request)
+        position, self.reverse = self.decode_cursor(queryset.model, request)
+        if position is not None:
+            queryset = queryset.filter(self.before(position) if self.reverse else self.after(position))
+        rows = list(queryset.order_by(*self.order_by(self.reverse))[:page_size + 1])
+        more = len(rows) > page_size
+        self.page = rows[:page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = more, position is not None
+        else:
+            self.has_previous, self.has_next = position is not None, more
+        return self.page
+
+    def get_paginated_response(self: "Self", data: "Any") -> "Response":
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_page_size(self: "Self", request: "Request") -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_next_link(self: "Self") -> "Optional[str]":
+        if not self.has_next or not self.page:
+            return None
+        return self.link(self.page[-1], reverse=False)
+
+    def get_previous_link(self: "Self") -> "Optional[str]":
+        if not self.has_previous or not self.page:
+            return None
+        return self.link(self.page[0], reverse=True)
+
+    def link(self: "Self", instance: "Union[Model, Dict[str, Any]]", reverse: bool) -> str:
+        # Pages of values() querysets hold dicts.
+        if isinstance(instance, dict):
+            position = [instance[name] for name in self.ordering]
+        else:
+            position = [getattr(instance, name) for name in self.ordering]
+        cursor = json.dumps({"p": position, "r": reverse}, cls=CursorEncoder)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, urlsafe_b64encode(cursor.encode()).decode())
+
+    def decode_cursor(self: "Self", model: "type", request: "Request") -> "Tuple[Optional[list], bool]":
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode()))
+            values = cursor["p"]
+            if len(values) != len(self.ordering):
+                raise ValueError(encoded)
+            position = [
+                None if value is None else model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+            return position, bool(cursor["r"])
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound("Invalid cursor")
+
+    def order_by(self: "Self", reverse: bool) -> list:
+        if reverse:
+            return [F(name).desc(nulls_first=True) for name in self.ordering]
+        return [F(name).asc(nulls_last=True) for name in self.ordering]
+
+    def after(self: "Self", position: "Sequence[Any]") -> "Q":
+        return self.compare(position, self.greater)
+
+    def before(self: "Self", position: "Sequence[Any]") -> "Q":
+        return self.compare(position, self.less)
+
+    def compare(self: "Self", position: "Sequence[Any]", strictly: "Any") -> "Q":
+        # (a, b) > (x, y) expands to a > x OR (a = x AND b > y), with None sorting last.
+        terms = []
+        for index, name in enumerate(self.ordering):
+            term = strictly(name, position[index])
+            if term is None:
+                continue
+            for previous, value in zip(self.ordering[:index], position[:index]):
+                term &= Q(**{f"{previous}__isnull": True}) if value is None else Q(**{previous: value})
+            terms.append(term)
+        return reduce(lambda left, right: left | right, terms, Q(pk__in=[]))
+
+    def greater(self: "Self", name: str, value: "Any") -> "Optional[Q]":
+        if value is None:
+            return None
+        term = Q(**{f"{name}__gt": value})
+        return term | Q(**{f"{name}__isnull": True}) if self.nullable[name] else term
+
+    def less(self: "Self", name: str, value: "Any") -> "Q":
+        if value is None:
+            return Q(**{f"{name}__isnull": False})
+        return Q(**{f"{name}__lt": value})
+
+
+class OptInKeysetPagination(Pagination):
+    """Page numbers by default, keyset cursors with ``?pagination=cursor``.
+
+    The viewset names its unique ordering in ``cursor_ordering``.
+    """
+
+    mode_query_param = "pagination"
+
+    def paginate_queryset(
+        self: "Self",
+        queryset: "QuerySet",
+        request: "Request",
+        view: "Optional[APIView]" = None,
+    ) -> "Optional[List[Model]]":
+        self.keyset = None
+        if request.query_params.get(self.mode_query_param) == "cursor":
+            self.keyset = KeysetPagination(view.cursor_ordering)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self: "Self", data: "Any") -> "Response":
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,54 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from typing import TYPE_CHECKING
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    from typing import Any, IO, Mapping, Optional, Self
+
+
+class StreamParser(BaseParser):
+    """Hands the request body over unread, so large uploads can be streamed."""
+
+    def parse(
+        self: "Self",
+        stream: "IO[bytes]",
+        media_type: "Optional[str]" = None,
+        parser_context: "Optional[Mapping[str, Any]]" = None,
+    ) -> "IO[bytes]":
+        return stream
+
+
+class CSVStreamParser(StreamParser):
+    media_type = "text/csv"
+
+
+class NDJSONStreamParser(StreamParser):
+    media_type = "application/x-ndjson"
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser on orjson when it is installed, the stdlib one otherwise."""
+
+    def parse(
+        self: "Self",
+        stream: "IO[bytes]",
+        media_type: "Optional[str]" = None,
+        parser_context: "Optional[Mapping[str, Any]]" = None,
+    ) -> "Any":
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace("-", "") != "utf8":
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, LookupError) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from typing import TYPE_CHECKING
 
 from rest_framework import permissions
@@ -5,12 +6,32 @@ from rest_framework import permissions
 from league_planner.models.league import League
 
 if TYPE_CHECKING:
-    from django.contrib.auth.models import User
     from rest_framework.viewsets import GenericViewSet
-    from typing import Any, Self
+    from typing import Any, Dict, Iterable, Self
     from rest_framework.request import Request
 
 
+def league_owner_ids(request: "Request", league_ids: "Iterable[Any]") -> "Dict[int, int]":
+    """Map existing league ids to their owner ids, fetching each league once per request.
+
+    Ids that are not integers or not leagues are left out.
+    """
+    owners = getattr(request, "league_owners", None)
+    if owners is None:
+        owners = request.league_owners = {}
+    wanted = set()
+    for league_id in league_ids:
+        try:
+            wanted.add(int(league_id))
+        except (TypeError, ValueError):
+            continue
+    missing = wanted.difference(owners)
+    if missing:
+        owners.update(dict.fromkeys(missing))
+        owners.update(League.objects.filter(pk__in=missing).order_by().values_list("id", "owner_id"))
+    return {league_id: owners[league_id] for league_id in wanted if owners[league_id] is not None}
+
+
 class IsLeagueOwner(permissions.BasePermission):
     def has_object_permission(
         self: "Self",
@@ -20,25 +41,27 @@ class IsLeagueOwner(permissions.BasePermission):
     ) -> bool:
         if request.method in permissions.SAFE_METHODS:
             return True
-        return self.is_owner(request.user, league)
+        return self.is_owner(request, league)
 
     @staticmethod
-    def is_owner(user: "User", league: "League") -> bool:
-        return user == league.owner
+    def is_owner(request: "Request", league: "League") -> bool:
+        return league.owner_id == request.user.pk
 
 
 class IsLeagueResourceOwner(IsLeagueOwner):
     @staticmethod
-    def is_owner(user: "User", obj: "Any") -> bool:
-        return user == obj.league.owner
+    def is_owner(request: "Request", obj: "Any") -> bool:
+        return league_owner_ids(request, [obj.league_id]).get(obj.league_id) == request.user.pk
 
     def has_permission(
         self: "Self",
         request: "Request",
         view: "GenericViewSet",
     ) -> bool:
-        if request.method == "POST":
-            league = League.objects.get(id=request.data.get("league"))
-            if request.user != league.owner:
+        # A league the request moves a resource into must be the user's too. Unknown
+        # leagues pass here and are rejected by the serializer.
+        if request.method not in permissions.SAFE_METHODS and isinstance(request.data, Mapping):
+            owners = league_owner_ids(request, [request.data.get("league")])
+            if any(owner_id != request.user.pk for owner_id in owners.values()):
                 return False
         return super().has_permission(request, view)
@@ -0,0 +1,62 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from typing import TYPE_CHECKING
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+if TYPE_CHECKING:
+    from typing import Any, Mapping, Optional, Self
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer on orjson when it is installed, with the same output.
+
+    Datetimes and the other types orjson would format its own way go through
+    DRF's encoder. Indented output, e.g. for the browsable API, and a missing
+    orjson use the stdlib renderer.
+    """
+
+    options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+    def render(
+        self: "Self",
+        data: "Any",
+        accepted_media_type: "Optional[str]" = None,
+        renderer_context: "Optional[Mapping[str, Any]]" = None,
+    ) -> bytes:
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        # Escaped like JSONRenderer does, for JSON embedded in JavaScript.
+        return orjson.dumps(data, default=JSONEncoder().default, option=self.options).replace(
+            "\u2028".encode(), b"\\u2028",
+        ).replace("\u2029".encode(), b"\\u2029")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Binary responses for ``Accept: application/msgpack``, listed only when msgpack is installed."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(
+        self: "Self",
+        data: "Any",
+        accepted_media_type: "Optional[str]" = None,
+        renderer_context: "Optional[Mapping[str, Any]]" = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
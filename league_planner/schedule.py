@@ -0,0 +1,86 @@
+from datetime import timedelta
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from league_planner.integrations.weather_jobs import WeatherCheckQueue
+from league_planner.models.match import Match
+from league_planner.models.team import Team
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from typing import Hashable, Iterator, List, Self, Sequence, Tuple
+    from league_planner.models.league import League
+
+
+def round_robin(teams: "Sequence[Hashable]", double: bool = False) -> "Iterator[List[Tuple[Hashable, Hashable]]]":
+    """Yield the ``(host, visitor)`` pairs of every round using the circle method.
+
+    The last team stays in place while the others rotate, an odd team count
+    gets a bye. Every team hosts as often as it visits, give or take one
+    match, and the second leg of a double round robin swaps the hosts.
+    """
+    teams = list(teams)
+    if len(teams) % 2:
+        teams.append(None)
+    rotating = len(teams) - 1
+    legs = (False, True) if double else (False,)
+    for swapped in legs:
+        for round_number in range(rotating):
+            pairs = []
+            for position in range(len(teams) // 2):
+                host = teams[(round_number + position) % rotating]
+                if position == 0:
+                    visitor = teams[rotating]
+                    if round_number % 2:
+                        host, visitor = visitor, host
+                else:
+                    visitor = teams[(round_number - position) % rotating]
+                if host is None or visitor is None:
+                    continue
+                pairs.append((visitor, host) if swapped else (host, visitor))
+            yield pairs
+
+
+class ScheduleGenerator:
+    """Writes a round robin season of a League in streamed ``bulk_create`` batches."""
+
+    batch_size = 5000
+
+    def __init__(self: "Self", league: "League", start: "datetime", interval: "timedelta", double: bool) -> None:
+        self.league = league
+        self.start = start
+        self.interval = interval
+        self.double = double
+
+    def matches(self: "Self") -> "Iterator[Match]":
+        cities = dict(Team.objects.filter(league=self.league).order_by("id").values_list("id", "city"))
+        for round_number, pairs in enumerate(round_robin(list(cities), self.double)):
+            match_datetime = self.start + self.interval * round_number
+            for host_id, visitor_id in pairs:
+                yield Match(
+                    league=self.league,
+                    host_id=host_id,
+                    visitor_id=visitor_id,
+                    address=cities[host_id],
+                    datetime=match_datetime,
+                )
+
+    def rounds(self: "Self", teams_count: int) -> int:
+        return (teams_count - 1 + teams_count % 2) * (2 if self.double else 1)
+
+    def save(self: "Self") -> int:
+        """Insert the whole season in one transaction, return the number of matches."""
+        created = 0
+        horizon = timezone.now() + WeatherCheckQueue.recheck_horizon
+        matches = self.matches()
+        with transaction.atomic():
+            while batch := list(islice(matches, self.batch_size)):
+                Match.objects.bulk_create(batch)
+                created += len(batch)
+                # Later matches are queued by the worker's periodic re-check.
+                WeatherCheckQueue().enqueue(match.pk for match in batch if match.datetime <= horizon)
+        return created
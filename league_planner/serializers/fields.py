@@ -0,0 +1,16 @@
+from rest_framework.fields import DateTimeField
+
+from league_planner.settings import DEFAULT_DATETIME_FORMAT
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from typing import Optional
+
+# The format of the model serializers, for output built outside of them.
+datetime_field = DateTimeField(format=DEFAULT_DATETIME_FORMAT)
+
+
+def format_datetime(value: "Optional[datetime]") -> "Optional[str]":
+    return None if value is None else datetime_field.to_representation(value)
@@ -1,14 +1,39 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
-from league_planner.models.league import League
+from league_planner.models.league import League, TIEBREAKERS
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import List, Self
 
 
 class LeagueSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
     name = serializers.CharField()
     owner = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+    points_per_win = serializers.IntegerField(required=False)
+    points_per_draw = serializers.IntegerField(required=False)
+    points_per_lose = serializers.IntegerField(required=False)
+    tiebreakers = serializers.ListField(
+        child=serializers.ChoiceField(choices=TIEBREAKERS),
+        required=False,
+    )
 
     class Meta:
         model = League
-        fields = ("id", "name", "owner")
+        fields = (
+            "id",
+            "name",
+            "owner",
+            "points_per_win",
+            "points_per_draw",
+            "points_per_lose",
+            "tiebreakers",
+        )
+
+    def validate_tiebreakers(self: "Self", tiebreakers: "List[str]") -> "List[str]":
+        if len(set(tiebreakers)) != len(tiebreakers):
+            raise serializers.ValidationError("Tiebreakers must not repeat.")
+        return tiebreakers
@@ -33,6 +33,15 @@ class MatchSerializer(serializers.ModelSerializer):
         required=False,
         format=DEFAULT_DATETIME_FORMAT,
     )
+    is_weather_good = serializers.BooleanField(
+        read_only=True,
+        allow_null=True,
+    )
+    weather_status = serializers.CharField(read_only=True)
+    weather_checked_at = serializers.DateTimeField(
+        read_only=True,
+        format=DEFAULT_DATETIME_FORMAT,
+    )
 
     class Meta:
         model = Match
@@ -45,4 +54,7 @@ class MatchSerializer(serializers.ModelSerializer):
             "visitor_score",
             "address",
             "datetime",
+            "is_weather_good",
+            "weather_status",
+            "weather_checked_at",
         )
@@ -0,0 +1,39 @@
+from rest_framework import serializers
+
+from league_planner.models.league import League
+from league_planner.models.team import Team
+from league_planner.serializers.match import MatchSerializer
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from django.db.models import Model
+    from typing import Any, Self
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves primary keys from ``context["prefetched"]`` instead of one query per value."""
+
+    def to_internal_value(self: "Self", data: "Any") -> "Model":
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        instance = self.context["prefetched"][self.queryset.model].get(pk)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
+class MatchBulkSerializer(MatchSerializer):
+    league = PrefetchedPrimaryKeyRelatedField(queryset=League.objects.all())
+    host = PrefetchedPrimaryKeyRelatedField(
+        queryset=Team.objects.all(),
+        required=False,
+    )
+    visitor = PrefetchedPrimaryKeyRelatedField(
+        queryset=Team.objects.all(),
+        required=False,
+    )
@@ -0,0 +1,7 @@
+from rest_framework import serializers
+
+
+class MatchScoreSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    host_score = serializers.IntegerField(allow_null=True)
+    visitor_score = serializers.IntegerField(allow_null=True)
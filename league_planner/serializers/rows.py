@@ -0,0 +1,84 @@
+from collections import OrderedDict
+
+from django.core.exceptions import ImproperlyConfigured
+
+from league_planner.models.match import Match
+from league_planner.serializers.fields import format_datetime
+from league_planner.serializers.match import MatchSerializer
+from league_planner.serializers.team import TeamSerializer
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Iterable, List, Self
+    from django.db.models import Model, QuerySet
+    from rest_framework.serializers import ModelSerializer
+
+
+class RowSerializer:
+    """Read-only twin of a ModelSerializer that renders ``values()`` rows.
+
+    Lists skip building model instances and running field objects per row.
+    ``columns`` maps every output field to the column it is read from and
+    ``converters`` lists the fields whose column value needs formatting. The
+    output must stay identical to ``serializer_class``, whose fields
+    ``columns`` is checked against when the subclass is defined.
+    """
+
+    serializer_class: "ModelSerializer" = None
+    columns: "Dict[str, str]" = {}
+    converters: "Dict[str, Callable[[Any], Any]]" = {}
+
+    def __init_subclass__(cls: "type", **kwargs: "Any") -> None:
+        super().__init_subclass__(**kwargs)
+        fields = tuple(cls.serializer_class.Meta.fields)
+        if tuple(cls.columns) != fields:
+            raise ImproperlyConfigured(
+                f"{cls.__name__}.columns must list the fields of {cls.serializer_class.__name__}: {fields}"
+            )
+
+    def __init__(self: "Self") -> None:
+        self.plan = [(field, column, self.converters.get(field)) for field, column in self.columns.items()]
+
+    def rows(self: "Self", queryset: "QuerySet") -> "QuerySet":
+        return queryset.values(*dict.fromkeys(self.columns.values()))
+
+    def instance(self: "Self", model: "type", row: "Dict[str, Any]") -> "Model":
+        """A model instance of the row, for object permission checks."""
+        return model(**row)
+
+    def to_representation(self: "Self", row: "Dict[str, Any]") -> "OrderedDict":
+        return OrderedDict(
+            (field, row[column] if convert is None else convert(row[column]))
+            for field, column, convert in self.plan
+        )
+
+    def many(self: "Self", rows: "Iterable[Dict[str, Any]]") -> "List[OrderedDict]":
+        return [self.to_representation(row) for row in rows]
+
+
+class TeamRowSerializer(RowSerializer):
+    serializer_class = TeamSerializer
+    columns = {"id": "id", "league": "league_id", "name": "name", "city": "city"}
+
+
+class MatchRowSerializer(RowSerializer):
+    serializer_class = MatchSerializer
+    columns = {
+        "id": "id",
+        "league": "league_id",
+        "host": "host_id",
+        "host_score": "host_score",
+        "visitor": "visitor_id",
+        "visitor_score": "visitor_score",
+        "address": "address",
+        "datetime": "datetime",
+        "is_weather_good": "is_weather_good",
+        "weather_status": "is_weather_good",
+        "weather_checked_at": "weather_checked_at",
+    }
+    converters = {
+        "datetime": format_datetime,
+        "weather_status": Match.weather_status_of,
+        "weather_checked_at": format_datetime,
+    }
@@ -0,0 +1,7 @@
+from rest_framework import serializers
+
+
+class ScheduleSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    interval_days = serializers.IntegerField(min_value=1, default=7)
+    double = serializers.BooleanField(default=False)
@@ -1,3 +1,4 @@
+from importlib.util import find_spec
 from pathlib import Path
 
 import environ
@@ -9,6 +10,16 @@ environ.Env.read_env()
 DEBUG = env("DEBUG")
 SECRET_KEY = env.str("DJANGO_SECRET_KEY")
 WEATHER_API_SECRET_KEY = env.str("WEATHER_API_SECRET_KEY")
+WEATHER_API_BASE_URL = env.str("WEATHER_API_BASE_URL", default="https://api.weatherapi.com/v1/")
+WEATHER_CACHE_MAX_ENTRIES = env.int("WEATHER_CACHE_MAX_ENTRIES", default=10000)
+WEATHER_API_POOL_SIZE = env.int("WEATHER_API_POOL_SIZE", default=10)
+WEATHER_API_CONNECT_TIMEOUT = env.float("WEATHER_API_CONNECT_TIMEOUT", default=3.05)
+WEATHER_API_READ_TIMEOUT = env.float("WEATHER_API_READ_TIMEOUT", default=10)
+WEATHER_API_RETRIES = env.int("WEATHER_API_RETRIES", default=2)
+WEATHER_API_BREAKER_THRESHOLD = env.int("WEATHER_API_BREAKER_THRESHOLD", default=5)
+WEATHER_API_BREAKER_RESET_TIMEOUT = env.float("WEATHER_API_BREAKER_RESET_TIMEOUT", default=30)
+WEATHER_API_CALLS_PER_MINUTE = env.int("WEATHER_API_CALLS_PER_MINUTE", default=0)
+WEATHER_API_BURST = env.int("WEATHER_API_BURST", default=0)
 
 ALLOWED_HOSTS = ["*"]
 
@@ -56,7 +67,7 @@ WSGI_APPLICATION = 'league_planner.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': env.str("DB_ENGINE", default='django.db.backends.postgresql'),
         'NAME': env.str("DB_NAME"),
         'USER': env.str("DB_USER"),
         'PASSWORD': env.str("DB_PASSWORD"),
@@ -65,6 +76,26 @@ DATABASES = {
     }
 }
 
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": env.str("CACHE_LOCATION", default="/var/tmp/league_planner_cache"),
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": env.str("CACHE_LOCATION", default="league_planner_cache"),
+    },
+}
+
+# locmem is per process, deployments with several worker processes opt into
+# db or file so that scoreboard versions are seen by every process.
+CACHES = {
+    "default": CACHE_BACKENDS[env.str("CACHE_BACKEND", default="locmem")],
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -104,6 +135,17 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # orjson and msgpack are optional, the JSON classes fall back to the stdlib.
+    'DEFAULT_RENDERER_CLASSES': (
+        'league_planner.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        *(('league_planner.renderers.MessagePackRenderer',) if find_spec('msgpack') else ()),
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'league_planner.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 FE_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
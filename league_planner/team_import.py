@@ -0,0 +1,167 @@
+import csv
+import json
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from league_planner.cache import ScoreboardCache
+from league_planner.models.standing import Standing
+from league_planner.models.team import Team
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterable, Iterator, List, Optional, Self, Tuple
+    from league_planner.models.league import League
+
+
+class TeamImporter:
+    """Streams teams from CSV or NDJSON lines into a League chunk by chunk.
+
+    Rows are validated on their own, name collisions are found with one query
+    per chunk and every chunk is committed separately, so a rejected row never
+    aborts the rest of the file.
+    """
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+    KINDS = (CSV, NDJSON)
+    chunk_size = 1000
+    max_reported = 1000
+    retries = 3
+
+    def __init__(self: "Self", league: "League", chunk_size: "Optional[int]" = None) -> None:
+        self.league = league
+        self.chunk_size = chunk_size or self.chunk_size
+        self.imported = 0
+        self.rejected_count = 0
+        self.rejected: "List[Dict[str, Any]]" = []
+        self.name_length = Team._meta.get_field("name").max_length
+        self.city_length = Team._meta.get_field("city").max_length
+
+    @classmethod
+    def detect_kind(cls, content_type: str = "", file_name: str = "") -> "Optional[str]":
+        if content_type.startswith("text/csv") or file_name.endswith(".csv"):
+            return cls.CSV
+        if "ndjson" in content_type or "jsonl" in content_type or file_name.endswith((".ndjson", ".jsonl")):
+            return cls.NDJSON
+        return None
+
+    def run(self: "Self", lines: "Iterable[bytes]", kind: str) -> "Dict[str, Any]":
+        rows = self.csv_rows(lines) if kind == self.CSV else self.ndjson_rows(lines)
+        while chunk := list(islice(rows, self.chunk_size)):
+            self.save_chunk(chunk)
+        if self.imported:
+            ScoreboardCache.invalidate(self.league.pk)
+        return {
+            "imported": self.imported,
+            "rejected_count": self.rejected_count,
+            "rejected": self.rejected,
+        }
+
+    def csv_rows(self: "Self", lines: "Iterable[bytes]") -> "Iterator[Tuple[int, Any]]":
+        # Lines are decoded one by one and the reader is resumed after an error,
+        # so an unreadable line is rejected alone and the rows after it still count.
+        current = {"line": 0}
+
+        def decoded() -> "Iterator[str]":
+            for line_number, line in enumerate(lines, start=1):
+                current["line"] = line_number
+                try:
+                    yield line.decode("utf-8-sig" if line_number == 1 else "utf-8")
+                except UnicodeDecodeError as error:
+                    self.reject(line_number, {"non_field_errors": [f"Unreadable line: {error}"]})
+
+        reader = csv.DictReader(decoded())
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as error:
+                self.reject(current["line"], {"non_field_errors": [f"Unreadable line: {error}"]})
+                continue
+            yield current["line"], row
+
+    def ndjson_rows(self: "Self", lines: "Iterable[bytes]") -> "Iterator[Tuple[int, Any]]":
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as error:
+                yield line_number, error
+
+    def save_chunk(self: "Self", chunk: "List[Tuple[int, Any]]") -> None:
+        rows = []
+        for line_number, row in chunk:
+            team, errors = self.build(row)
+            if errors:
+                self.reject(line_number, errors)
+            else:
+                rows.append((line_number, team))
+        for attempt in range(self.retries):
+            try:
+                with transaction.atomic():
+                    rows = self.drop_collisions(rows)
+                    teams = Team.objects.bulk_create([team for _, team in rows])
+                    Standing.objects.bulk_create(
+                        Standing(team_id=team.pk, league_id=self.league.pk) for team in teams
+                    )
+            except IntegrityError:
+                # A name was taken concurrently, look the collisions up again.
+                for _, team in rows:
+                    team.pk = None
+            else:
+                self.imported += len(teams)
+                return
+        # Still racing, save the rows one by one and reject the ones that collide.
+        for line_number, team in rows:
+            try:
+                # Team.save adds the standing.
+                with transaction.atomic():
+                    team.save()
+            except IntegrityError:
+                team.pk = None
+                self.reject(line_number, {"name": ["team with this name already exists."]})
+            else:
+                self.imported += 1
+
+    def build(self: "Self", row: "Any") -> "Tuple[Optional[Team], Dict[str, List[str]]]":
+        if isinstance(row, ValueError):
+            return None, {"non_field_errors": [f"Invalid JSON: {row}"]}
+        if not isinstance(row, dict):
+            return None, {"non_field_errors": ["Expected an object with name and city."]}
+        errors = {}
+        name = row.get("name")
+        name = name.strip() if isinstance(name, str) else ""
+        city = row.get("city")
+        city = city.strip() if isinstance(city, str) else ""
+        if not name:
+            errors["name"] = ["This field is required."]
+        elif len(name) > self.name_length:
+            errors["name"] = [f"Ensure this field has no more than {self.name_length} characters."]
+        if len(city) > self.city_length:
+            errors["city"] = [f"Ensure this field has no more than {self.city_length} characters."]
+        if errors:
+            return None, errors
+        team = Team(league=self.league, name=name)
+        if city:
+            team.city = city
+        return team, {}
+
+    def drop_collisions(self: "Self", rows: "List[Tuple[int, Team]]") -> "List[Tuple[int, Team]]":
+        taken = set(Team.objects.filter(name__in=[team.name for _, team in rows]).values_list("name", flat=True))
+        accepted = []
+        for line_number, team in rows:
+            if team.name in taken:
+                self.reject(line_number, {"name": ["team with this name already exists."]})
+            else:
+                taken.add(team.name)
+                accepted.append((line_number, team))
+        return accepted
+
+    def reject(self: "Self", line_number: int, errors: "Dict[str, List[str]]") -> None:
+        self.rejected_count += 1
+        if len(self.rejected) < self.max_reported:
+            self.rejected.append({"line": line_number, "errors": errors})
@@ -0,0 +1,42 @@
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from typing import TYPE_CHECKING
+
+from league_planner.integrations.weather import BaseWeatherAPIClient, WeatherAPIClient
+from league_planner.integrations.weather_stub import WeatherStubServer
+
+if TYPE_CHECKING:
+    from typing import Generator
+
+
+@pytest.fixture(scope="session")
+def benchmark_report() -> "Generator":
+    report = {
+        "database": None,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "scenarios": {},
+    }
+    yield report
+    path = Path(os.environ.get("BENCHMARK_REPORT", "benchmark_report.json"))
+    path.write_text(json.dumps(report, indent=2))
+
+
+@pytest.fixture()
+def benchmark_iterations() -> int:
+    return int(os.environ.get("BENCHMARK_ITERATIONS", "20"))
+
+
+@pytest.fixture()
+def weather_stub(monkeypatch: "pytest.MonkeyPatch") -> "Generator":
+    server = WeatherStubServer(
+        latency=float(os.environ.get("BENCHMARK_WEATHER_LATENCY", "0.15")),
+        jitter=float(os.environ.get("BENCHMARK_WEATHER_JITTER", "0.05")),
+        seed=0,
+    ).start()
+    monkeypatch.setattr(BaseWeatherAPIClient, "weather_api_base_url", server.base_url)
+    yield server
+    server.stop()
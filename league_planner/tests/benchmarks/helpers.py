@@ -0,0 +1,105 @@
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from typing import TYPE_CHECKING
+
+from ..factories import LeagueFactory, MatchFactory, TeamFactory
+from league_planner.models.match import Match
+from league_planner.models.standing import Standing
+from league_planner.models.team import Team
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Tuple
+    from django.contrib.auth.models import User
+    from league_planner.models.league import League
+
+BATCH_SIZE = 5000
+DEFAULT_SCENARIOS = "10:90,100:2000,1000:20000"
+
+
+def scenarios() -> "List[Tuple[int, int]]":
+    """(teams, matches) pairs, e.g. BENCHMARK_SCENARIOS=10:90,10000:1000000"""
+    return [
+        tuple(int(value) for value in scenario.split(":"))
+        for scenario in os.environ.get("BENCHMARK_SCENARIOS", DEFAULT_SCENARIOS).split(",")
+    ]
+
+
+def seed_league(owner: "User", teams_count: int, matches_count: int) -> "League":
+    """Bulk insert a synthetic league built from the test factories."""
+    league = LeagueFactory.create(owner=owner, name=f"benchmark{teams_count}x{matches_count}")
+    teams = TeamFactory.build_batch(teams_count, league=league)
+    Team.objects.bulk_create(teams, batch_size=BATCH_SIZE)
+    team_ids = list(Team.objects.filter(league=league).values_list("id", flat=True))
+    Standing.objects.bulk_create(
+        (Standing(team_id=team_id, league=league) for team_id in team_ids),
+        batch_size=BATCH_SIZE,
+    )
+
+    template = MatchFactory.build(league=league, host=None, visitor=None)
+    generator = random.Random(teams_count)
+    start = datetime(2023, 1, 1, 18, tzinfo=timezone.utc)
+    batch = []
+    for number in range(matches_count):
+        host_id, visitor_id = generator.sample(team_ids, 2)
+        played = generator.random() < 0.8
+        batch.append(Match(
+            league=league,
+            host_id=host_id,
+            visitor_id=visitor_id,
+            host_score=generator.randint(0, 5) if played else None,
+            visitor_score=generator.randint(0, 5) if played else None,
+            address=template.address,
+            datetime=start + timedelta(hours=number),
+        ))
+        if len(batch) == BATCH_SIZE:
+            Match.objects.bulk_create(batch)
+            batch = []
+    Match.objects.bulk_create(batch)
+    Standing.objects.rebuild(league.pk)
+    return league
+
+
+def measure(call: "Callable[[], Any]", iterations: int, clear_cache: bool = True) -> "Dict":
+    latencies = []
+    queries = 0
+    for _ in range(iterations):
+        if clear_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = call()
+            latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code < 400, response
+        queries = len(context.captured_queries)
+
+    if clear_cache:
+        cache.clear()
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    else:
+        percentiles = latencies * 99
+    return {
+        "iterations": iterations,
+        "queries": queries,
+        "latency_ms": {
+            "min": min(latencies),
+            "p50": percentiles[49],
+            "p95": percentiles[94],
+            "p99": percentiles[98],
+            "max": max(latencies),
+        },
+        "peak_memory_kb": peak / 1024,
+    }
@@ -0,0 +1,128 @@
+import itertools
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from typing import TYPE_CHECKING
+
+from .helpers import measure, scenarios, seed_league
+from league_planner import settings
+from league_planner.models.match import Match
+from league_planner.models.team import Team
+from league_planner.serializers.match import MatchSerializer
+from league_planner.serializers.rows import MatchRowSerializer
+
+if TYPE_CHECKING:
+    from typing import Any, Dict
+    from django.contrib.auth.models import User
+    from league_planner.integrations.weather_stub import WeatherStubServer
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.django_db,
+    pytest.mark.skipif(not os.environ.get("BENCHMARK"), reason="set BENCHMARK=1 to run benchmarks"),
+]
+
+
+@pytest.mark.parametrize("teams_count,matches_count", scenarios())
+def test_api_benchmark(
+    api_client: "APIClient",
+    test_user: "User",
+    benchmark_report: "Dict",
+    benchmark_iterations: int,
+    weather_stub: "WeatherStubServer",
+    teams_count: int,
+    matches_count: int,
+) -> None:
+    started = time.perf_counter()
+    league = seed_league(test_user, teams_count, matches_count)
+    seed_seconds = time.perf_counter() - started
+    host, visitor = Team.objects.filter(league=league)[:2]
+    match_datetime = (datetime.now() + timedelta(days=30)).strftime(settings.FE_DATETIME_FORMAT)
+    scoreboard_url = f"{reverse('leagues-detail', args=[league.pk])}scoreboard/"
+
+    def create_match() -> "Any":
+        return api_client.post(
+            reverse("matches-list"),
+            data={
+                "league": league.pk,
+                "host": host.pk,
+                "visitor": visitor.pk,
+                "datetime": match_datetime,
+            },
+            format="json",
+        )
+
+    # A new date per call, so every call misses the weather cache.
+    async_datetimes = (
+        (datetime.now() + timedelta(days=day)).strftime(settings.FE_DATETIME_FORMAT)
+        for day in itertools.count(1)
+    )
+
+    def create_match_async() -> "Any":
+        return api_client.post(
+            reverse("matches-async"),
+            data={
+                "league": league.pk,
+                "host": host.pk,
+                "visitor": visitor.pk,
+                "datetime": next(async_datetimes),
+            },
+            format="json",
+        )
+
+    endpoints = {
+        "scoreboard": lambda: api_client.get(scoreboard_url),
+        "scoreboard_cached": lambda: api_client.get(scoreboard_url),
+        "teams_list": lambda: api_client.get(reverse("teams-list")),
+        "teams_filter": lambda: api_client.get(f"{reverse('teams-list')}?league={league.pk}"),
+        "matches_list": lambda: api_client.get(reverse("matches-list")),
+        "matches_filter": lambda: api_client.get(f"{reverse('matches-list')}?league={league.pk}"),
+        "matches_list_large": lambda: api_client.get(f"{reverse('matches-list')}?page_size=100"),
+        "match_create": create_match,
+        "match_create_async": create_match_async,
+    }
+    benchmark_report["database"] = connection.vendor
+    benchmark_report["scenarios"][f"{teams_count}x{matches_count}"] = {
+        "teams": teams_count,
+        "matches": matches_count,
+        "seed_seconds": seed_seconds,
+        "endpoints": {
+            name: measure(call, benchmark_iterations, clear_cache=name != "scoreboard_cached")
+            for name, call in endpoints.items()
+        },
+    }
+
+
+@pytest.mark.parametrize("teams_count,matches_count", scenarios())
+def test_serialization_benchmark(
+    test_user: "User",
+    benchmark_report: "Dict",
+    benchmark_iterations: int,
+    teams_count: int,
+    matches_count: int,
+) -> None:
+    """Model serializer against the values() fast path over the same page of matches."""
+    league = seed_league(test_user, teams_count, matches_count)
+    matches = Match.objects.filter(league=league)[:1000]
+    row_serializer = MatchRowSerializer()
+
+    def timed(serialize: "Any") -> float:
+        started = time.perf_counter()
+        for _ in range(benchmark_iterations):
+            serialize()
+        return (time.perf_counter() - started) * 1000 / benchmark_iterations
+
+    model_ms = timed(lambda: MatchSerializer(list(matches.all()), many=True).data)
+    rows_ms = timed(lambda: row_serializer.many(list(row_serializer.rows(matches.all()))))
+    benchmark_report["scenarios"].setdefault(f"{teams_count}x{matches_count}", {})["serialization"] = {
+        "rows": len(matches),
+        "model_serializer_ms": model_ms,
+        "row_serializer_ms": rows_ms,
+        "speedup": model_ms / rows_ms,
+    }
+    assert rows_ms < model_ms
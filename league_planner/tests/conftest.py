@@ -1,5 +1,6 @@
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from pytest_django.lazy_django import skip_if_no_django
 from pytest_django.fixtures import SettingsWrapper
 from rest_framework.authtoken.models import Token
@@ -8,6 +9,7 @@ from typing import Generator
 from pytest_factoryboy import register
 
 from .factories import LeagueFactory, TeamFactory, MatchFactory, UserFactory
+from league_planner.cache import ScoreboardCache
 
 pytestmark = [pytest.mark.django_db]
 
@@ -26,6 +28,15 @@ def session_settings() -> "Generator":
     wrapper.finalize()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache() -> "Generator":
+    cache.clear()
+    ScoreboardCache().reset_stats()
+    yield
+    cache.clear()
+    ScoreboardCache().reset_stats()
+
+
 @pytest.fixture()
 def test_user(user_factory: "UserFactory") -> "User":
     return user_factory.create(username="test", password="test")
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from .factories import LeagueFactory, MatchFactory, TeamFactory
+from league_planner.filters import MatchFilter
+from league_planner.models.match import Match
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+    from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+KICKOFF = timezone.make_aware(datetime(2030, 5, 1, 12, 0))
+
+
+def stamp(value: "datetime") -> str:
+    return timezone.localtime(value).strftime("%Y-%m-%dT%H:%M")
+
+
+@pytest.fixture()
+def season(league_factory: "LeagueFactory", team_factory: "TeamFactory", match_factory: "MatchFactory") -> dict:
+    league = league_factory.create()
+    home, away, third = (team_factory.create(league=league, city=city) for city in ("Opole", "Lodz", "Torun"))
+    matches = [
+        match_factory.create(league=league, host=home, visitor=away, datetime=KICKOFF, host_score=1, visitor_score=0),
+        *(
+            match_factory.create(league=league, host=host, visitor=visitor, datetime=when, host_score=None)
+            for host, visitor, when in (
+                (away, third, KICKOFF + timedelta(hours=2)),
+                (third, home, KICKOFF + timedelta(days=7)),
+                (home, third, None),
+            )
+        ),
+    ]
+    match_factory.create(league=league_factory.create(), host=home, datetime=KICKOFF)
+    return {"league": league, "teams": (home, away, third), "matches": matches}
+
+
+def test_match_filters(api_client: "APIClient", season: dict) -> None:
+    league, (home, away, third), matches = season["league"], season["teams"], season["matches"]
+    url = f"{reverse('matches-list')}?league={league.pk}"
+
+    def ids(query: str) -> "list":
+        response = api_client.get(f"{url}&{query}")
+        assert response.status_code == status.HTTP_200_OK, response.data
+        return [match["id"] for match in response.data["results"]]
+
+    assert ids(f"team={home.pk}") == [matches[0].pk, matches[2].pk, matches[3].pk]
+    assert ids(f"after={stamp(KICKOFF + timedelta(hours=1))}") == [matches[1].pk, matches[2].pk]
+    assert ids(f"before={stamp(KICKOFF)}&team={away.pk}") == [matches[0].pk]
+    assert ids("city=lodz") == [matches[1].pk]
+    assert ids("has_result=true") == [matches[0].pk]
+    assert ids("has_result=false") == [match.pk for match in matches[1:]]
+    assert api_client.get(f"{url}&after=someday").status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_league_calendar(api_client: "APIClient", season: dict) -> None:
+    league, (home, _, _), matches = season["league"], season["teams"], season["matches"]
+    url = reverse("leagues-calendar", args=[league.pk])
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK, response.data
+    first_day, second_day = (timezone.localtime(match.datetime).date() for match in (matches[0], matches[2]))
+    assert [day["date"] for day in response.data] == [first_day, second_day]
+    assert [match["id"] for match in response.data[0]["matches"]] == [matches[0].pk, matches[1].pk]
+    assert response.data[1]["matches"][0]["datetime"] == api_client.get(
+        reverse("matches-detail", args=[matches[2].pk]),
+    ).data["datetime"]
+
+    response = api_client.get(f"{url}?team={home.pk}&has_result=false")
+    assert [[match["id"] for match in day["matches"]] for day in response.data] == [[matches[2].pk]]
+    assert api_client.get(reverse("leagues-calendar", args=[league.pk + 100])).status_code == 404
+
+
+def query_plan(queryset: "QuerySet") -> str:
+    if connection.vendor == "postgresql":
+        # Tiny test tables are cheaper to scan, make the planner show its index choice.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+@pytest.mark.parametrize(
+    "params,index",
+    [
+        ({"league": "1", "after": "2030-05-01T00:00"}, "match_league_datetime_idx"),
+        ({"team": "1", "before": "2030-05-01T00:00"}, "match_host_datetime_idx"),
+        ({"team": "1", "before": "2030-05-01T00:00"}, "match_visitor_datetime_idx"),
+    ],
+)
+def test_match_filters_use_indexes(season: dict, params: dict, index: str) -> None:
+    filterset = MatchFilter(params, queryset=Match.objects.all())
+    assert filterset.is_valid(), filterset.errors
+    assert index in query_plan(filterset.qs)
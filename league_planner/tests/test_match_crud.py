@@ -1,7 +1,10 @@
+import json
 from typing import TYPE_CHECKING
 
 import pytest
 from datetime import datetime, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -9,6 +12,10 @@ from rest_framework.test import APIClient
 from league_planner import settings
 from .factories import LeagueFactory, TeamFactory, MatchFactory
 from league_planner.models.match import Match
+from league_planner.models.standing import Standing
+from league_planner.views.match import MatchViewSet
+from league_planner.models.weather import WeatherCheckJob
+from league_planner.serializers.match import MatchSerializer
 
 if TYPE_CHECKING:
     from django.contrib.auth.models import User
@@ -98,8 +105,10 @@ def test_match_create(
     assert response.data["visitor_score"] == create_match_data["visitor_score"]
     assert response.data["address"] == create_match_data["address"]
     assert response.data["datetime"] == create_match_data["datetime"].replace("T", " ")
-    assert response.data["is_weather_good"] in (True, False)
+    assert response.data["is_weather_good"] is None
+    assert response.data["weather_status"] == "pending"
     match = Match.objects.get(host=host, visitor=visitor)
+    assert WeatherCheckJob.objects.filter(match=match).exists()
     assert match.league == league
     assert match.host == host
     assert match.visitor == visitor
@@ -176,3 +185,261 @@ def test_match_create_user_is_not_league_owner(
     url = reverse("teams-list")
     response = api_client.post(url, data=create_match_data)
     assert response.status_code == status.HTTP_403_FORBIDDEN, response
+
+
+def bulk_rows(league_id: int, host_id: int, visitor_id: int, count: int) -> "list":
+    start = datetime.now() + timedelta(days=1)
+    return [
+        {
+            "league": league_id,
+            "host": host_id,
+            "visitor": visitor_id,
+            "host_score": 2 if number % 2 else None,
+            "visitor_score": 1 if number % 2 else None,
+            "address": f"address {number}",
+            "datetime": (start + timedelta(hours=number)).strftime(settings.FE_DATETIME_FORMAT),
+        }
+        for number in range(count)
+    ]
+
+
+def test_match_bulk_create(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    test_user: "User",
+) -> None:
+    url = reverse("matches-bulk-create")
+    league = league_factory.create(owner=test_user)
+    teams = team_factory.create_batch(10, league=league)
+    host, visitor = teams[:2]
+
+    queries = []
+    # Two teams, then all ten.
+    for rows in (
+        bulk_rows(league.pk, host.pk, visitor.pk, 4),
+        [row for pair in range(0, 10, 2) for row in bulk_rows(league.pk, teams[pair].pk, teams[pair + 1].pk, 8)],
+    ):
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.post(url, data=rows, format="json")
+        assert response.status_code == status.HTTP_201_CREATED, response.data
+        assert len(response.data) == len(rows)
+        queries.append(len(context.captured_queries))
+        # The standings of every scored team are written at once.
+        standings = [query["sql"] for query in context.captured_queries if "league_planner_standing" in query["sql"]]
+        assert [sql.split()[0] for sql in standings] == ["SELECT", "UPDATE"]
+    assert queries[0] == queries[1], queries
+
+    assert Match.objects.count() == 44
+    assert {row["weather_status"] for row in response.data} == {"pending"}
+    assert WeatherCheckJob.objects.count() == 44
+    assert Standing.objects.get(team=host).wins == 6
+    assert Standing.objects.get(team=visitor).losses == 6
+    assert Standing.objects.get(team=teams[-1]).losses == 4
+    assert Standing.objects.rebuild(dry_run=True) == []
+
+    response = api_client.post(url, data=[{"league": league.pk, "address": "tbd"}], format="json")
+    assert response.status_code == status.HTTP_201_CREATED, response.data
+    assert response.data[0]["weather_status"] == "good"
+
+
+def test_match_bulk_create_errors(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    test_user: "User",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    url = reverse("matches-bulk-create")
+    league = league_factory.create(owner=test_user)
+    host = team_factory.create(league=league)
+    visitor = team_factory.create(league=league)
+    rows = bulk_rows(league.pk, host.pk, visitor.pk, 3)
+    rows[1]["host"] = 0
+    rows[2]["datetime"] = "tomorrow"
+    response = api_client.post(url, data=rows, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data[0] == {}
+    assert list(response.data[1]) == ["host"]
+    assert list(response.data[2]) == ["datetime"]
+    assert not Match.objects.exists()
+
+    response = api_client.post(url, data={"league": league.pk}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    monkeypatch.setattr(MatchViewSet, "MAX_BULK_MATCHES", 2)
+    response = api_client.post(url, data=bulk_rows(league.pk, host.pk, visitor.pk, 3), format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    other = league_factory.create()
+    rows = bulk_rows(league.pk, host.pk, visitor.pk, 1) + bulk_rows(other.pk, host.pk, visitor.pk, 1)
+    response = api_client.post(url, data=rows, format="json")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not Match.objects.exists()
+
+
+def test_match_update_scores(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+    test_user: "User",
+) -> None:
+    url = reverse("matches-update-scores")
+    league = league_factory.create(owner=test_user)
+    teams = team_factory.create_batch(10, league=league)
+    matches = [
+        match_factory.create(
+            league=league,
+            host=teams[number % 10],
+            visitor=teams[(number + 1) % 10],
+            host_score=None,
+            visitor_score=None,
+            address=f"address {number}",
+        )
+        for number in range(40)
+    ]
+
+    queries = []
+    # Three teams, then all ten.
+    for batch in (matches[:2], matches[2:]):
+        rows = [{"id": match.pk, "host_score": 2, "visitor_score": 1} for match in batch]
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.patch(url, data=rows, format="json")
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert [row["id"] for row in response.data] == [match.pk for match in batch]
+        queries.append(len(context.captured_queries))
+        # The touched standings are locked and written once, whatever their number.
+        standings = [query["sql"] for query in context.captured_queries if "league_planner_standing" in query["sql"]]
+        assert [sql.split()[0] for sql in standings] == ["SELECT", "UPDATE"]
+    assert queries[0] == queries[1], queries
+
+    assert Standing.objects.get(team=teams[0]).wins == 4
+    assert Standing.objects.get(team=teams[0]).losses == 4
+    assert Standing.objects.rebuild(dry_run=True) == []
+
+    rows = [{"id": matches[0].pk, "host_score": None, "visitor_score": None}]
+    response = api_client.patch(url, data=rows, format="json")
+    assert response.status_code == status.HTTP_200_OK, response.data
+    assert Standing.objects.get(team=teams[0]).played == 7
+    assert Standing.objects.rebuild(dry_run=True) == []
+
+
+def test_match_update_scores_errors(
+    api_client: "APIClient",
+    match_factory: "MatchFactory",
+    test_user: "User",
+) -> None:
+    url = reverse("matches-update-scores")
+    match = match_factory.create(league__owner=test_user, host_score=None, visitor_score=None)
+    response = api_client.patch(url, data={"id": match.pk}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    row = {"id": match.pk, "host_score": 1, "visitor_score": 0}
+    response = api_client.patch(url, data=[row, {"id": 0, "host_score": 1, "visitor_score": 0}], format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == [{}, {"id": ["Match does not exist."]}]
+    response = api_client.patch(url, data=[row, row], format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client.patch(url, data=[{"id": match.pk, "host_score": "one"}], format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    other = match_factory.create(address="other", host_score=None, visitor_score=None)
+    response = api_client.patch(url, data=[row, {**row, "id": other.pk}], format="json")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    match.refresh_from_db()
+    assert match.host_score is None
+
+
+def test_match_export(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    match_factory: "MatchFactory",
+) -> None:
+    league = league_factory.create()
+    matches = [match_factory.create(league=league, address=f"address {number}") for number in range(3)]
+    match_factory.create(address="other league")
+    url = f"{reverse('matches-export')}?league={league.pk}"
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"].startswith("text/csv")
+    assert len(context.captured_queries) == 2
+    assert lines[0] == ",".join(MatchSerializer.Meta.fields)
+    assert len(lines) == 4
+
+    response = api_client.get(f"{url}&kind=ndjson")
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+    detail = api_client.get(reverse("matches-detail", args=[matches[0].pk])).data
+    assert rows[0] == json.loads(json.dumps(detail))
+    assert [row["id"] for row in rows] == [match.pk for match in matches]
+
+    assert api_client.get(f"{url}&kind=xml").status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_matches_list_cursor(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    match_factory: "MatchFactory",
+) -> None:
+    league = league_factory.create()
+    kickoff = datetime(2030, 5, 1, 12, 0)
+    matches = [match_factory.create(league=league, datetime=None) for _ in range(2)]
+    matches += [match_factory.create(league=league, datetime=kickoff) for _ in range(3)]
+    matches += [match_factory.create(league=league, datetime=kickoff - timedelta(days=number)) for number in (1, 2)]
+    expected = sorted(matches, key=lambda match: (match.datetime is None, match.datetime or kickoff, match.pk))
+
+    url = f"{reverse('matches-list')}?league={league.pk}&pagination=cursor&page_size=2"
+    seen, queries = [], set()
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert "count" not in response.data
+        queries.add(len(context.captured_queries))
+        seen.append([match["id"] for match in response.data["results"]])
+        url = response.data["next"]
+    assert [pk for page in seen for pk in page] == [match.pk for match in expected]
+    assert len(queries) == 1
+
+    backwards = []
+    url = response.data["previous"]
+    while url:
+        response = api_client.get(url)
+        backwards.insert(0, [match["id"] for match in response.data["results"]])
+        url = response.data["previous"]
+    assert backwards == seen[:-1]
+
+    response = api_client.get(f"{reverse('matches-list')}?pagination=cursor&cursor=bm9wZQ")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_matches_list_cursor_microseconds(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    match_factory: "MatchFactory",
+) -> None:
+    league = league_factory.create()
+    kickoff = datetime(2030, 5, 1, 12, 0, 0, 100)
+    # All within one millisecond, which a millisecond cursor cannot tell apart.
+    matches = [
+        match_factory.create(league=league, datetime=kickoff + timedelta(microseconds=number * 7 % 5))
+        for number in range(5)
+    ]
+    expected = [match.pk for match in sorted(matches, key=lambda match: (match.datetime, match.pk))]
+
+    url = f"{reverse('matches-list')}?league={league.pk}&pagination=cursor&page_size=2"
+    pages = []
+    # Bounded, a cursor that repeats rows would page forever.
+    while url and len(pages) < len(matches):
+        response = api_client.get(url)
+        pages.append([match["id"] for match in response.data["results"]])
+        url = response.data["next"]
+    assert [pk for page in pages for pk in page] == expected
+
+    backwards = []
+    url = response.data["previous"]
+    while url and len(backwards) < len(matches):
+        response = api_client.get(url)
+        backwards = [match["id"] for match in response.data["results"]] + backwards
+        url = response.data["previous"]
+    assert backwards + pages[-1] == expected
@@ -0,0 +1,84 @@
+from typing import TYPE_CHECKING
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from .factories import LeagueFactory, MatchFactory, TeamFactory
+
+if TYPE_CHECKING:
+    from typing import Any
+    from django.contrib.auth.models import User
+    from pytest_django.fixtures import SettingsWrapper
+    from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+# Authentication, the owner lookup, the row and its writes, never one query per object.
+# Counted with a process local cache, scoreboard version bumps are not model queries.
+BUDGETS = {
+    "teams": {"list": 3, "retrieve": 2, "create": 7, "move": 10, "update": 7, "destroy": 9},
+    "matches": {"list": 3, "retrieve": 2, "create": 7, "move": 9, "update": 7, "destroy": 11},
+}
+
+
+@pytest.mark.parametrize("basename", ["teams", "matches"])
+def test_query_budget(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+    test_user: "User",
+    django_assert_max_num_queries: "Any",
+    settings: "SettingsWrapper",
+    basename: str,
+) -> None:
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    factory = team_factory if basename == "teams" else match_factory
+    budget = BUDGETS[basename]
+    league = league_factory.create(owner=test_user)
+    other = league_factory.create(owner=test_user)
+    objs = factory.create_batch(5, league=league)
+    list_url = reverse(f"{basename}-list")
+    url = reverse(f"{basename}-detail", args=[objs[0].pk])
+
+    with django_assert_max_num_queries(budget["list"]):
+        assert api_client.get(list_url).status_code == status.HTTP_200_OK
+    with django_assert_max_num_queries(budget["retrieve"]):
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+    with django_assert_max_num_queries(budget["create"]):
+        response = api_client.post(list_url, data={"league": league.pk, "name": "a", "city": "b"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED, response.data
+    with django_assert_max_num_queries(budget["move"]):
+        assert api_client.patch(url, data={"league": other.pk}, format="json").status_code == status.HTTP_200_OK
+    with django_assert_max_num_queries(budget["update"]):
+        assert api_client.patch(url, data={"address": "x", "city": "x"}, format="json").status_code == status.HTTP_200_OK
+    with django_assert_max_num_queries(budget["destroy"]):
+        assert api_client.delete(url).status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.parametrize("basename", ["teams", "matches"])
+def test_missing_or_foreign_league(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+    test_user: "User",
+    basename: str,
+) -> None:
+    factory = team_factory if basename == "teams" else match_factory
+    obj = factory.create(league=league_factory.create(owner=test_user))
+    foreign = league_factory.create()
+    list_url = reverse(f"{basename}-list")
+    url = reverse(f"{basename}-detail", args=[obj.pk])
+
+    for league_id in (foreign.pk + 1000, "nope", None):
+        response = api_client.post(list_url, data={"league": league_id, "name": "a", "city": "b"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "league" in response.data
+    response = api_client.post(list_url, data={"league": foreign.pk, "name": "a", "city": "b"}, format="json")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    response = api_client.patch(url, data={"league": foreign.pk}, format="json")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    obj.refresh_from_db()
+    assert obj.league_id != foreign.pk
@@ -0,0 +1,70 @@
+import io
+import json
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from .factories import LeagueFactory, MatchFactory
+from league_planner import parsers, renderers
+from league_planner.parsers import FastJSONParser
+from league_planner.renderers import FastJSONRenderer, MessagePackRenderer
+
+if TYPE_CHECKING:
+    from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+PAYLOAD = OrderedDict(
+    id=1,
+    name="Zażółć gęślą",
+    at=datetime(2030, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    day=date(2030, 5, 1),
+    ratio=Decimal("1.5"),
+    key=uuid.UUID(int=7),
+    nested=[{"score": None, 2: True}, (1, 2.5)],
+)
+
+
+@pytest.mark.parametrize("installed", [True, False])
+def test_fast_json_renderer_parity(monkeypatch: "pytest.MonkeyPatch", installed: bool) -> None:
+    if not installed:
+        monkeypatch.setattr(renderers, "orjson", None)
+    assert FastJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+    assert FastJSONRenderer().render(None) == b""
+    indented = "application/json; indent=2"
+    assert FastJSONRenderer().render(PAYLOAD, indented) == JSONRenderer().render(PAYLOAD, indented)
+
+
+@pytest.mark.parametrize("installed", [True, False])
+def test_fast_json_parser(monkeypatch: "pytest.MonkeyPatch", installed: bool) -> None:
+    if not installed:
+        monkeypatch.setattr(parsers, "orjson", None)
+    body = json.dumps({"name": "Łódź", "scores": [1, None]}).encode()
+    assert FastJSONParser().parse(io.BytesIO(body)) == {"name": "Łódź", "scores": [1, None]}
+    latin = '{"city": "Kraków"}'.encode("latin-1")
+    assert FastJSONParser().parse(io.BytesIO(latin), parser_context={"encoding": "latin-1"}) == {"city": "Kraków"}
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"name": '))
+
+
+def test_api_negotiation(api_client: "APIClient", league_factory: "LeagueFactory", match_factory: "MatchFactory") -> None:
+    match = match_factory.create(league=league_factory.create())
+    url = reverse("matches-detail", args=[match.pk])
+    response = api_client.get(url)
+    assert response["Content-Type"] == "application/json"
+    assert response.content == JSONRenderer().render(response.data)
+
+    response = api_client.get(url, HTTP_ACCEPT="application/msgpack")
+    if renderers.msgpack is None:
+        assert response.status_code == status.HTTP_406_NOT_ACCEPTABLE
+        return
+    assert response["Content-Type"] == MessagePackRenderer.media_type
+    assert renderers.msgpack.unpackb(response.content) == json.loads(api_client.get(url).content)
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .factories import LeagueFactory, MatchFactory, TeamFactory
+from league_planner.models.match import Match
+from league_planner.models.team import Team
+from league_planner.serializers.match import MatchSerializer
+from league_planner.serializers.rows import MatchRowSerializer, RowSerializer, TeamRowSerializer
+from league_planner.serializers.team import TeamSerializer
+
+if TYPE_CHECKING:
+    from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture()
+def matches(league_factory: "LeagueFactory", team_factory: "TeamFactory", match_factory: "MatchFactory") -> list:
+    league = league_factory.create()
+    host, visitor = team_factory.create_batch(2, league=league, city="Łódź")
+    kickoff = timezone.make_aware(datetime(2030, 5, 1, 12, 30, 15, 123456))
+    created = [
+        match_factory.create(league=league, host=host, visitor=visitor, datetime=kickoff),
+        match_factory.create(league=league, host=None, visitor=visitor, datetime=None, host_score=None),
+        match_factory.create(league=league, host=host, visitor=None, address="Zażółć 1", datetime=kickoff),
+    ]
+    Match.objects.filter(pk=created[0].pk).update(is_weather_good=False, weather_checked_at=kickoff - timedelta(days=1))
+    Match.objects.filter(pk=created[2].pk).update(is_weather_good=None, weather_checked_at=None)
+    return created
+
+
+@pytest.mark.parametrize(
+    "row_serializer,serializer_class,model",
+    [(MatchRowSerializer(), MatchSerializer, Match), (TeamRowSerializer(), TeamSerializer, Team)],
+)
+def test_row_serializer_parity(
+    matches: list,
+    row_serializer: "MatchRowSerializer",
+    serializer_class: "type",
+    model: "type",
+) -> None:
+    assert tuple(row_serializer.columns) == tuple(serializer_class.Meta.fields)
+    instances = model.objects.order_by("id")
+    rows = row_serializer.rows(model.objects.order_by("id"))
+    renderer = JSONRenderer()
+    assert renderer.render(row_serializer.many(rows)) == renderer.render(serializer_class(instances, many=True).data)
+
+
+@pytest.mark.parametrize("basename,serializer_class,model", [
+    ("matches", MatchSerializer, Match),
+    ("teams", TeamSerializer, Team),
+])
+def test_list_and_retrieve_parity(
+    api_client: "APIClient",
+    matches: list,
+    basename: str,
+    serializer_class: "type",
+    model: "type",
+) -> None:
+    renderer = JSONRenderer()
+    for query in ("", "?page_size=1&page=2", "?pagination=cursor&page_size=1"):
+        response = api_client.get(f"{reverse(f'{basename}-list')}{query}")
+        ids = [row["id"] for row in response.data["results"]]
+        instances = sorted(model.objects.filter(pk__in=ids), key=lambda instance: ids.index(instance.pk))
+        assert renderer.render(response.data["results"]) == renderer.render(
+            serializer_class(instances, many=True).data,
+        )
+    instance = model.objects.first()
+    response = api_client.get(reverse(f"{basename}-detail", args=[instance.pk]))
+    assert response.content == renderer.render(serializer_class(instance).data)
+    assert api_client.get(reverse(f"{basename}-detail", args=[instance.pk + 100])).status_code == 404
+
+
+def test_row_serializer_columns_match_fields() -> None:
+    with pytest.raises(ImproperlyConfigured):
+        type("PartialTeamRowSerializer", (RowSerializer,), {
+            "serializer_class": TeamSerializer,
+            "columns": {"id": "id", "name": "name"},
+        })
@@ -0,0 +1,97 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from .factories import LeagueFactory, MatchFactory, TeamFactory
+from league_planner import settings
+from league_planner.models.match import Match
+from league_planner.models.weather import WeatherCheckJob
+from league_planner.schedule import ScheduleGenerator, round_robin
+
+if TYPE_CHECKING:
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("teams_count,double", [(2, False), (5, False), (6, False), (7, True), (10, True)])
+def test_round_robin(teams_count: int, double: bool) -> None:
+    rounds = list(round_robin(range(teams_count), double))
+    legs = 2 if double else 1
+    assert len(rounds) == (teams_count - 1 + teams_count % 2) * legs
+    for pairs in rounds:
+        playing = [team for pair in pairs for team in pair]
+        assert len(playing) == len(set(playing)) == teams_count - teams_count % 2
+    pairs = [pair for pairs in rounds for pair in pairs]
+    assert len(pairs) == teams_count * (teams_count - 1) // 2 * legs
+    if double:
+        assert len(set(pairs)) == len(pairs)
+    else:
+        assert len({frozenset(pair) for pair in pairs}) == len(pairs)
+    hosted = Counter(host for host, _ in pairs)
+    visited = Counter(visitor for _, visitor in pairs)
+    assert all(abs(hosted[team] - visited[team]) <= (0 if double else 1) for team in range(teams_count))
+
+
+def test_generate_schedule(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    test_user: "User",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    monkeypatch.setattr(ScheduleGenerator, "batch_size", 7)
+    league = league_factory.create(owner=test_user)
+    teams = [team_factory.create(league=league, city=f"city{number}") for number in range(6)]
+    start = (datetime.now() + timedelta(days=1)).replace(microsecond=0)
+    url = reverse("leagues-generate-schedule", args=[league.pk])
+    response = api_client.post(
+        url,
+        data={"start": start.strftime(settings.FE_DATETIME_FORMAT), "interval_days": 3, "double": True},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.data
+    assert response.data["matches"] == 30
+    assert response.data["rounds"] == 10
+    assert response.data["last_round"] == (start + timedelta(days=27)).strftime(settings.DEFAULT_DATETIME_FORMAT)
+
+    matches = Match.objects.filter(league=league)
+    assert matches.count() == 30
+    assert {match.address for match in matches} == {team.city for team in teams}
+    assert all(match.address == match.host.city for match in matches.select_related("host"))
+    assert matches.values("datetime").distinct().count() == 10
+    horizon = timezone.now() + timedelta(days=14)
+    assert WeatherCheckJob.objects.count() == matches.filter(datetime__lte=horizon).count() == 15
+
+    response = api_client.post(url, data={"start": start.strftime(settings.FE_DATETIME_FORMAT)}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Match.objects.count() == 30
+
+
+def test_generate_schedule_errors(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+    test_user: "User",
+) -> None:
+    data = {"start": datetime.now().strftime(settings.FE_DATETIME_FORMAT)}
+    league = league_factory.create(owner=test_user)
+    team_factory.create(league=league)
+    url = reverse("leagues-generate-schedule", args=[league.pk])
+    response = api_client.post(url, data=data, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client.post(url, data={**data, "interval_days": 0}, format="json")
+    assert "interval_days" in response.data
+
+    other = league_factory.create()
+    team_factory.create_batch(2, league=other)
+    response = api_client.post(reverse("leagues-generate-schedule", args=[other.pk]), data=data, format="json")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not Match.objects.exists()
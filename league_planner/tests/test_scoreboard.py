@@ -1,11 +1,19 @@
-from datetime import datetime
+import json
+import random
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any
 
 import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from .factories import LeagueFactory, TeamFactory, MatchFactory
+from league_planner.cache import ScoreboardCache
+from league_planner.views.league import HeadToHead
 
 pytestmark = [pytest.mark.django_db]
 
@@ -70,3 +78,284 @@ def test_scoreboard(
     assert teams[0]["score"] == 6
     assert teams[1]["score"] == 1
     assert teams[2]["score"] == 1
+
+
+def test_scoreboard_pagination(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+) -> None:
+    league = league_factory.create()
+    url = reverse("leagues-detail", args=[league.pk])
+    teams = [team_factory.create(league=league) for _ in range(5)]
+    for host, visitor in zip(teams, teams[1:]):
+        match_factory.create(
+            league=league,
+            host=host,
+            visitor=visitor,
+            host_score=1,
+            visitor_score=0,
+            datetime=datetime.now(),
+        )
+    response = api_client.get(f"{url}scoreboard/?page_size=2")
+    assert response.status_code == status.HTTP_200_OK, response
+    assert response.data["count"] == 5
+    assert response.data["next"] is not None
+    assert [team["id"] for team in response.data["results"]] == [teams[0].pk, teams[1].pk]
+    response = api_client.get(response.data["next"])
+    assert [team["id"] for team in response.data["results"]] == [teams[2].pk, teams[3].pk]
+    assert [team["score"] for team in response.data["results"]] == [3, 3]
+    response = api_client.get(response.data["next"])
+    assert [team["id"] for team in response.data["results"]] == [teams[4].pk]
+    assert response.data["results"][0]["score"] == 0
+    assert response.data["next"] is None
+
+
+def test_scoreboard_cache(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+) -> None:
+    league = league_factory.create()
+    url = f"{reverse('leagues-detail', args=[league.pk])}scoreboard/"
+    host = team_factory.create(league=league)
+    visitor = team_factory.create(league=league)
+    response = api_client.get(url)
+    assert response["X-Scoreboard-Cache"] == "miss"
+    response = api_client.get(url)
+    assert response["X-Scoreboard-Cache"] == "hit"
+    assert [team["score"] for team in response.data["results"]] == [0, 0]
+
+    match = match_factory.create(
+        league=league,
+        host=host,
+        visitor=visitor,
+        host_score=0,
+        visitor_score=1,
+        datetime=datetime.now(),
+    )
+    response = api_client.get(url)
+    assert response["X-Scoreboard-Cache"] == "miss"
+    assert response.data["results"][0]["id"] == visitor.pk
+    assert response.data["results"][0]["score"] == 3
+
+    match.address = "Sosnowiec"
+    match.save()
+    response = api_client.get(url)
+    assert response["X-Scoreboard-Cache"] == "miss"
+    response = api_client.get(f"{url}?page_size=1")
+    assert response["X-Scoreboard-Cache"] == "miss"
+
+    host.city = "Katowice"
+    host.save()
+    response = api_client.get(url)
+    assert response["X-Scoreboard-Cache"] == "miss"
+    assert response.data["results"][1]["city"] == "Katowice"
+    assert ScoreboardCache().stats() == {"hits": 1, "misses": 5}
+
+
+def test_scoreboard_cache_stats_are_batched(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    monkeypatch.setattr(ScoreboardCache, "stats_flush_every", 3)
+    url = f"{reverse('leagues-detail', args=[league_factory.create().pk])}scoreboard/"
+    for _ in range(2):
+        api_client.get(url)
+    assert cache.get("scoreboard:hits") is None and cache.get("scoreboard:misses") is None
+    api_client.get(url)
+    assert (cache.get("scoreboard:hits"), cache.get("scoreboard:misses")) == (2, 1)
+    api_client.get(url)
+    assert ScoreboardCache().stats() == {"hits": 3, "misses": 1}
+
+
+def test_scoreboards(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+    django_assert_num_queries: "Any",
+) -> None:
+    leagues = [league_factory.create() for _ in range(3)]
+    empty_league = league_factory.create()
+    for league in leagues:
+        host = team_factory.create(league=league)
+        visitor = team_factory.create(league=league)
+        match_factory.create(
+            league=league,
+            host=host,
+            visitor=visitor,
+            host_score=1,
+            visitor_score=1,
+            datetime=datetime.now(),
+        )
+        team_factory.create(league=league)
+    ids = ",".join(str(league.pk) for league in [*leagues, empty_league])
+    url = reverse("leagues-scoreboards")
+    with django_assert_num_queries(3):
+        response = api_client.get(f"{url}?ids={ids},999999")
+    assert response.status_code == status.HTTP_200_OK, response
+    assert set(response.data) == {str(league.pk) for league in [*leagues, empty_league]}
+    assert response.data[str(empty_league.pk)] == []
+    for league in leagues:
+        scoreboard = response.data[str(league.pk)]
+        assert [team["score"] for team in scoreboard] == [1, 1, 0]
+        assert {team["league"] for team in scoreboard} == {league.pk}
+        assert set(scoreboard[0]) == {"id", "league", "name", "city", "score"}
+    response = api_client.get(f"{url}?ids=1,a")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response
+
+
+def test_scoreboard_history(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+    django_assert_num_queries: "Any",
+) -> None:
+    league = league_factory.create()
+    url = f"{reverse('leagues-detail', args=[league.pk])}scoreboard/history/"
+    team1 = team_factory.create(league=league)
+    team2 = team_factory.create(league=league)
+    team3 = team_factory.create(league=league)
+    for host, visitor, host_score, visitor_score, day in (
+        (team1, team2, 1, 0, 1),
+        (team3, team1, 2, 2, 1),
+        (team2, team3, 0, 3, 8),
+        (team1, team3, None, None, 15),
+    ):
+        match_factory.create(
+            league=league,
+            host=host,
+            visitor=visitor,
+            host_score=host_score,
+            visitor_score=visitor_score,
+            datetime=datetime(2023, 3, day, 18, tzinfo=timezone.utc),
+        )
+    with django_assert_num_queries(4):
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK, response
+    rounds = response.data["rounds"]
+    assert [str(round_["date"]) for round_ in rounds] == ["2023-03-01", "2023-03-08"]
+    assert [(team["id"], team["score"], team["position"]) for team in rounds[0]["standings"]] == [
+        (team1.pk, 4, 1),
+        (team3.pk, 1, 2),
+        (team2.pk, 0, 3),
+    ]
+    assert [(team["id"], team["score"]) for team in rounds[1]["standings"]] == [
+        (team3.pk, 4),
+        (team1.pk, 4),
+        (team2.pk, 0),
+    ]
+    assert response.data["standings"] == rounds[-1]["standings"]
+
+    response = api_client.get(f"{url}?as_of=2023-03-05T00:00:00")
+    assert response.status_code == status.HTTP_200_OK, response
+    assert len(response.data["rounds"]) == 1
+    assert response.data["standings"] == rounds[0]["standings"]
+
+    response = api_client.get(f"{url}?as_of=yesterday")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response
+
+
+def test_scoreboard_tiebreakers(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+    test_user: "User",
+) -> None:
+    league = league_factory.create(owner=test_user, tiebreakers=["head_to_head", "goals_scored"])
+    url = reverse("leagues-detail", args=[league.pk])
+    team1, team2, team3, team4 = (team_factory.create(league=league) for _ in range(4))
+    for host, visitor, host_score, visitor_score in (
+        (team1, team2, 0, 1),
+        (team2, team3, 0, 5),
+        (team3, team1, 0, 1),
+        (team4, team1, 3, 3),
+    ):
+        match_factory.create(
+            league=league,
+            host=host,
+            visitor=visitor,
+            host_score=host_score,
+            visitor_score=visitor_score,
+            datetime=datetime.now(),
+        )
+    response = api_client.get(f"{url}scoreboard/")
+    assert response.status_code == status.HTTP_200_OK, response
+    assert [(team["id"], team["score"]) for team in response.data["results"]] == [
+        (team1.pk, 4),
+        (team3.pk, 3),
+        (team2.pk, 3),
+        (team4.pk, 1),
+    ]
+    response = api_client.get(f"{reverse('leagues-scoreboards')}?ids={league.pk}")
+    assert [team["id"] for team in response.data[str(league.pk)]] == [team1.pk, team3.pk, team2.pk, team4.pk]
+    response = api_client.get(f"{url}scoreboard/history/")
+    assert [team["id"] for team in response.data["standings"]] == [team1.pk, team3.pk, team2.pk, team4.pk]
+
+    response = api_client.patch(
+        url,
+        data={"points_per_win": 2, "points_per_draw": 2, "tiebreakers": ["away_points"]},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK, response
+    assert response.data["tiebreakers"] == ["away_points"]
+    response = api_client.get(f"{url}scoreboard/")
+    assert [(team["id"], team["score"]) for team in response.data["results"]] == [
+        (team1.pk, 4),
+        (team2.pk, 2),
+        (team3.pk, 2),
+        (team4.pk, 2),
+    ]
+
+    response = api_client.patch(url, data={"tiebreakers": ["away_points", "away_points"]}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response
+    response = api_client.patch(url, data={"tiebreakers": ["coin_toss"]}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response
+
+
+@pytest.mark.parametrize("tiebreakers", [["away_points"], ["head_to_head", "goals_scored"]])
+def test_scoreboard_export(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+    tiebreakers: "list",
+) -> None:
+    league = league_factory.create(tiebreakers=tiebreakers)
+    teams = team_factory.create_batch(5, league=league)
+    for number, (host, visitor) in enumerate(zip(teams, teams[1:] + teams[:1])):
+        match_factory.create(league=league, host=host, visitor=visitor, host_score=number % 3, visitor_score=1)
+    url = reverse("leagues-detail", args=[league.pk])
+    scoreboard = api_client.get(f"{url}scoreboard/").data["results"]
+    response = api_client.get(f"{url}scoreboard/export/?kind=ndjson")
+    assert response.status_code == status.HTTP_200_OK
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+    assert [row.pop("position") for row in rows] == [1, 2, 3, 4, 5]
+    assert rows == [dict(team) for team in scoreboard]
+
+    response = api_client.get(f"{reverse('leagues-detail', args=[0])}scoreboard/export/")
+    assert b"".join(response.streaming_content).decode().splitlines() == ["position,id,league,name,city,score"]
+
+
+def test_head_to_head_follows_ties() -> None:
+    results = random.Random(7)
+    head_to_head = HeadToHead(range(6))
+    pairs = defaultdict(int)
+    for _ in range(60):
+        team_id, opponent_id = results.sample(range(6), 2)
+        points = results.choice((0, 1, 3))
+        head_to_head.add(team_id, opponent_id, points)
+        pairs[team_id, opponent_id] += points
+        expected = defaultdict(int)
+        for (team, opponent), won in pairs.items():
+            if head_to_head.scores[team] == head_to_head.scores[opponent]:
+                expected[team] += won
+        assert {team: won for team, won in head_to_head.points.items() if won} == {
+            team: won for team, won in expected.items() if won
+        }
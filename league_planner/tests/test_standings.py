@@ -0,0 +1,129 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .factories import LeagueFactory, TeamFactory, MatchFactory
+from league_planner.models.match import Match
+from league_planner.models.standing import Standing
+
+pytestmark = [pytest.mark.django_db]
+
+
+def standing_of(team: "TeamFactory") -> tuple:
+    standing = Standing.objects.get(team=team)
+    return (
+        standing.points,
+        standing.points_as_visitor,
+        standing.played,
+        standing.wins,
+        standing.draws,
+        standing.losses,
+    )
+
+
+def test_standing_created_with_team(
+    team_factory: "TeamFactory",
+) -> None:
+    team = team_factory.create()
+    standing = Standing.objects.get(team=team)
+    assert standing.league_id == team.league_id
+    assert standing_of(team) == (0, 0, 0, 0, 0, 0)
+
+
+def test_standing_follows_match_lifecycle(
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+) -> None:
+    league = league_factory.create()
+    host = team_factory.create(league=league)
+    visitor = team_factory.create(league=league)
+    match = match_factory.create(
+        league=league,
+        host=host,
+        visitor=visitor,
+        host_score=1,
+        visitor_score=2,
+    )
+    assert standing_of(host) == (0, 0, 1, 0, 0, 1)
+    assert standing_of(visitor) == (3, 3, 1, 1, 0, 0)
+
+    match.host_score = 2
+    match.save()
+    assert standing_of(host) == (1, 0, 1, 0, 1, 0)
+    assert standing_of(visitor) == (1, 1, 1, 0, 1, 0)
+
+    match.host_score = None
+    match.save()
+    assert standing_of(host) == (0, 0, 0, 0, 0, 0)
+    assert standing_of(visitor) == (0, 0, 0, 0, 0, 0)
+
+    match.host_score = 3
+    match.save()
+    match.delete()
+    assert standing_of(host) == (0, 0, 0, 0, 0, 0)
+    assert standing_of(visitor) == (0, 0, 0, 0, 0, 0)
+
+
+def test_standing_update_reuses_loaded_league(
+    match_factory: "MatchFactory",
+) -> None:
+    match = Match.objects.get(pk=match_factory.create(host_score=1, visitor_score=2).pk)
+    match.host_score = 2
+    with CaptureQueriesContext(connection) as context:
+        match.save()
+    assert not [query for query in context.captured_queries if 'FROM "league_planner_league"' in query["sql"]]
+    assert standing_of(match.host) == (1, 0, 1, 0, 1, 0)
+
+
+def test_standing_when_team_deleted(
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+) -> None:
+    league = league_factory.create()
+    host = team_factory.create(league=league)
+    visitor = team_factory.create(league=league)
+    match = match_factory.create(
+        league=league,
+        host=host,
+        visitor=visitor,
+        host_score=3,
+        visitor_score=0,
+    )
+    host.delete()
+    assert not Standing.objects.filter(team_id=host.pk).exists()
+    assert standing_of(visitor) == (0, 0, 1, 0, 0, 1)
+
+    match.refresh_from_db()
+    match.visitor_score = 5
+    match.save()
+    assert standing_of(visitor) == (3, 3, 1, 1, 0, 0)
+    assert Standing.objects.rebuild(league.pk, dry_run=True) == []
+
+
+def test_rebuild_standings_command(
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+) -> None:
+    league = league_factory.create()
+    host = team_factory.create(league=league)
+    visitor = team_factory.create(league=league)
+    match_factory.create(
+        league=league,
+        host=host,
+        visitor=visitor,
+        host_score=1,
+        visitor_score=1,
+    )
+    call_command("rebuild_standings", "--check")
+    Standing.objects.filter(team=host).update(points=10)
+    with pytest.raises(CommandError):
+        call_command("rebuild_standings", "--check", "--league", league.pk)
+    assert standing_of(host)[0] == 10
+
+    call_command("rebuild_standings", "--league", league.pk)
+    assert standing_of(host) == (1, 0, 1, 0, 1, 0)
+    call_command("rebuild_standings", "--check")
@@ -1,14 +1,24 @@
+import csv
+import json
+from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
 
 import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from .factories import LeagueFactory, MatchFactory, TeamFactory
+from league_planner.models.standing import Standing
 from league_planner.models.team import Team
+from league_planner.team_import import TeamImporter
 
 if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Any
     from django.contrib.auth.models import User
 
 pytestmark = [pytest.mark.django_db]
@@ -159,3 +169,200 @@ def test_team_create_user_is_not_league_owner(
     url = reverse("teams-list")
     response = api_client.post(url, data=create_team_data)
     assert response.status_code == status.HTTP_403_FORBIDDEN, response
+
+
+def test_team_import_csv(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    test_user: "User",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    monkeypatch.setattr(TeamImporter, "chunk_size", 2)
+    league = league_factory.create(owner=test_user)
+    team_factory.create(name="Taken")
+    body = "\n".join([
+        "name,city",
+        "Alpha,Sosnowiec",
+        "Taken,Katowice",
+        "Beta,",
+        "Alpha,Bytom",
+        ",Gliwice",
+        f"{'x' * 51},Zabrze",
+        "Gamma,Tychy",
+    ])
+    url = f"{reverse('teams-import-teams')}?league={league.pk}"
+    response = api_client.post(url, data=body, content_type="text/csv")
+    assert response.status_code == status.HTTP_200_OK, response.data
+    assert response.data["imported"] == 3
+    assert response.data["rejected_count"] == 4
+    assert [(row["line"], list(row["errors"])) for row in response.data["rejected"]] == [
+        (3, ["name"]),
+        (5, ["name"]),
+        (6, ["name"]),
+        (7, ["name"]),
+    ]
+    teams = Team.objects.filter(league=league)
+    assert dict(teams.values_list("name", "city")) == {"Alpha": "Sosnowiec", "Beta": "Not Set", "Gamma": "Tychy"}
+    assert Standing.objects.filter(league=league).count() == 3
+    response = api_client.get(f"{reverse('leagues-detail', args=[league.pk])}scoreboard/")
+    assert response.data["count"] == 3
+
+
+def test_team_import_ndjson_upload(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    test_user: "User",
+) -> None:
+    league = league_factory.create(owner=test_user)
+    lines = [json.dumps({"name": "Alpha", "city": "Sosnowiec"}), "{broken", "", json.dumps(["Beta"])]
+    upload = SimpleUploadedFile("teams.ndjson", "\n".join(lines).encode(), content_type="application/x-ndjson")
+    url = f"{reverse('teams-import-teams')}?league={league.pk}"
+    response = api_client.post(url, data={"file": upload}, format="multipart")
+    assert response.status_code == status.HTTP_200_OK, response.data
+    assert response.data["imported"] == 1
+    assert [row["line"] for row in response.data["rejected"]] == [2, 4]
+
+
+def test_team_import_errors(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    test_user: "User",
+) -> None:
+    url = reverse("teams-import-teams")
+    response = api_client.post(f"{url}?league=0", data="name\nAlpha", content_type="text/csv")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client.post(f"{url}?league={league_factory.create().pk}", data="name\nAlpha", content_type="text/csv")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    league = league_factory.create(owner=test_user)
+    response = api_client.post(f"{url}?league={league.pk}", data={"name": "Alpha"}, format="json")
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    upload = SimpleUploadedFile("teams.txt", b"name\nAlpha")
+    response = api_client.post(f"{url}?league={league.pk}", data={"file": upload}, format="multipart")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Team.objects.exists()
+
+
+def test_import_teams_command(
+    league_factory: "LeagueFactory",
+    tmp_path: "Path",
+) -> None:
+    league = league_factory.create()
+    path = tmp_path / "teams.csv"
+    path.write_text("name,city\n" + "\n".join(f"team {number},city {number % 3}" for number in range(25)))
+    call_command("import_teams", str(path), "--league", str(league.pk), "--chunk-size", "10")
+    assert Team.objects.filter(league=league).count() == 25
+    call_command("import_teams", str(path), "--league", str(league.pk))
+    assert Team.objects.count() == 25
+
+
+def test_team_export(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+) -> None:
+    league = league_factory.create()
+    team_factory.create(league=league, name="Alpha", city="Sosnowiec, Zagłębie")
+    team_factory.create(league=league, name="Beta")
+    team_factory.create(name="Other")
+    response = api_client.get(f"{reverse('teams-export')}?league={league.pk}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Disposition"] == 'attachment; filename="teams.csv"'
+    rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+    assert rows == [
+        ["id", "league", "name", "city"],
+        [str(Team.objects.get(name="Alpha").pk), str(league.pk), "Alpha", "Sosnowiec, Zagłębie"],
+        [str(Team.objects.get(name="Beta").pk), str(league.pk), "Beta", "Sosnowiec"],
+    ]
+
+
+def test_teams_list_cursor(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory"
+) -> None:
+    teams = team_factory.create_batch(5, league=league_factory.create())
+    response = api_client.get(f"{reverse('teams-list')}?pagination=cursor&page_size=3")
+    assert response.status_code == status.HTTP_200_OK, response
+    assert list(response.data) == ["next", "previous", "results"]
+    assert [team["id"] for team in response.data["results"]] == [team.pk for team in teams[:3]]
+    assert response.data["previous"] is None
+
+    response = api_client.get(response.data["next"])
+    assert [team["id"] for team in response.data["results"]] == [team.pk for team in teams[3:]]
+    assert response.data["next"] is None
+    response = api_client.get(response.data["previous"])
+    assert [team["id"] for team in response.data["results"]] == [team.pk for team in teams[:3]]
+    assert response.data["previous"] is None
+
+
+def test_team_history(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    match_factory: "MatchFactory",
+    django_assert_num_queries: "Any",
+) -> None:
+    league = league_factory.create()
+    team, rival = team_factory.create_batch(2, league=league)
+    kickoff = timezone.make_aware(datetime(2030, 1, 1, 12))
+    for day, (host, visitor, host_score, visitor_score) in enumerate(
+        [(team, rival, 1, 0), (rival, team, 2, 2), (rival, team, 0, 3), (team, rival, 0, 1), (team, rival, None, None)],
+    ):
+        match_factory.create(
+            league=league,
+            host=host,
+            visitor=visitor,
+            host_score=host_score,
+            visitor_score=visitor_score,
+            datetime=kickoff + timedelta(days=day),
+        )
+    url = reverse("teams-history", args=[team.pk])
+    with django_assert_num_queries(3):
+        response = api_client.get(f"{url}?last=3")
+    assert response.status_code == status.HTTP_200_OK, response.data
+    assert response.data["form"] == "LWD"
+    assert [row["points"] for row in response.data["results"]] == [0, league.points_per_win, league.points_per_draw]
+    assert [row["home"] for row in response.data["results"]] == [True, False, False]
+    assert (response.data["goals_for"], response.data["goals_against"]) == (6, 3)
+    assert response.data["home"] == {
+        "played": 2, "wins": 1, "draws": 0, "losses": 1, "goals_for": 1, "goals_against": 1,
+        "points": league.points_per_win + league.points_per_lose,
+    }
+    assert response.data["away"]["played"] == 2
+    assert response.data["away"]["wins"] == response.data["away"]["draws"] == 1
+
+    assert api_client.get(reverse("teams-history", args=[rival.pk])).data["form"] == "WLDL"
+    assert api_client.get(f"{url}?last=0").status_code == status.HTTP_400_BAD_REQUEST
+    empty = team_factory.create(league=league)
+    response = api_client.get(reverse("teams-history", args=[empty.pk]))
+    assert response.data["form"] == "" and response.data["home"]["played"] == 0
+
+
+def test_team_import_keeps_rows_after_unreadable_line(league_factory: "LeagueFactory") -> None:
+    league = league_factory.create()
+    lines = [b"name,city\n", b"Alpha,a\n", b"B\xffeta,b\n", b"Gamma," + b"c" * 200 + b"\n", b"Delta,d\n", b"Epsilon,e\n"]
+    # The oversized field raises csv.Error.
+    field_size_limit = csv.field_size_limit(100)
+    try:
+        report = TeamImporter(league).run(lines, TeamImporter.CSV)
+    finally:
+        csv.field_size_limit(field_size_limit)
+    assert report["imported"] == 3
+    assert [row["line"] for row in report["rejected"]] == [3, 4]
+    assert set(Team.objects.filter(league=league).values_list("name", flat=True)) == {"Alpha", "Delta", "Epsilon"}
+
+
+def test_team_import_rejects_rows_lost_to_a_name_race(
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    league = league_factory.create()
+    team_factory.create(name="Taken")
+    # The collision check never sees the taken name, as if it was inserted concurrently.
+    monkeypatch.setattr(TeamImporter, "drop_collisions", lambda self, rows: rows)
+    report = TeamImporter(league).run([b"name\n", b"Alpha\n", b"Taken\n", b"Beta\n"], TeamImporter.CSV)
+    assert report["imported"] == 2
+    assert report["rejected"] == [{"line": 3, "errors": {"name": ["team with this name already exists."]}}]
+    assert Standing.objects.filter(league=league).count() == 2
@@ -0,0 +1,668 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from .factories import LeagueFactory, MatchFactory, TeamFactory
+from league_planner import settings
+from league_planner.integrations.http import AsyncHTTPTransport, CircuitBreaker, HTTPTransport
+from league_planner.integrations.quota import TokenBucketLimiter
+from league_planner.integrations.singleflight import AsyncSingleFlight, SingleFlight
+from league_planner.integrations.weather import AsyncWeatherAPIClient, WeatherAPIClient, WeatherCache
+from league_planner.integrations.weather_jobs import WeatherCheckQueue
+from league_planner.integrations.weather_stub import WeatherStubServer
+from league_planner.models.match import Match
+from league_planner.models.token_bucket import TokenBucket
+from league_planner.models.weather import WeatherCheckJob, WeatherForecast
+from league_planner.views.match import AsyncMatchCreateView
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Generator, List
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIClient
+
+pytestmark = [pytest.mark.django_db]
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, will_it_rain: int = 0, params: dict = None) -> None:
+        self.status_code = status_code
+        self.will_it_rain = will_it_rain
+        self.params = params or {}
+
+    def json(self) -> dict:
+        if self.will_it_rain is None:
+            return {}
+        if "dt" in self.params:
+            dates = [self.params["dt"]]
+        else:
+            today = datetime.now().date()
+            dates = [
+                (today + timedelta(days=day)).strftime(settings.WEATHER_API_DATE_FORMAT)
+                for day in range(self.params.get("days", 1))
+            ]
+        return {"forecast": {"forecastday": [
+            {"date": date, "day": {"daily_will_it_rain": self.will_it_rain}} for date in dates
+        ]}}
+
+
+def fake_get(status_code: int = 200, will_it_rain: int = 0) -> "Callable":
+    def get(url: str, params: dict = None, **kwargs: "Any") -> FakeResponse:
+        return FakeResponse(status_code, will_it_rain, params)
+    return get
+
+
+@pytest.fixture(autouse=True)
+def breaker() -> "Generator":
+    breaker = WeatherAPIClient.transport.breaker
+    breaker.reset()
+    yield breaker
+    breaker.reset()
+
+
+def patch_upstream(monkeypatch: "pytest.MonkeyPatch", get: "Callable") -> None:
+    monkeypatch.setattr(WeatherAPIClient.transport.session, "get", get)
+
+
+@pytest.fixture()
+def upstream_calls(monkeypatch: "pytest.MonkeyPatch") -> "List[Any]":
+    calls = []
+
+    def get(url: str, params: dict, **kwargs: "Any") -> FakeResponse:
+        calls.append((url, params))
+        return FakeResponse(will_it_rain=1, params=params)
+
+    patch_upstream(monkeypatch, get)
+    return calls
+
+
+def test_weather_cache_hit(upstream_calls: "List[Any]") -> None:
+    client = WeatherAPIClient()
+    match_datetime = datetime.now() + timedelta(days=2)
+    assert client.check_if_weather_good("Sosnowiec", match_datetime) is False
+    assert client.check_if_weather_good(" sosnowiec ", match_datetime + timedelta(hours=1)) is False
+    assert WeatherAPIClient().check_if_weather_good("SOSNOWIEC", match_datetime) is False
+    assert len(upstream_calls) == 1
+    assert client.check_if_weather_good("Katowice", match_datetime) is False
+    assert len(upstream_calls) == 2
+
+
+def test_weather_cache_ttl(upstream_calls: "List[Any]") -> None:
+    client = WeatherAPIClient()
+    near = datetime.now() + timedelta(days=1)
+    far = datetime.now() + timedelta(days=30)
+    client.check_if_weather_good("Sosnowiec", near)
+    client.check_if_weather_good("Sosnowiec", far)
+    assert "forecast.json" in upstream_calls[0][0]
+    assert "future.json" in upstream_calls[1][0]
+    near_entry = WeatherForecast.objects.get(date=near.date())
+    far_entry = WeatherForecast.objects.get(date=far.date())
+    assert near_entry.expires_at - near_entry.last_used_at == timedelta(hours=1)
+    assert far_entry.expires_at - far_entry.last_used_at == timedelta(days=7)
+
+    WeatherForecast.objects.filter(pk=near_entry.pk).update(expires_at=timezone.now())
+    client.check_if_weather_good("Sosnowiec", near)
+    client.check_if_weather_good("Sosnowiec", far)
+    assert len(upstream_calls) == 3
+
+
+def test_weather_cache_skips_failed_responses(monkeypatch: "pytest.MonkeyPatch") -> None:
+    patch_upstream(monkeypatch, fake_get(status_code=404))
+    assert WeatherAPIClient().check_if_weather_good("Sosnowiec", datetime.now() + timedelta(days=1))
+    assert not WeatherForecast.objects.exists()
+
+
+def test_weather_cache_lru_eviction(monkeypatch: "pytest.MonkeyPatch") -> None:
+    monkeypatch.setattr(WeatherCache, "max_entries", 10)
+    monkeypatch.setattr(WeatherCache, "touch_interval", timedelta(0))
+    cache = WeatherCache()
+    day = datetime.now().date()
+    for number in range(10):
+        cache.set(f"city{number}", day, True, timedelta(hours=1))
+    assert cache.get("city0", day) is True
+    cache.set("city10", day, False, timedelta(hours=1))
+    assert WeatherForecast.objects.count() == 9
+    assert cache.get("city0", day) is True
+    assert cache.get("city1", day) is None
+    assert cache.get("city10", day) is False
+
+
+def test_weather_check_job(
+    api_client: "APIClient",
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    test_user: "User",
+    upstream_calls: "List[Any]",
+) -> None:
+    league = league_factory.create(owner=test_user)
+    host = team_factory.create(league=league)
+    visitor = team_factory.create(league=league)
+    match_datetime = datetime.now() + timedelta(days=2)
+    response = api_client.post(
+        reverse("matches-list"),
+        data={
+            "league": league.pk,
+            "host": host.pk,
+            "visitor": visitor.pk,
+            "datetime": match_datetime.strftime(settings.FE_DATETIME_FORMAT),
+        },
+        format="json",
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response
+    assert response.data["weather_status"] == "pending"
+    assert upstream_calls == []
+
+    call_command("run_weather_worker", "--once")
+    url = reverse("matches-detail", args=[response.data["id"]])
+    response = api_client.get(url)
+    assert response.data["is_weather_good"] is False
+    assert response.data["weather_status"] == "bad"
+    assert response.data["weather_checked_at"] is not None
+    assert not WeatherCheckJob.objects.exists()
+    assert len(upstream_calls) == 1
+
+    response = api_client.patch(url, data={"host_score": 1}, format="json")
+    assert response.data["weather_status"] == "bad"
+    response = api_client.patch(url, data={"host": visitor.pk, "visitor": host.pk}, format="json")
+    assert response.data["weather_status"] == "pending"
+    assert WeatherCheckJob.objects.count() == 1
+
+
+def test_weather_response_picks_match_date() -> None:
+    response = FakeResponse()
+    response.json = lambda: {"forecast": {"forecastday": [
+        {"date": "2030-05-01", "day": {"daily_will_it_rain": 0}},
+        {"date": "2030-05-02", "day": {"daily_will_it_rain": 1}},
+    ]}}
+    assert WeatherAPIClient.check_response(response, datetime(2030, 5, 1, 18)) is True
+    assert WeatherAPIClient.check_response(response, datetime(2030, 5, 2, 18)) is False
+    assert WeatherAPIClient.check_response(response, datetime(2030, 5, 3, 18)) is True
+
+
+def test_check_matches_one_call_per_city(
+    match_factory: "MatchFactory",
+    team_factory: "TeamFactory",
+    upstream_calls: "List[Any]",
+) -> None:
+    now = timezone.now()
+    sosnowiec = team_factory.create(city="Sosnowiec")
+    katowice = team_factory.create(city="Katowice")
+    matches = [
+        match_factory.create(host=host, datetime=now + timedelta(days=days))
+        for host, days in [(sosnowiec, 1), (sosnowiec, 3), (sosnowiec, 5), (katowice, 2), (katowice, 8)]
+    ]
+    distant = timezone.localtime(now + timedelta(days=30)).replace(hour=12)
+    matches += [
+        match_factory.create(host=host, datetime=distant + timedelta(hours=hours))
+        for host, hours in [(sosnowiec, 0), (sosnowiec, 1), (katowice, 0)]
+    ]
+    played = match_factory.create(host=sosnowiec, datetime=now - timedelta(days=1))
+    matches.append(played)
+    client = WeatherAPIClient()
+    matches = list(Match.objects.select_related("host").filter(pk__in=[match.pk for match in matches]))
+
+    verdicts, failures = client.check_matches(matches)
+    assert failures == {}
+    assert list(verdicts.values()).count(False) == 8
+    assert verdicts[played.pk] is True
+    forecasts = {params["q"]: params["days"] for url, params in upstream_calls if "forecast.json" in url}
+    assert forecasts == {"Sosnowiec": 6, "Katowice": 9}
+    futures = [params["q"] for url, params in upstream_calls if "future.json" in url]
+    assert sorted(futures) == ["Katowice", "Sosnowiec"]
+
+    calls = len(upstream_calls)
+    assert client.check_matches(matches) == (verdicts, {})
+    assert len(upstream_calls) == calls
+
+
+def test_prefetch_weather_command(
+    match_factory: "MatchFactory",
+    upstream_calls: "List[Any]",
+) -> None:
+    now = timezone.now()
+    matches = [match_factory.create(datetime=now + timedelta(days=days)) for days in range(1, 11)]
+    WeatherCheckQueue().enqueue([match.pk for match in matches])
+    call_command("prefetch_weather")
+    assert len(upstream_calls) == 1
+    assert not WeatherCheckJob.objects.exists()
+    assert set(Match.objects.values_list("is_weather_good", flat=True)) == {False}
+    assert not Match.objects.filter(weather_checked_at__isnull=True).exists()
+
+
+def test_weather_check_job_retries(
+    match_factory: "MatchFactory",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    patch_upstream(monkeypatch, fake_get(will_it_rain=None))
+    match = match_factory.create(datetime=timezone.now() + timedelta(days=2))
+    queue = WeatherCheckQueue()
+    queue.enqueue([match.pk])
+    assert queue.run_once() == 1
+    job = WeatherCheckJob.objects.get(match=match)
+    assert job.attempts == 1
+    assert "KeyError" in job.last_error
+    assert job.run_after > timezone.now()
+    assert queue.run_once() == 0
+
+    for _ in range(2, queue.max_attempts + 1):
+        WeatherCheckJob.objects.update(run_after=timezone.now())
+        assert queue.run_once() == 1
+    job.refresh_from_db()
+    assert job.failed_at is not None
+    WeatherCheckJob.objects.update(run_after=timezone.now())
+    assert queue.run_once() == 0
+    match.refresh_from_db()
+    assert match.weather_status == "pending"
+
+
+def test_weather_check_job_reenqueued_while_running(
+    match_factory: "MatchFactory",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    match = match_factory.create(datetime=timezone.now() + timedelta(days=2))
+    queue = WeatherCheckQueue()
+
+    def get(url: str, params: dict, **kwargs: "Any") -> FakeResponse:
+        # The host or date changed while the stale lookup was in flight.
+        queue.enqueue([match.pk])
+        if will_it_rain is None:
+            raise requests.ConnectionError("upstream down")
+        return FakeResponse(will_it_rain=will_it_rain, params=params)
+
+    patch_upstream(monkeypatch, get)
+    for will_it_rain in (1, None):
+        queue.enqueue([match.pk])
+        assert queue.run_once() == 1
+        job = WeatherCheckJob.objects.get(match=match)
+        assert (job.attempts, job.locked_until, job.last_error) == (0, None, "")
+        match.refresh_from_db()
+        assert match.weather_status == "pending"
+        WeatherForecast.objects.all().delete()
+
+
+def test_weather_recheck_upcoming(
+    match_factory: "MatchFactory",
+) -> None:
+    now = timezone.now()
+    upcoming = match_factory.create(datetime=now + timedelta(days=3), address="upcoming")
+    match_factory.create(datetime=now + timedelta(days=30), address="distant")
+    match_factory.create(datetime=now - timedelta(days=3), address="played")
+    Match.objects.filter(pk=upcoming.pk).update(weather_checked_at=now - timedelta(days=1), is_weather_good=True)
+    match_factory.create(
+        datetime=now + timedelta(days=3),
+        address="checked",
+        weather_checked_at=now,
+        is_weather_good=True,
+    )
+    assert WeatherCheckQueue().enqueue_upcoming() == 1
+    assert list(WeatherCheckJob.objects.values_list("match_id", flat=True)) == [upcoming.pk]
+
+
+def test_circuit_breaker_fails_open(
+    breaker: "CircuitBreaker",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    calls = []
+
+    def get(*args: "Any", **kwargs: "Any") -> None:
+        calls.append(kwargs["timeout"])
+        raise requests.ConnectionError("upstream down")
+
+    patch_upstream(monkeypatch, get)
+    monkeypatch.setattr(breaker, "failure_threshold", 2)
+    client = WeatherAPIClient()
+    match_datetime = datetime.now() + timedelta(days=1)
+    for _ in range(3):
+        assert client.check_if_weather_good("Sosnowiec", match_datetime) is True
+    assert len(calls) == 2
+    assert calls[0] == WeatherAPIClient.transport.timeout
+    assert breaker.state == CircuitBreaker.OPEN
+
+    monkeypatch.setattr(breaker, "reset_timeout", 0)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    patch_upstream(monkeypatch, fake_get(will_it_rain=1))
+    assert client.check_if_weather_good("Sosnowiec", match_datetime) is False
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert not WeatherForecast.objects.filter(is_weather_good=True).exists()
+
+
+def test_circuit_breaker_half_open_single_trial() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_failure()
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() is True
+
+
+class Limiter:
+    def __init__(self: "Limiter", tokens: int) -> None:
+        self.tokens = tokens
+        self.calls = 0
+
+    def acquire(self: "Limiter") -> bool:
+        self.calls += 1
+        self.tokens -= 1
+        return self.tokens >= 0
+
+
+def test_transport_checks_breaker_before_quota() -> None:
+    limiter = Limiter(tokens=0)
+    transport = HTTPTransport(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0), limiter=limiter)
+    transport.breaker.record_failure()
+    # The half-open trial is throttled and handed back to the next caller.
+    with pytest.raises(requests.RequestException):
+        transport.get("http://weather.test/forecast.json")
+    assert (limiter.calls, transport.breaker.trial_running) == (1, False)
+    transport.breaker.reset_timeout = 60
+    with pytest.raises(requests.RequestException):
+        transport.get("http://weather.test/forecast.json")
+    assert limiter.calls == 1
+    assert transport.metrics()["rejected"] == 1
+
+
+def test_transport_retries_spend_tokens(monkeypatch: "pytest.MonkeyPatch") -> None:
+    server = WeatherStubServer(error_rate=1).start()
+    calls = []
+    respond = server.respond
+    monkeypatch.setattr(server, "respond", lambda *args: calls.append(args) or respond(*args))
+    limiter = Limiter(tokens=2)
+    transport = HTTPTransport(retries=3, backoff_factor=0, limiter=limiter)
+    try:
+        response = transport.get(f"{server.base_url}forecast.json", params={"q": "Sosnowiec"})
+    finally:
+        server.stop()
+    # The first call and one retry, the next retry finds the budget spent.
+    assert response.status_code == 503
+    assert len(calls) == 2
+    assert limiter.calls == 3
+
+
+def test_transport_metrics(monkeypatch: "pytest.MonkeyPatch") -> None:
+    transport = HTTPTransport(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    responses = iter([FakeResponse(), FakeResponse(status_code=503)])
+    monkeypatch.setattr(transport.session, "get", lambda *args, **kwargs: next(responses))
+    transport.get("http://weather.test/forecast.json")
+    transport.get("http://weather.test/forecast.json")
+    with pytest.raises(requests.RequestException):
+        transport.get("http://weather.test/forecast.json")
+    metrics = transport.metrics()
+    assert metrics["calls"] == 2
+    assert metrics["failures"] == 1
+    assert metrics["rejected"] == 1
+    assert metrics["breaker_state"] == CircuitBreaker.OPEN
+    assert metrics["latency_ms"]["p50"] is not None
+
+
+def test_async_weather_client(upstream_calls: "List[Any]") -> None:
+    client = AsyncWeatherAPIClient()
+    check = async_to_sync(client.check_if_weather_good)
+    match_datetime = datetime.now() + timedelta(days=2)
+    assert check("Sosnowiec", datetime.now() - timedelta(days=1)) is True
+    assert check("Sosnowiec", match_datetime) is False
+    assert check("Sosnowiec", datetime.now() + timedelta(days=30)) is False
+    assert [url.rsplit("/", 1)[1] for url, _ in upstream_calls] == ["forecast.json", "future.json"]
+    assert WeatherAPIClient().check_if_weather_good("Sosnowiec", match_datetime) is False
+    assert len(upstream_calls) == 2
+    assert AsyncWeatherAPIClient.transport.metrics()["calls"] >= 2
+
+
+def test_async_weather_client_fails_open(
+    breaker: "CircuitBreaker",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    def get(*args: "Any", **kwargs: "Any") -> None:
+        raise requests.ConnectionError("upstream down")
+
+    patch_upstream(monkeypatch, get)
+    monkeypatch.setattr(breaker, "failure_threshold", 1)
+    check = async_to_sync(AsyncWeatherAPIClient().check_if_weather_good)
+    assert check("Sosnowiec", datetime.now() + timedelta(days=1)) is True
+    assert breaker.state == CircuitBreaker.OPEN
+    assert check("Sosnowiec", datetime.now() + timedelta(days=1)) is True
+    assert not WeatherForecast.objects.exists()
+
+
+def test_async_transport_cancelled_trial(monkeypatch: "pytest.MonkeyPatch") -> None:
+    pytest.importorskip("httpx")
+    transport = AsyncHTTPTransport(HTTPTransport(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0)))
+    transport.breaker.record_failure()
+    in_flight = asyncio.Event()
+
+    class Client:
+        async def get(self: "Client", url: str, **kwargs: "Any") -> None:
+            in_flight.set()
+            await asyncio.sleep(60)
+
+    monkeypatch.setattr(transport, "client", Client)
+
+    async def cancel_trial() -> None:
+        trial = asyncio.ensure_future(transport.get("http://weather.test/forecast.json"))
+        await in_flight.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(cancel_trial())
+    assert transport.breaker.trial_running is False
+    assert transport.breaker.allow() is True
+
+
+@pytest.fixture()
+def async_match_data(
+    league_factory: "LeagueFactory",
+    team_factory: "TeamFactory",
+    test_user: "User",
+) -> dict:
+    league = league_factory.create(owner=test_user)
+    return {
+        "league": league.pk,
+        "host": team_factory.create(league=league).pk,
+        "visitor": team_factory.create(league=league).pk,
+        "datetime": (datetime.now() + timedelta(days=2)).strftime(settings.FE_DATETIME_FORMAT),
+    }
+
+
+def test_async_match_create(
+    api_client: "APIClient",
+    async_match_data: dict,
+    upstream_calls: "List[Any]",
+) -> None:
+    response = api_client.post(reverse("matches-async"), data=async_match_data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED, response.content
+    assert response.json()["is_weather_good"] is False
+    assert response.json()["weather_status"] == "bad"
+    match = Match.objects.get(pk=response.json()["id"])
+    assert match.host_id == async_match_data["host"]
+    assert match.weather_checked_at is not None
+    assert not WeatherCheckJob.objects.exists()
+    assert len(upstream_calls) == 1
+
+
+def test_async_match_create_queues_slow_lookups(
+    api_client: "APIClient",
+    async_match_data: dict,
+    monkeypatch: "pytest.MonkeyPatch",
+    upstream_calls: "List[Any]",
+) -> None:
+    monkeypatch.setattr(AsyncMatchCreateView, "weather_timeout", 0)
+    response = api_client.post(reverse("matches-async"), data=async_match_data, format="json")
+    assert response.status_code == status.HTTP_201_CREATED, response.content
+    assert response.json()["weather_status"] == "pending"
+    assert WeatherCheckJob.objects.filter(match_id=response.json()["id"]).exists()
+
+
+def test_async_match_create_errors(
+    api_client: "APIClient",
+    async_match_data: dict,
+    league_factory: "LeagueFactory",
+) -> None:
+    url = reverse("matches-async")
+    response = api_client.post(url, data={**async_match_data, "datetime": "tomorrow"}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "datetime" in response.json()
+    response = api_client.post(url, data={**async_match_data, "league": league_factory.create().pk}, format="json")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    api_client.credentials()
+    response = api_client.post(url, data=async_match_data, format="json")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response["WWW-Authenticate"] == "Token"
+    assert not Match.objects.exists()
+
+
+def test_single_flight() -> None:
+    single_flight = SingleFlight()
+    calls, results = [], []
+    release = threading.Event()
+
+    def lookup() -> bool:
+        calls.append(1)
+        release.wait(1)
+        return False
+
+    threads = [
+        threading.Thread(target=lambda: results.append(single_flight.do("sosnowiec", lookup)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [False] * 5
+    assert len(calls) == 1
+    assert single_flight.calls == {}
+
+    def fail() -> None:
+        raise KeyError("forecast")
+
+    with pytest.raises(KeyError):
+        single_flight.do("sosnowiec", fail)
+    assert single_flight.do("sosnowiec", lambda: True) is True
+
+
+def test_check_matches_single_flight(monkeypatch: "pytest.MonkeyPatch") -> None:
+    calls = []
+
+    def get(url: str, params: dict, **kwargs: "Any") -> FakeResponse:
+        calls.append(params)
+        time.sleep(0.05)
+        return FakeResponse(will_it_rain=1, params=params)
+
+    patch_upstream(monkeypatch, get)
+    monkeypatch.setattr(WeatherAPIClient.transport, "limiter", None)
+    monkeypatch.setattr(WeatherCache, "get_many", lambda self, keys: {})
+    monkeypatch.setattr(WeatherCache, "set", lambda self, *args: None)
+    host = SimpleNamespace(city="Sosnowiec")
+    match_datetime = timezone.now() + timedelta(days=2)
+    results = []
+    threads = [
+        threading.Thread(target=lambda pk=pk: results.append(WeatherAPIClient().check_matches([
+            SimpleNamespace(pk=pk, host=host, datetime=match_datetime),
+        ])))
+        for pk in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results, key=lambda result: list(result[0])) == [({pk: False}, {}) for pk in range(4)]
+    assert len(calls) == 1
+
+
+def test_async_single_flight() -> None:
+    calls = []
+
+    async def lookup() -> bool:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return False
+
+    async def main() -> "List[bool]":
+        single_flight = AsyncSingleFlight()
+        return await asyncio.gather(*(single_flight.do("sosnowiec", lookup) for _ in range(5)))
+
+    assert asyncio.run(main()) == [False] * 5
+    assert len(calls) == 1
+
+
+def test_async_weather_client_coalesces(monkeypatch: "pytest.MonkeyPatch") -> None:
+    calls = []
+
+    def get(url: str, params: dict, **kwargs: "Any") -> FakeResponse:
+        calls.append(params)
+        time.sleep(0.05)
+        return FakeResponse(will_it_rain=1, params=params)
+
+    patch_upstream(monkeypatch, get)
+    match_datetime = datetime.now() + timedelta(days=2)
+
+    async def check_all() -> "List[bool]":
+        client = AsyncWeatherAPIClient()
+        return await asyncio.gather(*(
+            client.check_if_weather_good(city, match_datetime + timedelta(minutes=minutes))
+            for minutes, city in enumerate(["Sosnowiec", "sosnowiec ", "SOSNOWIEC", "Katowice"])
+        ))
+
+    assert async_to_sync(check_all)() == [False] * 4
+    assert sorted(params["q"] for params in calls) == ["Katowice", "Sosnowiec"]
+
+
+def test_token_bucket_limiter() -> None:
+    limiter = TokenBucketLimiter("test", calls_per_minute=60, burst=2)
+    assert [limiter.acquire() for _ in range(3)] == [True, True, False]
+    TokenBucket.objects.filter(pk="test").update(updated_at=timezone.now() - timedelta(seconds=1))
+    assert limiter.acquire() is True
+    assert limiter.acquire() is False
+    assert TokenBucketLimiter("disabled", calls_per_minute=0).acquire() is True
+    assert not TokenBucket.objects.filter(pk="disabled").exists()
+
+
+def test_weather_quota_degrades_to_default(
+    monkeypatch: "pytest.MonkeyPatch",
+    upstream_calls: "List[Any]",
+) -> None:
+    transport = WeatherAPIClient.transport
+    monkeypatch.setattr(transport, "limiter", TokenBucketLimiter("weather_api", calls_per_minute=1))
+    throttled = transport.metrics()["throttled"]
+    client = WeatherAPIClient()
+    assert client.check_if_weather_good("Sosnowiec", datetime.now() + timedelta(days=1)) is False
+    assert client.check_if_weather_good("Katowice", datetime.now() + timedelta(days=1)) is True
+    assert len(upstream_calls) == 1
+    assert transport.metrics()["throttled"] == throttled + 1
+    assert not WeatherForecast.objects.filter(city="katowice").exists()
+    assert transport.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_weather_worker_retries_transport_errors(
+    match_factory: "MatchFactory",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    def get(*args: "Any", **kwargs: "Any") -> None:
+        raise requests.ConnectionError("upstream down")
+
+    patch_upstream(monkeypatch, get)
+    match = match_factory.create(datetime=timezone.now() + timedelta(days=2))
+    queue = WeatherCheckQueue()
+    queue.enqueue([match.pk])
+    assert queue.run_once() == 1
+    job = WeatherCheckJob.objects.get(match=match)
+    assert job.attempts == 1
+    assert "ConnectionError" in job.last_error
+    match.refresh_from_db()
+    assert match.weather_status == "pending"
+    assert match.weather_checked_at is None
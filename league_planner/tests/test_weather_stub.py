@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+from league_planner import settings
+from league_planner.integrations.weather import BaseWeatherAPIClient, WeatherAPIClient
+from league_planner.integrations.weather_stub import WeatherStubServer
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from typing import Generator
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture()
+def stub_server() -> "Generator":
+    server = WeatherStubServer(rain_probability=0.5).start()
+    yield server
+    server.stop()
+
+
+def test_weather_stub_serves_forecasts(stub_server: "WeatherStubServer") -> None:
+    response = requests.get(f"{stub_server.base_url}v1/forecast.json", params={"key": "x", "q": "Sosnowiec", "days": 3})
+    assert response.status_code == 200
+    days = response.json()["forecast"]["forecastday"]
+    assert [day["date"] for day in days] == [
+        (datetime.now().date() + timedelta(days=day)).strftime(settings.WEATHER_API_DATE_FORMAT) for day in range(3)
+    ]
+    response = requests.get(f"{stub_server.base_url}future.json", params={"q": "Sosnowiec", "dt": "2031-01-01"})
+    assert response.json()["forecast"]["forecastday"][0]["date"] == "2031-01-01"
+    assert requests.get(f"{stub_server.base_url}future.json").status_code == 400
+    assert requests.get(f"{stub_server.base_url}history.json", params={"q": "Sosnowiec"}).status_code == 404
+
+
+def test_weather_client_against_stub(
+    stub_server: "WeatherStubServer",
+    monkeypatch: "pytest.MonkeyPatch",
+) -> None:
+    monkeypatch.setattr(BaseWeatherAPIClient, "weather_api_base_url", stub_server.base_url)
+    client = WeatherAPIClient()
+    dates = [datetime.now().replace(hour=12) + timedelta(days=days) for days in (1, 5, 20, 40)]
+    for date in dates:
+        expected = not stub_server.will_it_rain("Sosnowiec", date.strftime(settings.WEATHER_API_DATE_FORMAT))
+        assert client.check_if_weather_good("Sosnowiec", date) is expected
+
+
+def test_weather_stub_error_profile() -> None:
+    server = WeatherStubServer(latency=0.05, error_rate=1).start()
+    try:
+        response = requests.get(f"{server.base_url}forecast.json", params={"q": "Sosnowiec"})
+    finally:
+        server.stop()
+    assert response.status_code == 503
+    assert response.elapsed >= timedelta(seconds=0.05)
+
+
+def test_weather_stub_record_replay(stub_server: "WeatherStubServer", tmp_path: "Path") -> None:
+    params = {"key": "secret", "q": "Nowy  Sącz", "days": 3}
+    recorder = WeatherStubServer(mode=WeatherStubServer.RECORD, fixtures=tmp_path, upstream=stub_server.base_url)
+    recorder.start()
+    try:
+        recorded = requests.get(f"{recorder.base_url}forecast.json", params=params).json()
+        requests.get(f"{recorder.base_url}forecast.json", params={**params, "days": 1})
+        future = requests.get(f"{recorder.base_url}future.json", params={"q": "Nowy Sącz", "dt": "2031-01-01"}).json()
+    finally:
+        recorder.stop()
+    assert sorted(path.name for path in tmp_path.glob("*/*.json")) == ["nowy-sącz.json", "nowy-sącz_2031-01-01.json"]
+    fixture = tmp_path / "forecast" / "nowy-sącz.json"
+    fixture.write_text(fixture.read_text(encoding="utf-8").replace(
+        recorded["forecast"]["forecastday"][0]["date"],
+        "2020-01-01",
+    ), encoding="utf-8")
+
+    replayer = WeatherStubServer(mode=WeatherStubServer.REPLAY, fixtures=tmp_path).start()
+    try:
+        response = requests.get(f"{replayer.base_url}forecast.json", params={**params, "key": "other"})
+        shorter = requests.get(f"{replayer.base_url}forecast.json", params={**params, "days": 2})
+        nearest = requests.get(f"{replayer.base_url}future.json", params={"q": "Nowy Sącz", "dt": "2031-01-04"})
+        missing = requests.get(f"{replayer.base_url}forecast.json", params={**params, "q": "Katowice"})
+    finally:
+        replayer.stop()
+    assert response.json() == recorded
+    assert shorter.json()["forecast"]["forecastday"] == recorded["forecast"]["forecastday"][:2]
+    assert nearest.json()["forecast"]["forecastday"] == [
+        {**future["forecast"]["forecastday"][0], "date": "2031-01-04"},
+    ]
+    assert missing.status_code == 404
@@ -3,7 +3,7 @@ from django.urls import path, include
 from rest_framework.routers import SimpleRouter
 
 from league_planner.views.league import LeagueViewSet
-from league_planner.views.match import MatchViewSet
+from league_planner.views.match import AsyncMatchCreateView, MatchViewSet
 from league_planner.views.team import TeamViewSet
 from league_planner.views.user import CreateUserView, LoginView
 
@@ -15,6 +15,7 @@ router.register("register", CreateUserView, "register")
 
 
 urlpatterns = [
+    path('matches/async/', AsyncMatchCreateView.as_view(), name="matches-async"),
     path('', include(router.urls)),
     path('admin/', admin.site.urls),
     path('login/', LoginView.as_view()),
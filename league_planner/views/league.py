@@ -1,8 +1,13 @@
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
 
-from django.db.models import Case, F, QuerySet, Value, When
+from django.db import transaction
+from django.db.models import Case, F, QuerySet, When
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import DateTimeField
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -16,16 +21,52 @@ from rest_framework.mixins import (
 )
 
 from typing import TYPE_CHECKING
+from league_planner.cache import ScoreboardCache
+from league_planner.exports import Exporter
+from league_planner.filters import MatchFilter
 from league_planner.models.league import League
 from league_planner.models.match import Match
 from league_planner.models.team import Team
 from league_planner.pagination import Pagination
 from league_planner.permissions import IsLeagueOwner
+from league_planner.schedule import ScheduleGenerator
+from league_planner.serializers.fields import format_datetime
 from league_planner.serializers.league import LeagueSerializer
+from league_planner.serializers.match import MatchSerializer
+from league_planner.serializers.schedule import ScheduleSerializer
 from league_planner.serializers.team import ScoreboardSerializer
 
 if TYPE_CHECKING:
-    from typing import Any, Self
+    from typing import Any, Dict, Iterable, List, Optional, Self
+    from django.http import StreamingHttpResponse
+
+
+class HeadToHead:
+    """Points won against teams level on score, kept up to date as results are added.
+
+    Teams are grouped by score, so a result only revisits the group its team
+    leaves and the one it joins instead of every pair played so far.
+    """
+
+    def __init__(self: "Self", team_ids: "Iterable[int]") -> None:
+        self.scores = dict.fromkeys(team_ids, 0)
+        self.tied = defaultdict(set, {0: set(self.scores)})
+        self.pairs = defaultdict(int)
+        self.points = defaultdict(int)
+
+    def add(self: "Self", team_id: int, opponent_id: "Optional[int]", points: int) -> None:
+        self.tied[self.scores[team_id]].discard(team_id)
+        self.shift(team_id, -1)
+        self.scores[team_id] += points
+        if opponent_id is not None:
+            self.pairs[team_id, opponent_id] += points
+        self.shift(team_id, 1)
+        self.tied[self.scores[team_id]].add(team_id)
+
+    def shift(self: "Self", team_id: int, sign: int) -> None:
+        for peer_id in self.tied[self.scores[team_id]]:
+            self.points[team_id] += sign * self.pairs[team_id, peer_id]
+            self.points[peer_id] += sign * self.pairs[peer_id, team_id]
 
 
 class LeagueViewSet(
@@ -40,58 +81,278 @@ class LeagueViewSet(
     queryset = League.objects.all()
     serializer_class = LeagueSerializer
     pagination_class = Pagination
-    POINTS_PER_WIN = 3
-    POINTS_PER_DRAW = 1
-    POINTS_PER_LOSE = 0
+    POINTS_PER_WIN = League.POINTS_PER_WIN
+    POINTS_PER_DRAW = League.POINTS_PER_DRAW
+    POINTS_PER_LOSE = League.POINTS_PER_LOSE
+    MAX_SCOREBOARDS = 500
 
     def create(self: "Self", request: "Request", *args: "Any", **kwargs: "Any") -> "Response":
         request.data["owner"] = request.user.pk
         return super().create(request, *args, **kwargs)
 
+    @action(methods=["post"], detail=True, url_path="generate-schedule")
+    def generate_schedule(self: "Self", request: "Request", pk: str) -> "Response":
+        league = self.get_object()
+        serializer = ScheduleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        generator = ScheduleGenerator(
+            league,
+            serializer.validated_data["start"],
+            timedelta(days=serializer.validated_data["interval_days"]),
+            serializer.validated_data["double"],
+        )
+        with transaction.atomic():
+            # Serializes concurrent generations of the same League.
+            League.objects.select_for_update().filter(pk=league.pk).first()
+            teams_count = Team.objects.filter(league=league).count()
+            if teams_count < 2:
+                raise ValidationError({"non_field_errors": ["League needs at least two teams."]})
+            if Match.objects.filter(league=league).exists():
+                raise ValidationError({"non_field_errors": ["League already has matches."]})
+            created = generator.save()
+        rounds = generator.rounds(teams_count)
+        return Response(
+            data=OrderedDict(
+                matches=created,
+                rounds=rounds,
+                first_round=format_datetime(generator.start),
+                last_round=format_datetime(generator.start + generator.interval * (rounds - 1)),
+            ),
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(methods=["get"], detail=True)
+    def calendar(self: "Self", request: "Request", pk: str) -> "Response":
+        """Dated matches of the league grouped by local day, narrowed by the match list filters."""
+        league = self.get_object()
+        filterset = MatchFilter(
+            request.query_params,
+            queryset=Match.objects.filter(league=league, datetime__isnull=False),
+            request=request,
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        days = OrderedDict()
+        for match in filterset.qs.order_by("datetime", "id"):
+            days.setdefault(timezone.localtime(match.datetime).date(), []).append(match)
+        return Response(
+            data=[{"date": day, "matches": MatchSerializer(matches, many=True).data} for day, matches in days.items()],
+            status=status.HTTP_200_OK,
+        )
+
     @action(
         methods=["get"],
         detail=False,
         url_path=r"(?P<league_id>\w+)/scoreboard",
     )
     def scoreboard(self: "Self", request: "Request", league_id: int) -> "Response":
-        teams_queryset = self.teams_queryset(league_id)
-        teams_to_points_map = {team.id: [0, 0] for team in teams_queryset}
-        matches_with_points_qs = self.matches_with_points_queryset(league_id)
-        for match in matches_with_points_qs:
-            if match.host_id is not None:
-                teams_to_points_map[match.host_id][0] += match.host_points
-            if match.visitor_id is not None:
-                teams_to_points_map[match.visitor_id][1] += match.visitor_points
-        scoreboard = []
-        for team in teams_queryset:
-            points = teams_to_points_map[team.id]
-            team.score = points[0] + points[1]
-            team.score_as_visitor = points[1]
-            scoreboard.append(team)
-        scoreboard.sort(key=lambda team: (team.score, team.score_as_visitor), reverse=True)
-        data = ScoreboardSerializer(scoreboard, many=True).data
-        rest_response_data = OrderedDict(
-            count=len(data),
-            next=None,
-            previous=None,
-            results=data,
+        scoreboard_cache = ScoreboardCache()
+        version, data = scoreboard_cache.get(league_id, request)
+        if data is not None:
+            return Response(data=data, headers={"X-Scoreboard-Cache": "hit"})
+        league = League.objects.filter(pk=league_id).first()
+        scoreboard = self.scoreboard_queryset(league_id)
+        if league is None:
+            scoreboard = scoreboard.none()
+        elif league.scoreboard_ordering() is not None:
+            scoreboard = scoreboard.order_by(*league.scoreboard_ordering())
+        else:
+            scoreboard = self.sort_scoreboard(list(scoreboard), {league.pk: league})
+        page = self.paginate_queryset(scoreboard)
+        response = self.get_paginated_response(ScoreboardSerializer(page, many=True).data)
+        scoreboard_cache.set(league_id, request, version, response.data)
+        response["X-Scoreboard-Cache"] = "miss"
+        return response
+
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path=r"(?P<league_id>\w+)/scoreboard/export",
+    )
+    def scoreboard_export(self: "Self", request: "Request", league_id: int) -> "StreamingHttpResponse":
+        """Stream the whole scoreboard as CSV or NDJSON, ranked like ``scoreboard``."""
+        exporter = Exporter(request)
+        league = League.objects.filter(pk=league_id).first()
+        columns = ("id", "scoreboard_league_id", "name", "city", "score")
+        if league is None:
+            teams = []
+        elif league.scoreboard_ordering() is not None:
+            teams = self.scoreboard_queryset(league_id).order_by(
+                *league.scoreboard_ordering(),
+            ).values_list(*columns).iterator(chunk_size=exporter.chunk_size)
+        else:
+            # Head to head ranks in Python, which needs the whole (single league) table.
+            sorted_teams = self.sort_scoreboard(list(self.scoreboard_queryset(league_id)), {league.pk: league})
+            teams = ([getattr(team, column) for column in columns] for team in sorted_teams)
+        rows = ((position, *team) for position, team in enumerate(teams, start=1))
+        return exporter.response(
+            ("position", *ScoreboardSerializer.Meta.fields),
+            rows,
+            f"scoreboard_{league_id}",
         )
-        return Response(data=rest_response_data, status=status.HTTP_200_OK)
+
+    @action(
+        methods=["get"],
+        detail=False,
+        url_path=r"(?P<league_id>\w+)/scoreboard/history",
+    )
+    def scoreboard_history(self: "Self", request: "Request", league_id: int) -> "Response":
+        as_of = None
+        if "as_of" in request.query_params:
+            try:
+                as_of = DateTimeField().to_internal_value(request.query_params["as_of"])
+            except ValidationError as error:
+                raise ValidationError({"as_of": error.detail})
+        league = League.objects.filter(pk=league_id).first()
+        if league is None:
+            return Response(data=OrderedDict(as_of=as_of, standings=[], rounds=[]), status=status.HTTP_200_OK)
+        teams = {
+            team_id: {
+                "team_id": team_id,
+                "name": name,
+                "score": 0,
+                "score_as_visitor": 0,
+                "goals_for": 0,
+                "goals_against": 0,
+            }
+            for team_id, name in Team.objects.filter(league_id=league_id).values_list("id", "name")
+        }
+        head_to_head = HeadToHead(teams) if "head_to_head" in league.tiebreakers else None
+        matches = self.matches_with_points_queryset(league_id).filter(
+            datetime__isnull=False,
+            host_score__isnull=False,
+            visitor_score__isnull=False,
+        )
+        if as_of is not None:
+            matches = matches.filter(datetime__lte=as_of)
+        matches = matches.order_by("datetime", "id").values_list(
+            "datetime",
+            "host_id",
+            "visitor_id",
+            "host_score",
+            "visitor_score",
+            "host_points",
+            "visitor_points",
+        )
+
+        rounds = []
+        current_date = None
+        for match in matches.iterator():
+            match_datetime, host_id, visitor_id, host_score, visitor_score = match[:5]
+            host_points, visitor_points = match[5:]
+            match_date = timezone.localtime(match_datetime).date()
+            if current_date is not None and match_date != current_date:
+                rounds.append({"date": current_date, "standings": self.rank(league, teams, head_to_head)})
+            current_date = match_date
+            for team_id, opponent_id, scored, conceded, points in (
+                (host_id, visitor_id, host_score, visitor_score, host_points),
+                (visitor_id, host_id, visitor_score, host_score, visitor_points),
+            ):
+                if team_id not in teams:
+                    continue
+                teams[team_id]["score"] += points
+                teams[team_id]["goals_for"] += scored
+                teams[team_id]["goals_against"] += conceded
+                if head_to_head is not None:
+                    head_to_head.add(team_id, opponent_id if opponent_id in teams else None, points)
+            if visitor_id in teams:
+                teams[visitor_id]["score_as_visitor"] += visitor_points
+        if current_date is not None:
+            rounds.append({"date": current_date, "standings": self.rank(league, teams, head_to_head)})
+
+        data = OrderedDict(as_of=as_of, standings=self.rank(league, teams, head_to_head), rounds=rounds)
+        return Response(data=data, status=status.HTTP_200_OK)
 
     @staticmethod
-    def teams_queryset(league_id: int) -> "QuerySet":
-        return Team.objects.filter(league_id=league_id).all()
+    def rank(league: "League", teams: "Dict[int, Dict]", head_to_head: "Optional[HeadToHead]") -> "List[Dict]":
+        points = head_to_head.points if head_to_head is not None else {}
+        ordered = sorted(
+            teams.values(),
+            key=lambda team: league.ranking_key(
+                **{field: value for field, value in team.items() if field != "name"},
+                head_to_head=points.get(team["team_id"], 0),
+            ),
+        )
+        return [
+            {"id": team["team_id"], "name": team["name"], "score": team["score"], "position": position}
+            for position, team in enumerate(ordered, start=1)
+        ]
+
+    @action(methods=["get"], detail=False)
+    def scoreboards(self: "Self", request: "Request") -> "Response":
+        ids = request.query_params.get("ids", "")
+        try:
+            league_ids = {int(league_id) for league_id in ids.split(",") if league_id}
+        except ValueError:
+            raise ValidationError({"ids": ["Expected a comma separated list of league ids."]})
+        if len(league_ids) > self.MAX_SCOREBOARDS:
+            raise ValidationError({"ids": [f"Ensure there are no more than {self.MAX_SCOREBOARDS} ids."]})
+        leagues = League.objects.in_bulk(league_ids)
+        scoreboards = {str(league_id): [] for league_id in sorted(leagues)}
+        teams = self.sort_scoreboard(list(self.scoreboard_queryset(*leagues)), leagues)
+        teams.sort(key=lambda team: team.scoreboard_league_id)
+        for team, data in zip(teams, ScoreboardSerializer(teams, many=True).data):
+            scoreboards[str(team.scoreboard_league_id)].append(data)
+        return Response(data=scoreboards, status=status.HTTP_200_OK)
 
-    def matches_with_points_queryset(self: "Self", league_id: int) -> "QuerySet":
-        return Match.objects.filter(league_id=league_id).annotate(
+    @staticmethod
+    def scoreboard_queryset(*league_ids: int) -> "QuerySet":
+        return Team.objects.filter(standing__league_id__in=league_ids).annotate(
+            scoreboard_league_id=F("standing__league_id"),
+            score=F("standing__points"),
+            score_as_visitor=F("standing__points_as_visitor"),
+            goals_for=F("standing__goals_for"),
+            goals_against=F("standing__goals_against"),
+            goal_difference=F("standing__goals_for") - F("standing__goals_against"),
+        ).order_by("-score", "-score_as_visitor", "id")
+
+    def sort_scoreboard(self: "Self", teams: "List[Team]", leagues: "Dict[int, League]") -> "List[Team]":
+        head_to_head = self.head_to_head_points(
+            *(league_id for league_id, league in leagues.items() if "head_to_head" in league.tiebreakers)
+        )
+        return sorted(
+            teams,
+            key=lambda team: leagues[team.scoreboard_league_id].ranking_key(
+                team.id,
+                team.score,
+                team.score_as_visitor,
+                team.goals_for,
+                team.goals_against,
+                head_to_head[team.id],
+            ),
+        )
+
+    def head_to_head_points(self: "Self", *league_ids: int) -> "Dict[int, int]":
+        """Points every team took from opponents level with it on points.
+
+        The pairwise results between tied teams are read in one pass over the
+        leagues' matches; pairs on different points are filtered out by the
+        database through the standings of both sides.
+        """
+        head_to_head = defaultdict(int)
+        if not league_ids:
+            return head_to_head
+        matches = self.matches_with_points_queryset(*league_ids).filter(
+            host_score__isnull=False,
+            visitor_score__isnull=False,
+            host__standing__points=F("visitor__standing__points"),
+        ).values_list("host_id", "visitor_id", "host_points", "visitor_points")
+        for host_id, visitor_id, host_points, visitor_points in matches.iterator():
+            head_to_head[host_id] += host_points
+            head_to_head[visitor_id] += visitor_points
+        return head_to_head
+
+    @staticmethod
+    def matches_with_points_queryset(*league_ids: int) -> "QuerySet":
+        return Match.objects.filter(league_id__in=league_ids).annotate(
             host_points=Case(
-                When(host_score__gt=F("visitor_score"), then=Value(self.POINTS_PER_WIN)),
-                When(host_score=F("visitor_score"), then=Value(self.POINTS_PER_DRAW)),
-                default=Value(self.POINTS_PER_LOSE),
+                When(host_score__gt=F("visitor_score"), then=F("league__points_per_win")),
+                When(host_score=F("visitor_score"), then=F("league__points_per_draw")),
+                default=F("league__points_per_lose"),
             ),
             visitor_points=Case(
-                When(visitor_score__gt=F("host_score"), then=Value(self.POINTS_PER_WIN)),
-                When(visitor_score=F("host_score"), then=Value(self.POINTS_PER_DRAW)),
-                default=Value(self.POINTS_PER_LOSE),
+                When(visitor_score__gt=F("host_score"), then=F("league__points_per_win")),
+                When(visitor_score=F("host_score"), then=F("league__points_per_draw")),
+                default=F("league__points_per_lose"),
             )
         )
@@ -1,7 +1,13 @@
-import datetime
-from typing import TYPE_CHECKING
+import asyncio
 
-from rest_framework import viewsets
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views import View
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, NotAuthenticated, PermissionDenied, ValidationError
 from rest_framework.mixins import (
     CreateModelMixin,
     ListModelMixin,
@@ -10,23 +16,39 @@ from rest_framework.mixins import (
     DestroyModelMixin,
 )
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from league_planner import settings
-from league_planner.filters import FilterByLeague
-from league_planner.integrations.weather import WeatherAPIClient
+from league_planner.cache import ScoreboardCache
+from league_planner.exports import Exporter
+from league_planner.filters import MatchFilter
+from league_planner.integrations.weather import AsyncWeatherAPIClient
+from league_planner.integrations.weather_jobs import WeatherCheckQueue
+from league_planner.mixins import RowReadMixin
+from league_planner.models.league import League
 from league_planner.models.match import Match
+from league_planner.models.standing import Standing
 from league_planner.models.team import Team
-from league_planner.pagination import Pagination
+from league_planner.pagination import OptInKeysetPagination
 from league_planner.permissions import IsLeagueResourceOwner
+from league_planner.renderers import FastJSONRenderer
+from league_planner.serializers.fields import format_datetime
 from league_planner.serializers.match import MatchSerializer
+from league_planner.serializers.match_bulk import MatchBulkSerializer
+from league_planner.serializers.match_score import MatchScoreSerializer
+from league_planner.serializers.rows import MatchRowSerializer
+
+from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Any
-    from rest_framework.request import Request
-    from rest_framework.response import Response
+    from typing import Any, List, Self, Set, Tuple
+    from django.http import HttpRequest, StreamingHttpResponse
 
 
 class MatchViewSet(
+    RowReadMixin,
     viewsets.GenericViewSet,
     ListModelMixin,
     CreateModelMixin,
@@ -37,26 +59,232 @@ class MatchViewSet(
     permission_classes = (IsAuthenticated, IsLeagueResourceOwner)
     queryset = Match.objects.all()
     serializer_class = MatchSerializer
-    pagination_class = Pagination
-    filterset_class = FilterByLeague
+    row_serializer = MatchRowSerializer()
+    pagination_class = OptInKeysetPagination
+    cursor_ordering = ("datetime", "id")
+    filterset_class = MatchFilter
+    MAX_BULK_MATCHES = 1000
 
-    def create(self, request: "Request", *args: "Any", **kwargs: "Any") -> "Response":
-        response = super().create(request, *args, **kwargs)
+    @action(methods=["post"], detail=False, url_path="bulk", permission_classes=(IsAuthenticated,))
+    def bulk_create(self: "Self", request: "Request") -> "Response":
+        """Create a list of matches at once, all or none of them."""
+        rows = request.data
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValidationError({"non_field_errors": ["Expected a list of matches."]})
+        if len(rows) > self.MAX_BULK_MATCHES:
+            raise ValidationError(
+                {"non_field_errors": [f"Ensure there are no more than {self.MAX_BULK_MATCHES} matches."]},
+            )
 
-        host_city = Team.objects.get(id=request.data.get("host")).city
-        match_datetime = datetime.datetime.strptime(
-            request.data.get("datetime"),
-            settings.FE_DATETIME_FORMAT,
+        leagues = League.objects.in_bulk(self.primary_keys(rows, "league"))
+        if any(league.owner_id != request.user.pk for league in leagues.values()):
+            raise PermissionDenied()
+        teams = Team.objects.in_bulk(self.primary_keys(rows, "host", "visitor"))
+        serializer = MatchBulkSerializer(
+            data=rows,
+            many=True,
+            context={**self.get_serializer_context(), "prefetched": {League: leagues, Team: teams}},
         )
+        serializer.is_valid(raise_exception=True)
 
-        if host_city and match_datetime:
-            weather_api_client = WeatherAPIClient()
-            is_weather_good = weather_api_client.check_if_weather_good(
-                host_city,
-                match_datetime,
+        now = timezone.now()
+        matches = [Match(**row) for row in serializer.validated_data]
+        for match in matches:
+            if match.host_id is None or match.datetime is None:
+                match.is_weather_good = True
+                match.weather_checked_at = now
+        with transaction.atomic():
+            Match.objects.bulk_create(matches, batch_size=500)
+            deltas = {}
+            for match in matches:
+                Standing.objects.collect(deltas, match)
+            Standing.objects.apply(deltas)
+            # Standings belong to the leagues of the teams.
+            scored = {team for match in matches if match.has_result for team in (match.host, match.visitor) if team}
+            ScoreboardCache.invalidate(*{team.league_id for team in scored}, *{match.league_id for match in matches})
+            WeatherCheckQueue().enqueue(match.pk for match in matches if match.is_weather_good is None)
+        return Response(MatchSerializer(matches, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(methods=["patch"], detail=False, url_path="scores", permission_classes=(IsAuthenticated,))
+    def update_scores(self: "Self", request: "Request") -> "Response":
+        """Set the scores of a list of matches at once, all or none of them."""
+        if not isinstance(request.data, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of match scores."]})
+        if len(request.data) > self.MAX_BULK_MATCHES:
+            raise ValidationError(
+                {"non_field_errors": [f"Ensure there are no more than {self.MAX_BULK_MATCHES} matches."]},
             )
+        serializer = MatchScoreSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        scores = {row["id"]: row for row in serializer.validated_data}
+        if len(scores) != len(serializer.validated_data):
+            raise ValidationError({"non_field_errors": ["Each match may appear only once."]})
+
+        with transaction.atomic():
+            matches = Match.objects.select_for_update(of=("self",)).select_related(
+                "league", "host", "visitor",
+            ).in_bulk(list(scores))
+            missing = [{} if row["id"] in matches else {"id": ["Match does not exist."]} for row in scores.values()]
+            if any(missing):
+                raise ValidationError(missing)
+            if any(match.league.owner_id != request.user.pk for match in matches.values()):
+                raise PermissionDenied()
+
+            changed, deltas = [], {}
+            for match_id, match in matches.items():
+                new_scores = (scores[match_id]["host_score"], scores[match_id]["visitor_score"])
+                if new_scores == (match.host_score, match.visitor_score):
+                    continue
+                Standing.objects.collect(deltas, match, sign=-1)
+                match.host_score, match.visitor_score = new_scores
+                Standing.objects.collect(deltas, match)
+                changed.append(match)
+            Match.objects.bulk_update(changed, ("host_score", "visitor_score"), batch_size=500)
+            Standing.objects.apply(deltas)
+            # Standings belong to the leagues of the teams.
+            league_ids = {team.league_id for match in changed for team in (match.host, match.visitor) if team}
+            ScoreboardCache.invalidate(*league_ids, *{match.league_id for match in changed})
+        ordered = [matches[match_id] for match_id in scores]
+        return Response(MatchSerializer(ordered, many=True).data, status=status.HTTP_200_OK)
+
+    @action(methods=["get"], detail=False)
+    def export(self: "Self", request: "Request") -> "StreamingHttpResponse":
+        """Stream all (filtered) matches as CSV or NDJSON."""
+        exporter = Exporter(request)
+        rows = self.filter_queryset(self.get_queryset()).order_by("id").values_list(
+            "id",
+            "league_id",
+            "host_id",
+            "host_score",
+            "visitor_id",
+            "visitor_score",
+            "address",
+            "datetime",
+            "is_weather_good",
+            "weather_checked_at",
+        ).iterator(chunk_size=exporter.chunk_size)
+        return exporter.response(MatchSerializer.Meta.fields, map(self.export_row, rows), "matches")
+
+    @staticmethod
+    def export_row(row: "Tuple") -> "Tuple":
+        *columns, match_datetime, is_weather_good, weather_checked_at = row
+        return (
+            *columns,
+            format_datetime(match_datetime),
+            is_weather_good,
+            Match.weather_status_of(is_weather_good),
+            format_datetime(weather_checked_at),
+        )
+
+    @staticmethod
+    def primary_keys(rows: "List[dict]", *fields: str) -> "Set[int]":
+        keys = set()
+        for row in rows:
+            for field in fields:
+                try:
+                    keys.add(int(row.get(field)))
+                except (TypeError, ValueError):
+                    continue
+        return keys
+
+    def perform_create(self, serializer: "MatchSerializer") -> None:
+        match = serializer.save()
+        self.check_weather_later(match)
+
+    def perform_update(self, serializer: "MatchSerializer") -> None:
+        previous = (serializer.instance.host_id, serializer.instance.datetime)
+        match = serializer.save()
+        if (match.host_id, match.datetime) != previous:
+            self.check_weather_later(match)
+
+    @staticmethod
+    def check_weather_later(match: "Match") -> None:
+        if match.host_id is not None and match.datetime is not None:
+            match.is_weather_good = None
+            match.weather_checked_at = None
+            WeatherCheckQueue().enqueue([match.pk])
         else:
-            is_weather_good = True
+            match.is_weather_good = True
+            match.weather_checked_at = timezone.now()
+        Match.objects.filter(pk=match.pk).update(
+            is_weather_good=match.is_weather_good,
+            weather_checked_at=match.weather_checked_at,
+        )
+
+
+class AsyncMatchCreateView(View):
+    """Creates a match and checks its weather on the event loop under ASGI.
+
+    Lookups slower than ``weather_timeout`` are left to the weather worker.
+    """
 
-        response.data["is_weather_good"] = is_weather_good
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    permission_classes = MatchViewSet.permission_classes
+    renderer_class = FastJSONRenderer
+    weather_client_class = AsyncWeatherAPIClient
+    weather_timeout = settings.WEATHER_API_READ_TIMEOUT
+
+    @classmethod
+    def as_view(cls, **initkwargs: "Any") -> "Any":
+        view = super().as_view(**initkwargs)
+        # Token authenticated like the DRF views.
+        view.csrf_exempt = True
+        return view
+
+    async def post(self: "Self", request: "HttpRequest") -> "HttpResponse":
+        request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[authenticator() for authenticator in self.authentication_classes],
+        )
+        try:
+            serializer = await sync_to_async(self.validate)(request)
+        except APIException as error:
+            return self.render(error.detail, error.status_code, request)
+        match = await Match.objects.acreate(**serializer.validated_data)
+        await self.check_weather(match)
+        data = await sync_to_async(lambda: MatchSerializer(match).data)()
+        return self.render(data, status.HTTP_201_CREATED, request)
+
+    def validate(self: "Self", request: "Request") -> "MatchSerializer":
+        for permission in self.permission_classes:
+            if not permission().has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise NotAuthenticated()
+                raise PermissionDenied()
+        serializer = MatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer
+
+    async def check_weather(self: "Self", match: "Match") -> None:
+        if match.host is None or not match.host.city or match.datetime is None:
+            match.is_weather_good = True
+        else:
+            try:
+                match.is_weather_good = await asyncio.wait_for(
+                    self.weather_client_class().check_if_weather_good(
+                        match.host.city,
+                        timezone.make_naive(match.datetime),
+                    ),
+                    self.weather_timeout,
+                )
+            except Exception:
+                # Slow lookups and malformed payloads are retried by the worker.
+                await sync_to_async(WeatherCheckQueue().enqueue)([match.pk])
+                return
+        match.weather_checked_at = timezone.now()
+        await Match.objects.filter(pk=match.pk).aupdate(
+            is_weather_good=match.is_weather_good,
+            weather_checked_at=match.weather_checked_at,
+        )
+
+    def render(self: "Self", data: "Any", status_code: int, request: "Request") -> "HttpResponse":
+        response = HttpResponse(
+            self.renderer_class().render(data),
+            status=status_code,
+            content_type=self.renderer_class.media_type,
+        )
+        if status_code == status.HTTP_401_UNAUTHORIZED and request.authenticators:
+            response["WWW-Authenticate"] = request.authenticators[0].authenticate_header(request)
         return response
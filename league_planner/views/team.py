@@ -1,4 +1,9 @@
-from rest_framework import viewsets
+from collections import OrderedDict
+
+from django.db.models import BooleanField, Case, F, IntegerField, Q, Sum, Value, When, Window
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.mixins import (
     CreateModelMixin,
     ListModelMixin,
@@ -6,16 +11,35 @@ from rest_framework.mixins import (
     UpdateModelMixin,
     DestroyModelMixin,
 )
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from league_planner.exports import Exporter
 from league_planner.filters import FilterByLeague
+from league_planner.mixins import RowReadMixin
+from league_planner.models.league import League
 from league_planner.models.team import Team
-from league_planner.pagination import Pagination
+from league_planner.pagination import OptInKeysetPagination
+from league_planner.parsers import CSVStreamParser, NDJSONStreamParser
 from league_planner.permissions import IsLeagueResourceOwner
+from league_planner.serializers.fields import format_datetime
+from league_planner.serializers.rows import TeamRowSerializer
 from league_planner.serializers.team import TeamSerializer
+from league_planner.team_import import TeamImporter
+from league_planner.views.league import LeagueViewSet
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Self
+    from django.db.models import QuerySet
+    from django.http import StreamingHttpResponse
+    from rest_framework.request import Request
 
 
 class TeamViewSet(
+    RowReadMixin,
     viewsets.GenericViewSet,
     ListModelMixin,
     CreateModelMixin,
@@ -26,5 +50,137 @@ class TeamViewSet(
     permission_classes = (IsAuthenticated, IsLeagueResourceOwner)
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
-    pagination_class = Pagination
+    row_serializer = TeamRowSerializer()
+    pagination_class = OptInKeysetPagination
+    cursor_ordering = ("id",)
     filterset_class = FilterByLeague
+    DEFAULT_HISTORY = 5
+    MAX_HISTORY = 50
+    SPLIT_FIELDS = ("played", "wins", "draws", "losses", "goals_for", "goals_against", "points")
+
+    @action(methods=["get"], detail=True)
+    def history(self: "Self", request: "Request", pk: str) -> "Response":
+        """Last ``?last=`` results of the team with its form and home/away record in its league."""
+        try:
+            last = int(request.query_params.get("last", self.DEFAULT_HISTORY))
+        except ValueError:
+            last = 0
+        if not 1 <= last <= self.MAX_HISTORY:
+            raise ValidationError({"last": [f"Expected a number from 1 to {self.MAX_HISTORY}."]})
+        team = self.get_object()
+        rows = list(self.history_queryset(team)[:last])
+        splits = {
+            side: {field: rows[0][f"{side}_{field}"] if rows else 0 for field in self.SPLIT_FIELDS}
+            for side in ("home", "away")
+        }
+        return Response(
+            data=OrderedDict(
+                team=team.pk,
+                form="".join(row["result"] for row in rows),
+                results=[
+                    OrderedDict(
+                        match=row["id"],
+                        datetime=format_datetime(row["datetime"]),
+                        opponent=row["opponent"],
+                        home=row["home"],
+                        goals_for=row["goals_for"],
+                        goals_against=row["goals_against"],
+                        points=row["points"],
+                        result=row["result"],
+                    )
+                    for row in rows
+                ],
+                goals_for=splits["home"]["goals_for"] + splits["away"]["goals_for"],
+                goals_against=splits["home"]["goals_against"] + splits["away"]["goals_against"],
+                home=splits["home"],
+                away=splits["away"],
+            ),
+            status=status.HTTP_200_OK,
+        )
+
+    @classmethod
+    def history_queryset(cls, team: "Team") -> "QuerySet":
+        """Finished matches of the team from its side, newest first.
+
+        Every row also carries the team's home and away totals over all of them
+        as window sums, so a single query answers the whole history.
+        """
+        home = Q(host_id=team.pk)
+        matches = LeagueViewSet.matches_with_points_queryset(team.league_id).filter(
+            home | Q(visitor_id=team.pk),
+            host_score__isnull=False,
+            visitor_score__isnull=False,
+        ).annotate(
+            home=Case(When(home, then=Value(True)), default=Value(False), output_field=BooleanField()),
+            opponent=Case(When(home, then=F("visitor_id")), default=F("host_id")),
+            goals_for=Case(When(home, then=F("host_score")), default=F("visitor_score")),
+            goals_against=Case(When(home, then=F("visitor_score")), default=F("host_score")),
+            points=Case(When(home, then=F("host_points")), default=F("visitor_points")),
+        ).annotate(
+            result=Case(
+                When(goals_for__gt=F("goals_against"), then=Value("W")),
+                When(goals_for=F("goals_against"), then=Value("D")),
+                default=Value("L"),
+            ),
+        )
+        stats = {
+            "played": Value(1),
+            "wins": Case(When(result="W", then=Value(1)), default=Value(0)),
+            "draws": Case(When(result="D", then=Value(1)), default=Value(0)),
+            "losses": Case(When(result="L", then=Value(1)), default=Value(0)),
+            "goals_for": F("goals_for"),
+            "goals_against": F("goals_against"),
+            "points": F("points"),
+        }
+        totals = {
+            f"{side}_{field}": Window(
+                Sum(Case(When(home=is_home, then=value), default=Value(0), output_field=IntegerField())),
+            )
+            for side, is_home in (("home", True), ("away", False))
+            for field, value in stats.items()
+        }
+        return matches.annotate(**totals).order_by(F("datetime").desc(nulls_last=True), "-id").values(
+            "id", "datetime", "home", "opponent", "goals_for", "goals_against", "points", "result", *totals,
+        )
+
+    @action(methods=["get"], detail=False)
+    def export(self: "Self", request: "Request") -> "StreamingHttpResponse":
+        """Stream all (filtered) teams as CSV or NDJSON."""
+        exporter = Exporter(request)
+        rows = self.filter_queryset(self.get_queryset()).values_list(
+            "id",
+            "league_id",
+            "name",
+            "city",
+        ).iterator(chunk_size=exporter.chunk_size)
+        return exporter.response(TeamSerializer.Meta.fields, rows, "teams")
+
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path="import",
+        parser_classes=(CSVStreamParser, NDJSONStreamParser, MultiPartParser),
+        permission_classes=(IsAuthenticated,),
+    )
+    def import_teams(self: "Self", request: "Request") -> "Response":
+        """Import a CSV or NDJSON file of teams into ``?league=``, as body or ``file`` upload."""
+        try:
+            league = League.objects.filter(pk=int(request.query_params.get("league", ""))).first()
+        except ValueError:
+            league = None
+        if league is None:
+            raise ValidationError({"league": ["Expected the id of an existing league."]})
+        if league.owner_id != request.user.pk:
+            raise PermissionDenied()
+
+        upload = request.data.get("file") if hasattr(request.data, "get") else None
+        if upload is not None:
+            lines = upload
+            kind = TeamImporter.detect_kind(upload.content_type or "", upload.name or "")
+        else:
+            lines = request.data
+            kind = TeamImporter.detect_kind(request.content_type)
+        if kind is None or not hasattr(lines, "readline"):
+            raise ValidationError({"file": ["Expected a CSV or NDJSON file."]})
+        report = TeamImporter(league).run(lines, kind)
+        return Response(data=report, status=status.HTTP_200_OK)